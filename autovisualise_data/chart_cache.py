@@ -0,0 +1,232 @@
+
+
+# %%
+import os, json, hashlib, logging, threading
+import streamlit as st
+
+from bokeh.embed import json_item
+from bokeh.document import Document
+from datetime import date
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Text, Tuple
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH, CHART_CACHE_MAX_BYTES, PRERENDER_CACHE_DIR
+from config.config_logger import setup_logger
+from autovisualise_data.data_cache import ByteLRUCache
+from autovisualise_data.plot_backend import hv
+from autovisualise_data.tracing import traced
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Chart Cache.
+# --------------------------------------------------------------
+
+# Rendered charts (serialised Bokeh JSON) keyed by the widget state.
+CHART_CACHE = ByteLRUCache(CHART_CACHE_MAX_BYTES, name='chart_cache')
+
+# Building & rendering the holoview plots isn't thread-safe (the holoviews / bokeh state is shared
+# across threads, so concurrent renders can mix up the ranges, factors & data sources of each
+# other), so the session & prefetch threads of the process render one view at a time. Sessions
+# wait for the lock, prefetches skip the view if it's taken (see get_rendered_charts).
+RENDER_LOCK = threading.Lock()
+
+
+class RenderSkipped(Exception):
+    '''
+    Purpose :
+        Raised by a background render that was cancelled or found another view rendering.
+    '''
+
+
+def view_key(**widget_state) -> Tuple:
+    '''
+    Purpose :
+        Output a hashable key for a set of widget values.
+
+    Input   :
+        widget_state : Widget values such as tab, etf_dir, ticker, yr_range, etc.
+
+    Output  :
+        Tuple obj of (name, value) pairs sorted by name.
+    '''
+
+    return tuple(sorted(widget_state.items()))
+
+
+def render_json(plot) -> Optional[Text]:
+    '''
+    Purpose :
+        Render a holoview plot with bokeh and serialise it into JSON.
+
+    Input   :
+        plot : Holoview plot obj (or None if the plot couldn't be created).
+
+    Output  :
+        Str. Serialised bokeh JSON item (or None).
+    '''
+
+    if plot is None:
+        return None
+    return json.dumps(json_item(hv.render(plot, backend='bokeh')))
+
+
+@traced()
+def render_plots(plots:Sequence) -> List[Optional[Text]]:
+    '''
+    Purpose :
+        Render the holoview plots returned by a plot function into bokeh JSON.
+        Nested tuples of plots are flattened.
+
+    Input   :
+        plots : Tuple obj containing the holoview plots.
+
+    Output  :
+        List obj containing the serialised bokeh JSON for each plot.
+    '''
+
+    charts = []
+    for plot in plots:
+        charts += [render_json(sub_plot) for sub_plot in plot] if isinstance(plot, tuple) else [render_json(plot)]
+    return charts
+
+
+# %%
+# --------------------------------------------------------------
+# Pre-rendered Artefacts.
+# --------------------------------------------------------------
+
+def get_artefact_path(key:Tuple) -> Text:
+    '''
+    Purpose :
+        Output the path of the pre-rendered artefact for a widget state. The path is
+        addressed by the hash of the widget state (including the source mtime).
+
+    Input   :
+        key : Tuple. Widget state key from (view_key).
+
+    Output  :
+        Str. Path to the artefact (JSON) file.
+    '''
+
+    digest = hashlib.sha256(json.dumps(dict(key), sort_keys=True, default=str).encode()).hexdigest()
+    return os.path.join(PRERENDER_CACHE_DIR, digest[:2], f'{digest}.json')
+
+
+def write_artefact(key:Tuple, charts:List[Optional[Text]], table_html:Optional[Text]=None) -> Text:
+    '''
+    Purpose :
+        Write the rendered charts (and styled table HTML) of a widget state to disk.
+
+    Input   :
+        key        : Tuple. Widget state key from (view_key).
+        charts     : List. Serialised bokeh JSON for each plot.
+        table_html : Str. Styled table HTML (if any).
+
+    Output  :
+        Str. Path to the artefact (JSON) file.
+    '''
+
+    artefact_path = get_artefact_path(key)
+    os.makedirs(os.path.dirname(artefact_path), exist_ok=True)
+
+    # The styled table highlights today's month / week, so it's only valid for the day.
+    artefact = {
+        'view': dict(key), 'charts': charts, 'table_html': table_html,
+        'styled_on': date.today().isoformat(),
+    }
+    with open(f'{artefact_path}.tmp', 'w') as out_file:
+        json.dump(artefact, out_file, default=str)
+    os.replace(f'{artefact_path}.tmp', artefact_path)
+    return artefact_path
+
+
+def read_artefact(key:Tuple) -> Optional[Dict]:
+    '''
+    Purpose :
+        Read the pre-rendered artefact of a widget state (or None if there isn't one).
+    '''
+
+    try:
+        with open(get_artefact_path(key), 'r') as in_file:
+            return json.load(in_file)
+    except (OSError, ValueError):
+        return None
+
+
+# %%
+# --------------------------------------------------------------
+# Rendered Charts.
+# --------------------------------------------------------------
+
+def get_rendered_charts(key:Hashable, build_plots:Callable[[], Sequence], cancelled:Optional[threading.Event]=None) -> List[Optional[Text]]:
+    '''
+    Purpose :
+        Output the rendered charts for a widget state. The charts are read from the
+        pre-rendered artefact if there is one, and the plots are only built and
+        rendered when the widget state is neither cached nor pre-rendered, one
+        render at a time (see RENDER_LOCK).
+
+    Input   :
+        key         : Tuple. Widget state key from (view_key).
+        build_plots : Callable. Build the holoview plots for the widget state.
+        cancelled   : Event. Set to cancel a background render (prefetch). A background
+                      render doesn't wait for the render lock: it raises (RenderSkipped)
+                      if the lock is taken or the event is set, and nothing is cached.
+
+    Output  :
+        List obj containing the serialised bokeh JSON for each plot.
+    '''
+
+    def render_charts() -> List[Optional[Text]]:
+        artefact = read_artefact(key)
+        if artefact is not None:
+            logger.debug(f'----- Read pre-rendered charts for ({key}).')
+            return artefact['charts']
+
+        logger.debug(f'----- Rendering charts for ({key}).')
+        if cancelled is None:
+            with RENDER_LOCK:
+                return render_plots(build_plots())
+
+        if not RENDER_LOCK.acquire(blocking=False):
+            raise RenderSkipped(f'another view is rendering ({key})')
+        try:
+            if cancelled.is_set():
+                raise RenderSkipped(f'render cancelled ({key})')
+            return render_plots(build_plots())
+        finally:
+            RENDER_LOCK.release()
+
+    return CHART_CACHE.get_or_load(key, render_charts)
+
+
+# %%
+# --------------------------------------------------------------
+# Display Chart.
+# --------------------------------------------------------------
+
+def bokeh_chart(chart_json:Optional[Text], use_container_width:bool=True):
+    '''
+    Purpose :
+        Display a chart from its serialised bokeh JSON. Rebuilding the bokeh
+        document from JSON skips both the holoview build and the bokeh render.
+
+    Input   :
+        chart_json          : Str. Serialised bokeh JSON item from (render_json).
+        use_container_width : Boo. To stretch the chart to the container width.
+    '''
+
+    if chart_json is None:
+        return
+
+    document = Document.from_json(json.loads(chart_json)['doc'])
+    st.bokeh_chart(document.roots[0], use_container_width=use_container_width)
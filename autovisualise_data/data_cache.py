@@ -0,0 +1,202 @@
+
+
+# %%
+import sys, logging, threading, functools
+import pandas as pd
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Text
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH, DATA_CACHE_MAX_BYTES
+from config.config_logger import setup_logger
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Memory Accounting.
+# --------------------------------------------------------------
+
+def sizeof(obj:Any) -> int:
+    '''
+    Purpose :
+        Estimate the memory (bytes) held by an obj. Dataframes are measured with
+        (memory_usage(deep=True)), containers are measured recursively.
+
+    Input   :
+        obj : Any. Dataframe, series, dict, tuple, list, str or bytes obj.
+
+    Output  :
+        Int. Size in bytes.
+    '''
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(key) + sizeof(val) for key, val in obj.items())
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(sizeof(val) for val in obj)
+    return sys.getsizeof(obj)
+
+
+# %%
+# --------------------------------------------------------------
+# LRU Cache.
+# --------------------------------------------------------------
+
+class ByteLRUCache:
+    '''
+    Purpose :
+        Thread-safe LRU cache bounded by the total size (bytes) of its values
+        rather than by the number of entries. Keeps hit / miss / eviction counters.
+
+    Input   :
+        max_bytes : Int. Memory budget (bytes) for the cached values.
+        name      : Str. Name of the cache (for logging).
+    '''
+
+    def __init__(self, max_bytes:int, name:Text='cache'):
+        self.max_bytes, self.name = max_bytes, name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._loading = {}
+        self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key:Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key:Hashable, default:Any=None) -> Any:
+        '''
+        Purpose :
+            Output the cached value (and mark it as most recently used) or the default.
+        '''
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key:Hashable, value:Any) -> Any:
+        '''
+        Purpose :
+            Cache a value, evicting the least recently used values until the cache
+            is within its budget. Values larger than the budget aren't cached.
+
+        Output  :
+            The value.
+        '''
+
+        nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            logger.debug(f'----- ({key}) of {nbytes} bytes exceeds the ({self.name}) budget.')
+            return value
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+
+            while self.nbytes > self.max_bytes:
+                evicted_key, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+                self.evictions += 1
+                logger.debug(f'----- Evicted ({evicted_key}) from ({self.name}).')
+        return value
+
+    def get_or_load(self, key:Hashable, loader:Callable[[], Any]) -> Any:
+        '''
+        Purpose :
+            Output the cached value, or call the loader and cache its output. If
+            another thread is already loading the key, wait for its value instead
+            of loading it twice.
+        '''
+
+        _missing = object()
+        value = self.get(key, _missing)
+        if value is not _missing:
+            return value
+
+        with self._lock:
+            loading = self._loading.get(key)
+            is_loader = loading is None
+            if is_loader:
+                loading = self._loading[key] = threading.Event()
+
+        if not is_loader:
+            loading.wait()
+            value = self.get(key, _missing)
+            # The other load failed (or its value was too large to cache).
+            return loader() if value is _missing else value
+
+        try:
+            return self.put(key, loader())
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set()
+
+    def pop(self, key:Hashable) -> Any:
+        '''
+        Purpose :
+            Remove a value from the cache (if any) and output it.
+        '''
+
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, nbytes = self._entries.pop(key)
+            self.nbytes -= nbytes
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[Text, int]:
+        '''
+        Purpose :
+            Output the memory accounting and the hit / miss / eviction counters.
+        '''
+
+        return {
+            'entries': len(self._entries), 'nbytes': self.nbytes, 'max_bytes': self.max_bytes,
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+        }
+
+
+def cache_in(cache:ByteLRUCache) -> Callable:
+    '''
+    Purpose :
+        Decorator to cache the output of a function in a (ByteLRUCache), keyed by
+        the function name and its (hashable) arguments.
+    '''
+
+    def decorator(func:Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            return cache.get_or_load(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+# Shared cache for the data read from the dataset directory.
+DATA_CACHE = ByteLRUCache(DATA_CACHE_MAX_BYTES, name='data_cache')
@@ -0,0 +1,126 @@
+
+
+# %%
+import logging
+import numpy as np
+import pandas as pd
+
+from typing import Callable, Dict, Optional, Text
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH
+from config.config_logger import setup_logger
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Decimation.
+# --------------------------------------------------------------
+
+def lttb(x:np.ndarray, y:np.ndarray, n_out:int) -> np.ndarray:
+    '''
+    Purpose :
+        Largest-Triangle-Three-Buckets: keep the first & last points and, within
+        each of the (n_out - 2) buckets in between, the point forming the largest
+        triangle with the point kept in the previous bucket and the average of the
+        next bucket. Keeps the visual shape of a line with few points.
+
+    Input   :
+        x     : Array. Sorted x values (e.g. dates as int64).
+        y     : Array. Y values (without NaN).
+        n_out : Int. Number of points to keep (>= 3).
+
+    Output  :
+        Array. Sorted indices of the points to keep.
+    '''
+
+    n_in = len(x)
+    if n_out >= n_in or n_out < 3:
+        return np.arange(n_in)
+
+    x, y = x.astype(np.float64), y.astype(np.float64)
+    edges = np.linspace(1, n_in - 1, n_out - 1).astype(np.int64)
+
+    # Average of each bucket (the last "next bucket" is the last point).
+    sums_x, sums_y = np.add.reduceat(x[1:n_in - 1], edges[:-1] - 1), np.add.reduceat(y[1:n_in - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n_in - 1
+    prev = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas = np.abs(
+            (x[prev] - avg_x[bucket + 1]) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y[bucket + 1] - y[prev])
+        )
+        prev = kept[bucket + 1] = start + int(np.argmax(areas))
+    return kept
+
+
+def minmax(x:np.ndarray, y:np.ndarray, n_out:int) -> np.ndarray:
+    '''
+    Purpose :
+        Keep the min & max point of each of (n_out // 2) equal-count buckets, plus
+        the first & last points. Keeps every peak and trough of a line.
+
+    Input   :
+        x     : Array. Sorted x values (e.g. dates as int64).
+        y     : Array. Y values (without NaN).
+        n_out : Int. Max number of points to keep.
+
+    Output  :
+        Array. Sorted indices of the points to keep.
+    '''
+
+    n_in = len(x)
+    if n_out >= n_in or n_out < 4:
+        return np.arange(n_in)
+
+    n_buckets = (n_out - 2) // 2
+    buckets = np.arange(n_in) * n_buckets // n_in
+
+    # Within each bucket, the first point sorted by y is the min and the last is the max.
+    order = np.lexsort((y, buckets))
+    starts = np.searchsorted(buckets[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n_in) - 1
+    return np.unique(np.concatenate([[0, n_in - 1], order[starts], order[ends]]))
+
+
+DOWNSAMPLE_METHODS:Dict[Text, Callable] = {'lttb': lttb, 'minmax': minmax}
+
+
+def downsample(data:pd.DataFrame, n_out:int, method:Optional[Text]='lttb', y:Text='value') -> pd.DataFrame:
+    '''
+    Purpose :
+        Decimate a series (date index, sorted) to about (n_out) points, e.g. one
+        point per pixel of the chart width. Meant to run after the rows are filtered
+        to the date range, so the points are spent on the visible range.
+
+    Input   :
+        data   : Dataframe. Series with a date index.
+        n_out  : Int. Number of points to keep.
+        method : Str. Must be lttb / minmax (None to keep every point).
+        y      : Str. Column of the values.
+
+    Output  :
+        Dataframe. Rows kept (NaN rows are dropped when decimating).
+    '''
+
+    if method is None or len(data) <= n_out:
+        return data
+
+    data = data.loc[data[y].notna()]
+    kept = DOWNSAMPLE_METHODS[method](data.index.asi8, data[y].to_numpy(), n_out)
+    logger.debug(f'----- Downsampled ({len(data)}) to ({len(kept)}) points with ({method}).')
+    return data.iloc[kept]
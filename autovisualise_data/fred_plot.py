@@ -3,15 +3,9 @@
 # %%
 import os, logging
 import pandas as pd
-import streamlit as st
-import holoviews as hv
-import hvplot.pandas
 
 from typing import Dict, List, Text, Optional, Tuple
 
-# Holoview config. 
-hv.extension('bokeh')
-
 # Pandas config. 
 pd.options.display.float_format = '{:,.5f}'.format 
 
@@ -21,13 +15,16 @@ from config.config import (
     FRED_DATA_ABS_DIR, 
 )
 from config.config_logger import setup_logger
+from config import config_dashboard
 from config.config_dashboard import (
     HV_PN_WIDTH, 
-    HV_PN_HEIGHT, 
-    HV_TOOLS_FOR_ECO, 
     XLIM, 
-    V_SPAN_ECO_RECESSION
 )
+from autovisualise_data.data_cache import DATA_CACHE, cache_in
+from autovisualise_data.plot_backend import uses_holoviews
+from autovisualise_data.tracing import traced
+from autovisualise_data.downsample import downsample
+from autovisualise_data.fred_store import get_fred_mtime
 
 
 # --------------------------------------------------------------
@@ -43,7 +40,28 @@ logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEP
 # Read File.
 # --------------------------------------------------------------
 
-@st.cache(persist=True)
+@cache_in(DATA_CACHE)
+@traced('read_fred_pickle')
+def load_pickle(filename:Text, mtime:float) -> Dict[Text, pd.DataFrame]: 
+
+    '''
+    Purpose : 
+        Same as (read_pickle) but cached in memory. The modified time of the pickle 
+        file is part of the cache key, so a data update reads the file again. 
+    '''
+
+    # The path is resolved from the absolute FRED directory (no change of working directory). 
+    try:
+        with open(os.path.join(FRED_DATA_ABS_DIR, filename), 'rb') as in_file: 
+            fred_data = pd.read_pickle(in_file) 
+            logger.debug(f'----- Read data from ({filename}) file.') 
+    except: 
+        logger.exception(f'----- Exception occurs while trying to read data from ({filename}) file.') 
+        raise 
+
+    return fred_data 
+
+
 def read_pickle(filename:Text) -> Dict[Text, pd.DataFrame]: 
     
     '''
@@ -51,8 +69,7 @@ def read_pickle(filename:Text) -> Dict[Text, pd.DataFrame]:
         Read pickle file which contains a dict obj. 
 
     Input   :
-        eco_data_dir: Str. Full absolute path for the ETF directory. 
-        filename    : Str. Name of the pickle file. 
+        filename    : Str. Name of the pickle file within the FRED directory. 
                           
     Output  : 
         Dict obj containing multiple dataframes. 
@@ -60,26 +77,7 @@ def read_pickle(filename:Text) -> Dict[Text, pd.DataFrame]:
 
     logger.info('Start running (read_pickle) function.')
 
-    # REFINE: Need to test how the data is being extracted on Streamlit Sharing. 
-    # Change directory. 
-    default_dir = os.getcwd()
-    os.chdir(os.environ['DATA_ABS_DIR'])
-    logger.debug(f'----- Changed to the data warehouse directory.') 
-    print(f'---------- {os.getcwd()}')
-    print(f'---------- {FRED_DATA_ABS_DIR}/{filename}')
-
-    try:
-        with open(f'{FRED_DATA_ABS_DIR}/{filename}', 'rb') as in_file: 
-            fred_data = pd.read_pickle(in_file) 
-            logger.debug(f'----- Read data from ({filename}) file.') 
-    except: 
-        logger.exception(f'----- Exception occurs while trying to read data from ({filename}) file.') 
-
-    # Change back to the original directory. 
-    os.chdir(default_dir) 
-    logger.debug(f'----- Changed to original directory.') 
-
-    return fred_data 
+    return load_pickle(filename, get_fred_mtime(filename)) 
 
 
 # %%
@@ -91,13 +89,13 @@ def read_pickle(filename:Text) -> Dict[Text, pd.DataFrame]:
 def combine_plots(plot_func):
     logger.info('Start running (combine_plots) decorator.')
 
-    def wrapper(eco_data, eco_cat, date_range, show_recession):
+    def wrapper(eco_data, eco_cat, date_range, show_recession, downsample_method=None):
         # Try creating a plot to see if the data exist. 
         try:
-            plot_main = plot_func(eco_data, eco_cat[0], date_range, show_recession)
+            plot_main = plot_func(eco_data, eco_cat[0], date_range, show_recession, downsample_method)
             plot_add = None
             if show_recession:
-                plot_main = plot_main * V_SPAN_ECO_RECESSION
+                plot_main = plot_main * config_dashboard.V_SPAN_ECO_RECESSION
                 logger.debug('----- Added economic recession for plot.')
         except Exception: 
             logger.warning(f'----- Data is unavaialble for ({plot_func}).') 
@@ -105,10 +103,7 @@ def combine_plots(plot_func):
         
         # If two (max) economic data is selected, creating additional plot. 
         if len(eco_cat) >= 2: 
-            plot_add = eco_data[eco_cat[1]].hvplot(
-                kind='line', y='value', label=eco_cat[1], width=HV_PN_WIDTH, 
-                xlim=date_range, shared_axes=False, tools=HV_TOOLS_FOR_ECO, 
-            )
+            plot_add = plot_line(eco_data[eco_cat[1]], eco_cat[1], date_range, downsample_method)
             logger.debug('----- Added additional economic data plot.')
 
             return (plot_main * plot_add).opts(legend_position='top')
@@ -123,20 +118,49 @@ def combine_plots(plot_func):
 # Plot Economic Data
 # --------------------------------------------------------------
 
+@uses_holoviews
+def plot_line(
+        series_data:pd.DataFrame, 
+        label:Text, 
+        date_range:Tuple=XLIM, 
+        downsample_method:Optional[Text]=None, 
+    ):
+
+    '''
+    Purpose : 
+        Plot the line of an economic data series, optionally decimated to about one 
+        point per pixel of the chart width after filtering the rows to the date range. 
+
+    Input   :
+        series_data       : Dataframe. Series with a date index and a value column. 
+        label             : Str. Name of the series. 
+        date_range        : Tuple. Start & end date. 
+        downsample_method : Str. Must be lttb / minmax (None to plot every point). 
+                          
+    Output  : 
+        Holoview plot obj. 
+    '''
+
+    data = series_data.loc[pd.Timestamp(date_range[0]):pd.Timestamp(date_range[1])]
+    return downsample(data, HV_PN_WIDTH, downsample_method).hvplot(
+        kind='line', y='value', label=label, width=HV_PN_WIDTH, 
+        xlim=date_range, shared_axes=False, tools=config_dashboard.HV_TOOLS_FOR_ECO, 
+    )
+
+
+@uses_holoviews
 @combine_plots
 def plot_eco_trend(
         eco_data:pd.DataFrame, 
         eco_cat:List[Text], 
         date_range:Tuple=XLIM, 
-        show_recession:bool=False
+        show_recession:bool=False, 
+        downsample_method:Optional[Text]=None, 
     ):
 
     logger.info('Start running (plot_eco_trend) function.')
 
-    line_eco_trend = eco_data[eco_cat].hvplot(
-        kind='line', y='value', label=eco_cat, width=HV_PN_WIDTH,
-        xlim=date_range, shared_axes=False, tools=HV_TOOLS_FOR_ECO
-    )
+    line_eco_trend = plot_line(eco_data[eco_cat], eco_cat, date_range, downsample_method)
     logger.debug('----- Plotted (plot_eco_trend).') 
 
     return  line_eco_trend
@@ -0,0 +1,251 @@
+
+
+# %%
+import os, json, logging, argparse
+import pandas as pd
+import pyarrow as pa
+
+from datetime import datetime
+from typing import Dict, List, Optional, Text, Tuple
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    FRED_DATA_ABS_DIR,
+    COLUMNAR_STORE_DIRNAME,
+    COLUMNAR_STORE_EXT,
+    FRED_STORE_BATCH_ROWS,
+)
+from config.config_logger import setup_logger
+from autovisualise_data.data_cache import DATA_CACHE, cache_in
+from autovisualise_data.tracing import traced
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Path Helpers.
+# --------------------------------------------------------------
+
+def get_store_dir(filename:Text='fred_data.pickle') -> Text:
+    '''
+    Purpose :
+        Output the path to the series store directory of a FRED pickle file.
+    '''
+
+    return os.path.join(FRED_DATA_ABS_DIR, COLUMNAR_STORE_DIRNAME, os.path.splitext(filename)[0])
+
+
+def get_series_path(series:Text, filename:Text='fred_data.pickle') -> Text:
+    '''
+    Purpose :
+        Output the path to the Arrow IPC file of a FRED series.
+    '''
+
+    return os.path.join(get_store_dir(filename), f'{series}{COLUMNAR_STORE_EXT}')
+
+
+def get_fred_mtime(filename:Text='fred_data.pickle') -> float:
+    '''
+    Purpose :
+        Output the modified time of a FRED pickle file (or 0 if it doesn't exist).
+    '''
+
+    try:
+        return os.path.getmtime(os.path.join(FRED_DATA_ABS_DIR, filename))
+    except OSError:
+        return 0.
+
+
+def is_store_fresh(filename:Text='fred_data.pickle') -> bool:
+    '''
+    Purpose :
+        Check whether the series store exists and isn't older than its pickle file.
+    '''
+
+    try:
+        return os.path.getmtime(get_store_dir(filename)) >= get_fred_mtime(filename)
+    except OSError:
+        return False
+
+
+# %%
+# --------------------------------------------------------------
+# Convert Pickle To Series Store.
+# --------------------------------------------------------------
+
+def write_series(series_data:pd.DataFrame, series_path:Text) -> int:
+    '''
+    Purpose :
+        Write a FRED series (sorted by date) into an uncompressed Arrow IPC file
+        with one record batch per (FRED_STORE_BATCH_ROWS) rows. The first & last
+        date of every batch are kept in the schema metadata, so a reader can skip
+        the batches outside of a date range.
+
+    Input   :
+        series_data : Dataframe. Series with a date index and a value column.
+        series_path : Str. Path to the Arrow IPC file.
+
+    Output  :
+        Int. Number of record batches written.
+    '''
+
+    series_data = series_data.sort_index()
+    table = pa.Table.from_pandas(series_data)
+    batches = table.to_batches(max_chunksize=FRED_STORE_BATCH_ROWS)
+
+    dates = series_data.index.asi8
+    bounds, start = [], 0
+    for batch in batches:
+        bounds.append([int(dates[start]), int(dates[start + batch.num_rows - 1])])
+        start += batch.num_rows
+
+    schema = table.schema.with_metadata(dict(table.schema.metadata, batch_bounds=json.dumps(bounds)))
+    with pa.OSFile(f'{series_path}.tmp', 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    os.replace(f'{series_path}.tmp', series_path)
+    return len(batches)
+
+
+def convert_fred_pickle(filename:Text='fred_data.pickle', force:bool=False) -> List[Text]:
+    '''
+    Purpose :
+        Convert a FRED pickle file (dict obj of series) into one Arrow IPC file per series.
+
+    Input   :
+        filename : Str. Name of the pickle file within the FRED directory.
+        force    : Boo. To rewrite the store even if it's up to date.
+
+    Output  :
+        List obj containing the series that were written.
+    '''
+
+    logger.info('Start running (convert_fred_pickle) function.')
+
+    if not force and is_store_fresh(filename):
+        logger.debug(f'----- Series store for ({filename}) is up to date.')
+        return []
+
+    with open(os.path.join(FRED_DATA_ABS_DIR, filename), 'rb') as in_file:
+        fred_data = pd.read_pickle(in_file)
+
+    store_dir = get_store_dir(filename)
+    os.makedirs(store_dir, exist_ok=True)
+    for series, series_data in fred_data.items():
+        n_batches = write_series(series_data, get_series_path(series, filename))
+        logger.debug(f'----- Wrote ({series}) series in ({n_batches}) batches.')
+
+    # Touch the directory so its mtime marks the time of conversion.
+    os.utime(store_dir)
+    return list(fred_data.keys())
+
+
+# %%
+# --------------------------------------------------------------
+# Read Series Store.
+# --------------------------------------------------------------
+
+@traced()
+def read_series(
+        series:Text,
+        date_range:Optional[Tuple[datetime, datetime]]=None,
+        filename:Text='fred_data.pickle',
+    ) -> pd.DataFrame:
+
+    '''
+    Purpose :
+        Read a FRED series from the store with memory mapping. Only the record batches
+        overlapping the date range are read, then the rows are sliced to the range.
+
+    Input   :
+        series     : Str. Name of the series such as unemployment.
+        date_range : Tuple. Start & end date (the whole series if None).
+        filename   : Str. Name of the pickle file the store was converted from.
+
+    Output  :
+        Dataframe. Series with a date index and a value column.
+    '''
+
+    series_path = get_series_path(series, filename)
+    if not os.path.exists(series_path):
+        raise KeyError(series)
+
+    reader = pa.ipc.open_file(pa.memory_map(series_path, 'r'))
+    bounds = json.loads(reader.schema.metadata[b'batch_bounds'])
+    if date_range is None:
+        batch_idxs = range(len(bounds))
+    else:
+        start, end = (pd.Timestamp(date).value for date in date_range)
+        batch_idxs = [idx for idx, (first, last) in enumerate(bounds) if last >= start and first <= end]
+
+    series_data = pa.Table.from_batches([reader.get_batch(idx) for idx in batch_idxs], schema=reader.schema).to_pandas()
+    logger.debug(f'----- Read ({len(batch_idxs)}/{len(bounds)}) batches of ({series}) series.')
+
+    if date_range is not None:
+        series_data = series_data.loc[pd.Timestamp(date_range[0]):pd.Timestamp(date_range[1])]
+    return series_data
+
+
+@cache_in(DATA_CACHE)
+def load_series(series:Text, date_range:Optional[Tuple], filename:Text, mtime:float) -> pd.DataFrame:
+    '''
+    Purpose :
+        Same as (read_series) but cached in memory. The modified time of the pickle
+        file is part of the cache key, so a data update reads the series again. If
+        the store is outdated, the series is sliced from the (cached) pickle file.
+    '''
+
+    if is_store_fresh(filename):
+        return read_series(series, date_range, filename)
+
+    # Imported here since (fred_plot) imports this module (circular import).
+    from autovisualise_data.fred_plot import read_pickle
+    series_data = read_pickle(filename)[series]
+    return series_data.loc[pd.Timestamp(date_range[0]):pd.Timestamp(date_range[1])] if date_range else series_data
+
+
+def read_fred_series(
+        series_list:List[Text],
+        date_range:Optional[Tuple[datetime, datetime]]=None,
+        filename:Text='fred_data.pickle',
+    ) -> Dict[Text, pd.DataFrame]:
+
+    '''
+    Purpose :
+        Read only the selected FRED series within a date range.
+
+    Input   :
+        series_list : List. Names of the series such as unemployment.
+        date_range  : Tuple. Start & end date (the whole series if None).
+        filename    : Str. Name of the FRED pickle file.
+
+    Output  :
+        Dict obj containing a dataframe for each series.
+    '''
+
+    date_range = tuple(date_range) if date_range is not None else None
+    mtime = get_fred_mtime(filename)
+    return {series: load_series(series, date_range, filename, mtime) for series in series_list or []}
+
+
+# %%
+# --------------------------------------------------------------
+# Command Line.
+# --------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert the FRED pickle file into a per-series columnar store.')
+    parser.add_argument('--filename', default='fred_data.pickle', help='Name of the pickle file within the FRED directory.')
+    parser.add_argument('--force', action='store_true', help='Rewrite the store even if it is up to date.')
+    args = parser.parse_args()
+
+    written = convert_fred_pickle(args.filename, args.force)
+    print(f'{len(written)} series written into {get_store_dir(args.filename)}' if written else 'Series store is up to date.')
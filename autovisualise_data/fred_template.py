@@ -0,0 +1,169 @@
+
+
+# %%
+import json, logging
+import pandas as pd
+
+from bokeh.core.properties import value
+from bokeh.embed import json_item
+from bokeh.models import BoxAnnotation, ColumnDataSource, HoverTool, Legend, LegendItem
+from bokeh.plotting import figure
+from bokeh.util.serialization import convert_datetime_type, transform_column_source_data
+from typing import Dict, List, Optional, Text, Tuple
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH
+from config.config_logger import setup_logger
+from config.config_dashboard import (
+    HV_PN_WIDTH,
+    HOVER_ECO_TOOLTIPS,
+    HOVER_ECO_FORMATTERS,
+    XLIM,
+    ECO_RECESSION_PERIODS,
+    ECO_RECESSION_STYLE,
+    FRED_LINE_COLORS,
+)
+from autovisualise_data.chart_cache import CHART_CACHE
+from autovisualise_data.data_cache import cache_in
+from autovisualise_data.downsample import downsample
+from autovisualise_data.tracing import traced
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Chart Template.
+# --------------------------------------------------------------
+
+# Same height as the holoview line plots.
+FRED_TEMPLATE_HEIGHT = 300
+
+
+@cache_in(CHART_CACHE)
+def build_template(n_lines:int, show_recession:bool) -> Dict:
+    '''
+    Purpose :
+        Build the bokeh chart of the FRED tab without data: axes, hover tool,
+        recession spans, legend and styling, with an empty data source per line.
+        It's built & serialised once, then filled with the data of each request.
+
+    Input   :
+        n_lines        : Int. Number of lines (1 or 2).
+        show_recession : Boo. To include the recession spans.
+
+    Output  :
+        Dict obj containing the serialised bokeh JSON item (item) and the ids of
+        the models filled per request (sources, legend_items, x_range, title).
+    '''
+
+    logger.info(f'Start running (build_template) function for ({n_lines}) lines.')
+
+    plot = figure(
+        plot_width=HV_PN_WIDTH, plot_height=FRED_TEMPLATE_HEIGHT, x_axis_type='datetime',
+        x_axis_label='date', y_axis_label='value', x_range=XLIM,
+        tools=['save', 'pan', 'wheel_zoom', 'box_zoom', 'reset', 'crosshair'], min_border=5,
+    )
+    plot.add_tools(HoverTool(tooltips=HOVER_ECO_TOOLTIPS, formatters=HOVER_ECO_FORMATTERS, mode='vline'))
+    plot.toolbar.logo = None
+
+    # One annotation per span, drawn under the lines.
+    if show_recession:
+        for start, end in ECO_RECESSION_PERIODS:
+            plot.add_layout(BoxAnnotation(left=start, right=end, level='glyph', **ECO_RECESSION_STYLE))
+
+    sources, legend_items = [], []
+    for idx in range(n_lines):
+        source = ColumnDataSource(data={'date': [], 'value': []})
+        line = plot.line(x='date', y='value', source=source, line_width=2, line_color=FRED_LINE_COLORS[idx])
+        sources.append(source.id)
+        legend_items.append(LegendItem(label=value(''), renderers=[line]))
+
+    # A single line is named by the title and several lines by a legend above the chart.
+    if n_lines > 1:
+        plot.add_layout(Legend(items=legend_items, orientation='horizontal', click_policy='mute'), 'above')
+
+    return {
+        'item': json.dumps(json_item(plot)), 'sources': sources,
+        'legend_items': [item.id for item in legend_items] if n_lines > 1 else [],
+        'x_range': plot.x_range.id, 'title': plot.title.id,
+    }
+
+
+# %%
+# --------------------------------------------------------------
+# Fill Template.
+# --------------------------------------------------------------
+
+def get_line_data(series_data:pd.DataFrame, date_range:Tuple, downsample_method:Optional[Text]=None) -> Dict:
+    '''
+    Purpose :
+        Filter a series to the date range, decimate it to about one point per pixel
+        of the chart width and output the columns of its data source.
+    '''
+
+    data = downsample(
+        series_data.loc[pd.Timestamp(date_range[0]):pd.Timestamp(date_range[1])], HV_PN_WIDTH, downsample_method
+    )
+    return {'date': data.index.values, 'value': data['value'].to_numpy(dtype=float)}
+
+
+@traced()
+def render_eco_trend(
+        eco_data:Dict[Text, pd.DataFrame],
+        eco_cat:List[Text],
+        date_range:Tuple=XLIM,
+        show_recession:bool=False,
+        downsample_method:Optional[Text]=None,
+    ) -> Optional[Text]:
+
+    '''
+    Purpose :
+        Render the FRED chart of (fred_plot.plot_eco_trend) from the prebuilt template:
+        only the data sources, the legend / title and the date range change per request.
+
+    Input   :
+        eco_data          : Dict obj containing a dataframe per series.
+        eco_cat           : List obj containing the selected series (max 2).
+        date_range        : Tuple. Start & end date.
+        show_recession    : Boo. To include the recession spans.
+        downsample_method : Str. Must be lttb / minmax (None to plot every point).
+
+    Output  :
+        Str. Serialised bokeh JSON item (or None if no series is selected / available).
+    '''
+
+    logger.info('Start running (render_eco_trend) function.')
+
+    eco_cat = list(eco_cat or [])[:len(FRED_LINE_COLORS)]
+    try:
+        lines = [get_line_data(eco_data[series], date_range, downsample_method) for series in eco_cat]
+    except KeyError:
+        logger.warning(f'----- Data is unavaialble for ({eco_cat}).')
+        return None
+    if not lines:
+        return None
+
+    # The template JSON is patched by model id, so no bokeh model is built per request.
+    template = build_template(len(lines), show_recession)
+    item = json.loads(template['item'])
+    models = {model['id']: model['attributes'] for model in item['doc']['roots']['references']}
+    for source_id, data in zip(template['sources'], lines):
+        models[source_id]['data'] = transform_column_source_data(data)
+    for item_id, series in zip(template['legend_items'], eco_cat):
+        models[item_id]['label'] = value(series)
+    if len(lines) == 1:
+        models[template['title']]['text'] = eco_cat[0]
+
+    models[template['x_range']].update(
+        start=convert_datetime_type(pd.Timestamp(date_range[0])), end=convert_datetime_type(pd.Timestamp(date_range[1])), 
+    )
+
+    logger.debug('----- Rendered (render_eco_trend) from the template.')
+    return json.dumps(item)
@@ -0,0 +1,129 @@
+
+
+# %%
+import threading, weakref
+import numpy as np
+import pandas as pd
+
+from typing import Any, Dict, Text, Tuple
+
+
+# %%
+# --------------------------------------------------------------
+# Group Index.
+# --------------------------------------------------------------
+
+class GroupIndex:
+    '''
+    Purpose :
+        Index the rows of a pivot table by the values of a column (e.g. the week of
+        daily_by_weekday or the holiday_category of compiled_holiday). The offsets of
+        each group within the rows sorted by the column (stable, so each group keeps
+        its order) are kept, so a group is an O(1) row slice rather than a boolean
+        mask over the whole column.
+        Tables whose groups are already contiguous (the pivot tables are sorted by
+        period) are sliced in place (a view, no copy), else the rows of the group are
+        taken by position. The index keeps no reference to the table, which is passed
+        on each slice, so it never keeps an evicted table alive.
+
+    Input   :
+        df  : Dataframe. Pivot table.
+        col : Str. Column to group the rows by.
+    '''
+
+    def __init__(self, df:pd.DataFrame, col:Text):
+        codes, uniques = pd.factorize(df[col], sort=False)
+
+        # The codes follow the order of first appearance, so they only increase if each group is contiguous.
+        self.is_contiguous = bool(np.all(codes[1:] >= codes[:-1]))
+        if self.is_contiguous:
+            self.order, sorted_codes = None, codes
+        else:
+            self.order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[self.order]
+
+        # Rows with a null value (code -1) are sorted first and aren't in any group.
+        group_codes = np.arange(len(uniques))
+        starts = np.searchsorted(sorted_codes, group_codes, side='left')
+        stops = np.searchsorted(sorted_codes, group_codes, side='right')
+        self.offsets: Dict[Any, Tuple[int, int]] = dict(zip(uniques.tolist(), zip(starts.tolist(), stops.tolist())))
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def get(self, df:pd.DataFrame, value) -> pd.DataFrame:
+        '''
+        Purpose :
+            Output the rows of a group (same rows, order & index labels as the
+            boolean mask df[col] == value), or no rows if the value isn't found.
+
+        Input   :
+            df    : Dataframe. Pivot table the index was built from.
+            value : Value of the column.
+        '''
+
+        start, stop = self.offsets.get(value, (0, 0))
+        if self.order is None:
+            return df.iloc[start:stop]
+        return df.take(self.order[start:stop])
+
+
+# %%
+# --------------------------------------------------------------
+# Group Index Per Table.
+# --------------------------------------------------------------
+
+# Group indexes (by column) of each table, kept for as long as the table is alive. The tables are
+# shared through the data cache, so an index is built once per loaded table and dropped with it.
+_GROUP_INDEXES: Dict[int, Tuple[weakref.ref, Dict[Text, GroupIndex]]] = {}
+_GROUP_INDEXES_LOCK = threading.Lock()
+
+
+def _drop_group_indexes(table_id:int):
+    with _GROUP_INDEXES_LOCK:
+        _GROUP_INDEXES.pop(table_id, None)
+
+
+def get_group_index(df:pd.DataFrame, col:Text) -> GroupIndex:
+    '''
+    Purpose :
+        Output the group index of a table by a column, built on first use.
+
+    Input   :
+        df  : Dataframe. Pivot table.
+        col : Str. Column to group the rows by.
+
+    Output  :
+        GroupIndex obj.
+    '''
+
+    with _GROUP_INDEXES_LOCK:
+        entry = _GROUP_INDEXES.get(id(df))
+        if entry is not None and entry[0]() is df and col in entry[1]:
+            return entry[1][col]
+
+    group_index = GroupIndex(df, col)
+    with _GROUP_INDEXES_LOCK:
+        entry = _GROUP_INDEXES.get(id(df))
+        if entry is None or entry[0]() is not df:
+            entry = _GROUP_INDEXES[id(df)] = (weakref.ref(df), {})
+            weakref.finalize(df, _drop_group_indexes, id(df))
+        return entry[1].setdefault(col, group_index)
+
+
+def select_group(df:pd.DataFrame, col:Text, value) -> pd.DataFrame:
+    '''
+    Purpose :
+        Output the rows of a table where a column equals a value, as a slice from
+        the group index of the table (in place of df.loc[df[col] == value, :].copy()).
+
+    Input   :
+        df    : Dataframe. Pivot table.
+        col   : Str. Column to filter by such as week or holiday_category.
+        value : Value of the column such as a week number or a holiday key.
+
+    Output  :
+        Dataframe. Rows of the group (not to be modified in place).
+    '''
+
+    return get_group_index(df, col).get(df, value)
@@ -0,0 +1,865 @@
+
+
+# %%
+import os, json, logging, re, argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Text, Optional, Tuple
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    DATASET_ABS_DIR,
+    COLUMNAR_STORE_DIRNAME,
+    COLUMNAR_STORE_EXT,
+    PANEL_STORE_FILENAME,
+    PIVOT_PICKLE_FILENAMES,
+    ETF_EQUITY,
+    COMPACT_DTYPES,
+    COMPACT_CATEGORY_MAX_RATIO,
+    FREQ_GROUP_COLS,
+    OVERALL_VOL_FREQS,
+    OVERALL_VOL_SUFFIXES,
+)
+from config.config_logger import setup_logger
+from autovisualise_data.data_cache import DATA_CACHE
+from autovisualise_data.tracing import traced
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Path Helpers.
+# --------------------------------------------------------------
+
+def get_storage_dir(etf_dir:Text, ticker:Text) -> Text:
+    '''
+    Purpose :
+        Output the path to the directory that contains all the pickle files for a ticker.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+
+    Output  :
+        Str. Path to the storage directory.
+    '''
+
+    return os.path.join(DATASET_ABS_DIR, etf_dir, ticker, 'storage')
+
+
+def get_bundle_name(filename:Text, get_idx:Optional[int]=None) -> Text:
+    '''
+    Purpose :
+        Output the name of the columnar bundle for a pickle file. Pickle files
+        containing a tuple of tuples are split into one bundle per inner tuple.
+
+    Input   :
+        filename: Str. Name of the pickle file such as pivot_stats.pickle.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        Str. Bundle name such as pivot_stats or pivot_unique_days_0.
+    '''
+
+    bundle = os.path.splitext(filename)[0]
+    return f'{bundle}_{get_idx}' if isinstance(get_idx, int) else bundle
+
+
+def get_bundle_dir(etf_dir:Text, ticker:Text, filename:Text, get_idx:Optional[int]=None) -> Text:
+    '''
+    Purpose :
+        Output the path to the columnar bundle directory for a pickle file.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        Str. Path to the bundle directory.
+    '''
+
+    return os.path.join(
+        get_storage_dir(etf_dir, ticker), COLUMNAR_STORE_DIRNAME, get_bundle_name(filename, get_idx)
+    )
+
+
+def is_bundle_fresh(etf_dir:Text, ticker:Text, filename:Text, get_idx:Optional[int]=None) -> bool:
+    '''
+    Purpose :
+        Check whether the columnar bundle exists and isn't older than its pickle file.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        Boo. True if the bundle can be read in place of the pickle file.
+    '''
+
+    bundle_dir = get_bundle_dir(etf_dir, ticker, filename, get_idx)
+    try:
+        pickle_mtime = os.path.getmtime(os.path.join(get_storage_dir(etf_dir, ticker), filename))
+        return os.path.getmtime(bundle_dir) >= pickle_mtime
+    except OSError:
+        return False
+
+
+def get_source_mtime(etf_dir:Text, ticker:Text, filename:Text) -> float:
+    '''
+    Purpose :
+        Output the modified time of a pickle file, to invalidate anything derived from it.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+
+    Output  :
+        Float. Modified time (or 0 if the file doesn't exist).
+    '''
+
+    try:
+        return os.path.getmtime(os.path.join(get_storage_dir(etf_dir, ticker), filename))
+    except OSError:
+        return 0.
+
+
+# %%
+# --------------------------------------------------------------
+# Compact Dtypes.
+# --------------------------------------------------------------
+
+# Integer dtypes a column is downcast to, smallest first (signed, so differences can't wrap around).
+COMPACT_INT_DTYPES = [np.int8, np.int16, np.int32]
+
+
+def get_compact_int_dtype(values:np.ndarray) -> Optional[type]:
+    '''
+    Purpose :
+        Output the smallest integer dtype holding every value of an integer column
+        (or None if it can't be smaller).
+    '''
+
+    min_value, max_value = values.min(), values.max()
+    for int_dtype in COMPACT_INT_DTYPES:
+        if np.dtype(int_dtype).itemsize >= values.dtype.itemsize:
+            return None
+        if np.iinfo(int_dtype).min <= min_value and max_value <= np.iinfo(int_dtype).max:
+            return int_dtype
+    return None
+
+
+def is_repeated_strings(values:np.ndarray) -> bool:
+    '''
+    Purpose :
+        Check whether an object column only holds strings, repeated enough to be
+        stored as a categorical (codes plus the unique strings).
+    '''
+
+    return (
+        pd.api.types.infer_dtype(values, skipna=True) == 'string'
+        and len(pd.unique(values)) <= COMPACT_CATEGORY_MAX_RATIO * len(values)
+    )
+
+
+def normalise_dtypes(df:pd.DataFrame) -> pd.DataFrame:
+    '''
+    Purpose :
+        Downcast the columns of a dataframe without losing any value: integers to
+        int8 / int16 / int32, floats that float32 holds exactly to float32 and
+        repeated strings to a categorical. Filters such as
+        (pivot_data['holiday_category'] == key) then compare the categorical codes.
+        Does nothing if COMPACT_DTYPES is off.
+
+    Input   :
+        df : Dataframe. Pivot table or raw ticker frame.
+
+    Output  :
+        Dataframe (the same obj if no column can be downcast).
+    '''
+
+    if not COMPACT_DTYPES or df.empty:
+        return df
+
+    arrays, compact = {}, {}
+    float_pos = []
+    for pos, (_, series) in enumerate(df.items()):
+        arrays[pos] = series.array
+        dtype = series.dtype
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype == np.float64:
+            float_pos.append(pos)
+        elif dtype.kind in 'iu':
+            int_dtype = get_compact_int_dtype(series.to_numpy())
+            if int_dtype is not None:
+                compact[pos] = series.to_numpy().astype(int_dtype)
+        elif dtype == object and is_repeated_strings(series.to_numpy()):
+            compact[pos] = pd.Categorical(series.to_numpy())
+
+    # The float columns are checked at once (the float32 round trip must give the same values).
+    if float_pos:
+        block = df.iloc[:, float_pos].to_numpy()
+        with np.errstate(over='ignore', invalid='ignore'):
+            block_32 = block.astype(np.float32)
+            is_exact = ((block_32 == block) | np.isnan(block)).all(axis=0)
+        for idx in np.flatnonzero(is_exact):
+            compact[float_pos[idx]] = block_32[:, idx]
+
+    if not compact:
+        return df
+
+    # Build the frame at once (casting column by column with astype is a few times slower).
+    compact_df = pd.DataFrame({**arrays, **compact}, index=df.index, copy=False)
+    compact_df.columns = df.columns
+    return compact_df
+
+
+def normalise_frames(frames:Dict[Text, pd.DataFrame]) -> Dict[Text, pd.DataFrame]:
+    '''
+    Purpose :
+        Same as (normalise_dtypes) for every dataframe of a dict obj (e.g. the pivot
+        tables of a pickle file). Other objs are kept as they are.
+    '''
+
+    return {key: normalise_dtypes(df) if isinstance(df, pd.DataFrame) else df for key, df in frames.items()}
+
+
+# %%
+# --------------------------------------------------------------
+# Derived Tables.
+# --------------------------------------------------------------
+
+# Columns of the above & below average volume counts (averaged by the overall volume counts table).
+VOL_COUNTS_COLS = ['abv_avg_vol_counts', 'blw_avg_vol_counts']
+
+
+def list_derived_keys(keys:List[Text]) -> List[Text]:
+    '''
+    Purpose :
+        Output the keys of the tables that can be derived from the tables of a bundle
+        (the overall volume tables of the volume bundle, so the other bundles have none).
+    '''
+
+    return [
+        f'{freq}{suffix}' for freq in OVERALL_VOL_FREQS for suffix in OVERALL_VOL_SUFFIXES
+        if freq in keys and f'{freq}_avg_vol_row' in keys
+    ]
+
+
+def derive_table(pivot_stats:Mapping, key:Text) -> pd.DataFrame:
+    '''
+    Purpose :
+        Reduce the volume tables of a frequency into an overall volume table with a
+        single groupby (in place of averaging by an index level on each plot):
+        - {freq}_overall_vol_row    : average volume by trading day / weekday over
+          every month / week (indexed by trading day / weekday).
+        - {freq}_overall_vol_counts : above & below average counts by month / week
+          and trading day / weekday (sorted by both, indexed by trading day / weekday
+          so the rows of a month / week are plotted as sliced).
+
+    Input   :
+        pivot_stats : Dict. Containing the pivot tables of the volume bundle.
+        key         : Str. Key of the derived table such as daily_by_weekday_overall_vol_row.
+
+    Output  :
+        Dataframe.
+    '''
+
+    for freq in OVERALL_VOL_FREQS:
+        if key == f'{freq}_overall_vol_row':
+            _, col = FREQ_GROUP_COLS[freq]
+            return pivot_stats[f'{freq}_avg_vol_row'].groupby(col, sort=True)[['avg_vol_row']].mean()
+        if key == f'{freq}_overall_vol_counts':
+            return pivot_stats[freq].groupby(FREQ_GROUP_COLS[freq], sort=True)[VOL_COUNTS_COLS].mean().reset_index(level=0)
+    raise KeyError(key)
+
+
+def add_derived_tables(pivot_stats:Dict[Text, pd.DataFrame]) -> Dict[Text, pd.DataFrame]:
+    '''
+    Purpose :
+        Output the dict obj of pivot tables with the derived tables added (if any).
+    '''
+
+    derived_keys = list_derived_keys(list(pivot_stats.keys()))
+    if not derived_keys:
+        return pivot_stats
+    return {**pivot_stats, **{key: derive_table(pivot_stats, key) for key in derived_keys}}
+
+
+# %%
+# --------------------------------------------------------------
+# Convert Pickle To Columnar Store.
+# --------------------------------------------------------------
+
+def read_bundles(etf_dir:Text, ticker:Text, filename:Text) -> Dict[Optional[int], Dict[Text, pd.DataFrame]]:
+    '''
+    Purpose :
+        Read the dict obj containing the statistics data from a pickle file (tuple of
+        dict obj, or tuple of tuples which is split into one bundle per inner tuple),
+        with the derived tables added.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+
+    Output  :
+        Dict obj containing the pivot tables for each index of the inner tuple obj (or None).
+    '''
+
+    with open(os.path.join(get_storage_dir(etf_dir, ticker), filename), 'rb') as in_file:
+        pickle_obj = pd.read_pickle(in_file)
+
+    if isinstance(pickle_obj[0], tuple):
+        return {idx: add_derived_tables(inner_obj[1]) for idx, inner_obj in enumerate(pickle_obj)}
+    return {None: add_derived_tables(pickle_obj[1])}
+
+
+def write_bundle(pivot_stats:Dict[Text, pd.DataFrame], bundle_dir:Text) -> List[Text]:
+    '''
+    Purpose :
+        Write each pivot table (with compact dtypes) into its own uncompressed Arrow
+        IPC (feather) file so it can be memory-mapped and loaded on its own.
+
+    Input   :
+        pivot_stats : Dict. Containing multiple pivot tables (dataframes).
+        bundle_dir  : Str. Path to the bundle directory.
+
+    Output  :
+        List obj containing the keys that were written.
+    '''
+
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    for key, pivot_data in pivot_stats.items():
+        # Write into a temporary file first so a reader never sees a partial table.
+        table_path = os.path.join(bundle_dir, f'{key}{COLUMNAR_STORE_EXT}')
+        feather.write_feather(normalise_dtypes(pivot_data), f'{table_path}.tmp', compression='uncompressed')
+        os.replace(f'{table_path}.tmp', table_path)
+        logger.debug(f'----- Wrote ({key}) table into ({bundle_dir}).')
+
+    # Touch the directory so its mtime marks the time of conversion.
+    os.utime(bundle_dir)
+    return list(pivot_stats.keys())
+
+
+def convert_pickle(etf_dir:Text, ticker:Text, filename:Text, force:bool=False) -> List[Text]:
+    '''
+    Purpose :
+        Convert a pickle file (tuple of dict obj, or tuple of tuples) into columnar
+        bundles. Only the dict obj containing the statistics data is converted.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        force   : Boo. To rewrite the bundles even if they are up to date.
+
+    Output  :
+        List obj containing the names of the bundles that were written.
+    '''
+
+    logger.info('Start running (convert_pickle) function.')
+
+    written = []
+    for get_idx, pivot_stats in read_bundles(etf_dir, ticker, filename).items():
+        if not force and is_bundle_fresh(etf_dir, ticker, filename, get_idx):
+            logger.debug(f'----- Bundle for ({ticker}/{filename}) is up to date.')
+            continue
+
+        write_bundle(pivot_stats, get_bundle_dir(etf_dir, ticker, filename, get_idx))
+        written.append(get_bundle_name(filename, get_idx))
+    return written
+
+
+def list_tickers(etf_dir:Text) -> List[Text]:
+    '''
+    Purpose :
+        Output the ticker directories within an ETF directory.
+    '''
+
+    re_compile = re.compile(r'[^.][A-Z]')
+    return sorted(filter(re_compile.match, os.listdir(os.path.join(DATASET_ABS_DIR, etf_dir))))
+
+
+def convert_etf_dir(etf_dir:Text, force:bool=False) -> Dict[Text, List[Text]]:
+    '''
+    Purpose :
+        Convert all the pivot pickle files for every ticker within an ETF directory.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        force   : Boo. To rewrite the bundles even if they are up to date.
+
+    Output  :
+        Dict obj containing the bundles written for each ticker.
+    '''
+
+    logger.info('Start running (convert_etf_dir) function.')
+
+    converted = {}
+    for ticker in list_tickers(etf_dir):
+        converted[ticker] = []
+        for filename in PIVOT_PICKLE_FILENAMES:
+            if os.path.exists(os.path.join(get_storage_dir(etf_dir, ticker), filename)):
+                converted[ticker] += convert_pickle(etf_dir, ticker, filename, force)
+    return converted
+
+
+# %%
+# --------------------------------------------------------------
+# Read Columnar Store.
+# --------------------------------------------------------------
+
+def list_table_keys(etf_dir:Text, ticker:Text, filename:Text, get_idx:Optional[int]=None) -> List[Text]:
+    '''
+    Purpose :
+        Output the keys of the pivot tables stored within a columnar bundle.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        List obj containing the table keys.
+    '''
+
+    bundle_dir = get_bundle_dir(etf_dir, ticker, filename, get_idx)
+    return sorted(
+        table_file[:-len(COLUMNAR_STORE_EXT)] for table_file in os.listdir(bundle_dir)
+        if table_file.endswith(COLUMNAR_STORE_EXT)
+    )
+
+
+@traced()
+def read_table(
+        etf_dir:Text,
+        ticker:Text,
+        filename:Text,
+        key:Text,
+        get_idx:Optional[int]=None,
+    ) -> pd.DataFrame:
+
+    '''
+    Purpose :
+        Read a single pivot table from a columnar bundle with memory mapping.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file the bundle was converted from.
+        key     : Str. Key of the pivot table such as weekly_range_10_yr.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        Dataframe.
+    '''
+
+    table_path = os.path.join(get_bundle_dir(etf_dir, ticker, filename, get_idx), f'{key}{COLUMNAR_STORE_EXT}')
+    if not os.path.exists(table_path):
+        raise KeyError(key)
+
+    pivot_data = normalise_dtypes(feather.read_table(table_path, memory_map=True).to_pandas())
+    logger.debug(f'----- Read ({key}) table from ({table_path}).')
+    return pivot_data
+
+
+@traced()
+def read_pickle_bundle(etf_dir:Text, ticker:Text, filename:Text, get_idx:Optional[int]=None) -> Dict[Text, pd.DataFrame]:
+    '''
+    Purpose :
+        Read the dict obj containing the statistics data from a pickle file. Used
+        when the columnar bundle doesn't exist or is outdated.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        get_idx : Int. Index of the inner tuple obj (if any).
+
+    Output  :
+        Dict obj containing multiple dataframes.
+    '''
+
+    with open(os.path.join(get_storage_dir(etf_dir, ticker), filename), 'rb') as in_file:
+        pickle_obj = pd.read_pickle(in_file)
+    logger.debug(f'----- Read data from ({filename}) file.')
+
+    return normalise_frames(add_derived_tables(pickle_obj[get_idx][1] if isinstance(get_idx, int) else pickle_obj[1]))
+
+
+# %%
+# --------------------------------------------------------------
+# Panel Store.
+# --------------------------------------------------------------
+
+# Every row of the panel file is one pivot table (serialised as an Arrow IPC stream).
+PANEL_SCHEMA = pa.schema([
+    ('ticker', pa.string()), ('bundle', pa.string()), ('key', pa.string()), ('table', pa.binary()),
+])
+
+
+def get_panel_path(etf_dir:Text) -> Text:
+    '''
+    Purpose :
+        Output the path to the panel file of an ETF directory.
+    '''
+
+    return os.path.join(DATASET_ABS_DIR, etf_dir, PANEL_STORE_FILENAME)
+
+
+def serialise_table(pivot_data:pd.DataFrame) -> pa.Buffer:
+    '''
+    Purpose :
+        Serialise a pivot table (with compact dtypes) into an Arrow IPC stream (the
+        pandas metadata keeps the index and the dtypes, as for the feather files).
+    '''
+
+    table = pa.Table.from_pandas(normalise_dtypes(pivot_data))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def deserialise_table(buffer:pa.Buffer) -> pd.DataFrame:
+    '''
+    Purpose :
+        Read a pivot table from an Arrow IPC stream.
+    '''
+
+    return normalise_dtypes(pa.ipc.open_stream(buffer).read_all().to_pandas())
+
+
+def get_ticker_mtimes(etf_dir:Text, ticker:Text) -> Dict[Text, float]:
+    '''
+    Purpose :
+        Output the modified time of each pivot pickle file of a ticker.
+    '''
+
+    return {filename: get_source_mtime(etf_dir, ticker, filename) for filename in PIVOT_PICKLE_FILENAMES}
+
+
+def write_panel(etf_dir:Text) -> Dict[Text, int]:
+    '''
+    Purpose :
+        Pack the pivot tables of every ticker within an ETF directory into one panel
+        file (Arrow IPC, one record batch per ticker). The schema metadata holds an
+        index of the batch & row for each ticker, bundle and key, plus the pickle
+        mtimes the tables were packed from.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+
+    Output  :
+        Dict obj containing the number of tables packed for each ticker.
+    '''
+
+    logger.info(f'Start running (write_panel) function for ({etf_dir}).')
+
+    batches, panel_index = [], {}
+    for ticker in list_tickers(etf_dir):
+        rows = {'bundle': [], 'key': [], 'table': []}
+        for filename in PIVOT_PICKLE_FILENAMES:
+            if not os.path.exists(os.path.join(get_storage_dir(etf_dir, ticker), filename)):
+                continue
+            for get_idx, pivot_stats in read_bundles(etf_dir, ticker, filename).items():
+                for key, pivot_data in pivot_stats.items():
+                    rows['bundle'].append(get_bundle_name(filename, get_idx))
+                    rows['key'].append(key)
+                    rows['table'].append(serialise_table(pivot_data).to_pybytes())
+
+        panel_index[ticker] = {
+            'batch': len(batches),
+            'rows': {f'{bundle}/{key}': row for row, (bundle, key) in enumerate(zip(rows['bundle'], rows['key']))},
+            'mtimes': get_ticker_mtimes(etf_dir, ticker),
+        }
+        batches.append(pa.record_batch(
+            [pa.array([ticker] * len(rows['key'])), pa.array(rows['bundle']), pa.array(rows['key']), pa.array(rows['table'], pa.binary())],
+            schema=PANEL_SCHEMA,
+        ))
+
+    # Write into a temporary file first so a reader never sees a partial panel.
+    panel_path = get_panel_path(etf_dir)
+    schema = PANEL_SCHEMA.with_metadata({'panel_index': json.dumps(panel_index)})
+    with pa.OSFile(f'{panel_path}.tmp', 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    os.replace(f'{panel_path}.tmp', panel_path)
+
+    return {ticker: len(ticker_index['rows']) for ticker, ticker_index in panel_index.items()}
+
+
+def open_panel(etf_dir:Text) -> Tuple[pa.ipc.RecordBatchFileReader, Dict]:
+    '''
+    Purpose :
+        Open the panel file with memory mapping. Only the footer & schema are read,
+        the batches are read on access.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+
+    Output  :
+        Tuple obj containing the file reader and the panel index.
+    '''
+
+    reader = pa.ipc.open_file(pa.memory_map(get_panel_path(etf_dir), 'r'))
+    return reader, json.loads(reader.schema.metadata[b'panel_index'])
+
+
+def read_panel(etf_dir:Text) -> Tuple[Optional[pa.ipc.RecordBatchFileReader], Dict]:
+    '''
+    Purpose :
+        Output the (cached) file reader & panel index of an ETF directory, or (None, {})
+        if there isn't a panel file. The panel mtime is part of the cache key, so the
+        file is only opened (and its index parsed) again once it's repacked.
+    '''
+
+    try:
+        panel_mtime = os.path.getmtime(get_panel_path(etf_dir))
+    except OSError:
+        return None, {}
+    return DATA_CACHE.get_or_load(('panel', etf_dir, panel_mtime), lambda: open_panel(etf_dir))
+
+
+def read_panel_index(etf_dir:Text) -> Dict:
+    '''
+    Purpose :
+        Output the (cached) panel index of an ETF directory, or an empty dict if there
+        isn't a panel file.
+    '''
+
+    return read_panel(etf_dir)[1]
+
+
+def is_panel_fresh(etf_dir:Text, ticker:Text) -> bool:
+    '''
+    Purpose :
+        Check whether the panel file has the tables of a ticker packed from its current pickle files.
+    '''
+
+    ticker_index = read_panel_index(etf_dir).get(ticker)
+    return ticker_index is not None and ticker_index['mtimes'] == get_ticker_mtimes(etf_dir, ticker)
+
+
+def list_panel_keys(etf_dir:Text, ticker:Text, bundle:Text) -> List[Text]:
+    '''
+    Purpose :
+        Output the keys of the pivot tables of a ticker & bundle within the panel file.
+    '''
+
+    rows = read_panel_index(etf_dir)[ticker]['rows']
+    return [row_key.split('/', 1)[1] for row_key in rows if row_key.split('/', 1)[0] == bundle]
+
+
+@traced()
+def read_panel_table(etf_dir:Text, ticker:Text, bundle:Text, key:Text) -> pd.DataFrame:
+    '''
+    Purpose :
+        Read a single pivot table of a ticker from the panel file. The file reader is
+        cached, so only the record batch of the ticker is sliced and only the requested
+        table is deserialised.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        bundle  : Str. Bundle name such as pivot_stats or pivot_unique_days_0.
+        key     : Str. Key of the pivot table such as weekly_range_10_yr.
+
+    Output  :
+        Dataframe.
+    '''
+
+    reader, panel_index = read_panel(etf_dir)
+    ticker_index = panel_index.get(ticker, {'rows': {}})
+    if f'{bundle}/{key}' not in ticker_index['rows']:
+        raise KeyError(key)
+
+    tables = reader.get_batch(ticker_index['batch']).column('table')
+    logger.debug(f'----- Read ({ticker}/{bundle}/{key}) table from the ({etf_dir}) panel.')
+    return deserialise_table(tables[ticker_index['rows'][f'{bundle}/{key}']].as_buffer())
+
+
+def iter_panel(
+        etf_dir:Text,
+        tickers:Optional[List[Text]]=None,
+        bundle:Optional[Text]=None,
+        key:Optional[Text]=None,
+    ) -> Iterator[Tuple[Text, Text, Text, pd.DataFrame]]:
+
+    '''
+    Purpose :
+        Slice the panel file by ticker, bundle and key. Only the batches of the
+        selected tickers are mapped and only the matching tables are deserialised.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        tickers : List. Ticker symbols to read (all the tickers if None).
+        bundle  : Str. Bundle name to read (all the bundles if None).
+        key     : Str. Key of the pivot table to read (all the keys if None).
+
+    Output  :
+        Iterator of (ticker, bundle, key, dataframe).
+    '''
+
+    reader, panel_index = read_panel(etf_dir)
+    if reader is None:
+        raise FileNotFoundError(get_panel_path(etf_dir))
+
+    for ticker, ticker_index in panel_index.items():
+        if tickers is not None and ticker not in tickers:
+            continue
+
+        tables = reader.get_batch(ticker_index['batch']).column('table')
+        for row_key, row in ticker_index['rows'].items():
+            row_bundle, row_table_key = row_key.split('/', 1)
+            if (bundle is None or row_bundle == bundle) and (key is None or row_table_key == key):
+                yield ticker, row_bundle, row_table_key, deserialise_table(tables[row].as_buffer())
+
+
+# %%
+# --------------------------------------------------------------
+# Lazy Pivot Stats.
+# --------------------------------------------------------------
+
+class LazyPivotStats(Mapping):
+    '''
+    Purpose :
+        Behave like the dict obj of pivot tables returned by (read_pickle) but only
+        read the dataframe for a key on first access. Loaded frames are kept in the
+        shared (DATA_CACHE) under the mtime of the pickle file, so idle frames are
+        evicted under memory pressure and a data update is a cache miss.
+        Each read checks where the tables are read from: the columnar bundle, else the
+        panel file of the ETF directory, else the pickle file (so a long-lived mapping
+        picks up a conversion or an update). Derived tables missing from a bundle or
+        panel written before they existed are derived from the other tables.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        filename: Str. Name of the pickle file.
+        get_idx : Int. Index of the inner tuple obj (if any).
+    '''
+
+    def __init__(self, etf_dir:Text, ticker:Text, filename:Text, get_idx:Optional[int]=None):
+        self.etf_dir, self.ticker, self.filename, self.get_idx = etf_dir, ticker, filename, get_idx
+        self.bundle = get_bundle_name(filename, get_idx)
+
+    # Compare by identity, the (Mapping) equality would read every table.
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self) -> Text:
+        return f'LazyPivotStats({self.etf_dir}/{self.ticker}/{self.bundle})'
+
+    def get_source(self) -> Tuple[Text, float]:
+        '''
+        Purpose :
+            Output where the tables are read from now (store, panel or pickle) and
+            the mtime of the pickle file.
+        '''
+
+        mtime = get_source_mtime(self.etf_dir, self.ticker, self.filename)
+        if is_bundle_fresh(self.etf_dir, self.ticker, self.filename, self.get_idx):
+            return 'store', mtime
+        if is_panel_fresh(self.etf_dir, self.ticker):
+            return 'panel', mtime
+        return 'pickle', mtime
+
+    def _read_pickle_bundle(self, mtime:float) -> Dict[Text, pd.DataFrame]:
+        return DATA_CACHE.get_or_load(
+            (self.etf_dir, self.ticker, self.bundle, None, mtime),
+            lambda: read_pickle_bundle(self.etf_dir, self.ticker, self.filename, self.get_idx)
+        )
+
+    def _list_keys(self, source:Text, mtime:float) -> Tuple[List[Text], List[Text]]:
+        '''
+        Purpose :
+            Output the keys of the tables and the keys of the derived tables that
+            aren't stored (the pickle bundle always has them).
+        '''
+
+        def list_keys():
+            if source == 'store':
+                keys = list_table_keys(self.etf_dir, self.ticker, self.filename, self.get_idx)
+            else:
+                keys = list_panel_keys(self.etf_dir, self.ticker, self.bundle)
+            derived_keys = [key for key in list_derived_keys(keys) if key not in keys]
+            return keys + derived_keys, derived_keys
+
+        if source == 'pickle':
+            return list(self._read_pickle_bundle(mtime).keys()), []
+        return DATA_CACHE.get_or_load((self.etf_dir, self.ticker, self.bundle, 'table_keys', source, mtime), list_keys)
+
+    def __getitem__(self, key:Text) -> pd.DataFrame:
+        source, mtime = self.get_source()
+        if source == 'pickle':
+            return self._read_pickle_bundle(mtime)[key]
+
+        if key in self._list_keys(source, mtime)[1]:
+            read_func = lambda: normalise_dtypes(derive_table(self, key))
+        elif source == 'store':
+            read_func = lambda: read_table(self.etf_dir, self.ticker, self.filename, key, self.get_idx)
+        else:
+            read_func = lambda: read_panel_table(self.etf_dir, self.ticker, self.bundle, key)
+
+        return DATA_CACHE.get_or_load((self.etf_dir, self.ticker, self.bundle, key, mtime), read_func)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys()
+
+    def keys(self) -> List[Text]:
+        return self._list_keys(*self.get_source())[0]
+
+
+# %%
+# --------------------------------------------------------------
+# Command Line.
+# --------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert the pivot pickle files into a columnar store.')
+    parser.add_argument(
+        '--etf-dir', action='append', dest='etf_dirs',
+        help='ETF directory to convert (repeatable). Defaults to every ETF directory.'
+    )
+    parser.add_argument('--force', action='store_true', help='Rewrite the bundles even if they are up to date.')
+    parser.add_argument(
+        '--panel', action='store_true',
+        help='Pack every ticker into one panel file per ETF directory instead of the per-ticker bundles.'
+    )
+    args = parser.parse_args()
+
+    etf_dirs = args.etf_dirs or ['ETF_sector'] + ['/'.join(['ETF_equity', etf]) for etf in ETF_EQUITY]
+    for etf_dir in etf_dirs:
+        if args.panel:
+            packed = write_panel(etf_dir)
+            print(f'{etf_dir}: {sum(packed.values())} tables of {len(packed)} tickers packed into {get_panel_path(etf_dir)}')
+            continue
+        for ticker, bundles in convert_etf_dir(etf_dir, args.force).items():
+            print(f'{etf_dir}/{ticker}: {", ".join(bundles) if bundles else "up to date"}')
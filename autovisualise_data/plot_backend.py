@@ -0,0 +1,75 @@
+
+
+# %%
+import functools, threading
+
+from types import ModuleType
+
+
+# %%
+# --------------------------------------------------------------
+# Lazy Holoviews.
+# --------------------------------------------------------------
+
+# Importing holoviews & hvplot and loading the bokeh extension takes a few seconds, so it's
+# done once on the first plot built rather than when the dashboard starts.
+_HOLOVIEWS_LOCK = threading.Lock()
+_HOLOVIEWS = None
+
+
+def load_holoviews() -> ModuleType:
+    '''
+    Purpose :
+        Import holoviews & hvplot.pandas (the dataframe .hvplot accessor) and load
+        the bokeh extension, once per process.
+
+    Output  :
+        Holoviews module.
+    '''
+
+    global _HOLOVIEWS
+    if _HOLOVIEWS is None:
+        with _HOLOVIEWS_LOCK:
+            if _HOLOVIEWS is None:
+                import holoviews
+                import hvplot.pandas
+                holoviews.extension('bokeh')
+                _HOLOVIEWS = holoviews
+    return _HOLOVIEWS
+
+
+def is_holoviews_loaded() -> bool:
+    return _HOLOVIEWS is not None
+
+
+class LazyModule:
+    '''
+    Purpose :
+        Stand in for a module that is only loaded on the first attribute access
+        (e.g. hv.HLine or hv.render).
+    '''
+
+    def __init__(self, load_module):
+        self._load_module = load_module
+
+    def __getattr__(self, name:str):
+        return getattr(self._load_module(), name)
+
+
+hv = LazyModule(load_holoviews)
+
+
+# %%
+# --------------------------------------------------------------
+# Decorator
+# --------------------------------------------------------------
+
+# To load holoviews before running a plot function (which may use the .hvplot accessor first).
+def uses_holoviews(plot_func):
+
+    @functools.wraps(plot_func)
+    def wrapper(*args, **kwargs):
+        load_holoviews()
+        return plot_func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,259 @@
+
+
+# %%
+import logging, threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Text
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    YR_RANGE,
+    PREFETCH_ENABLED,
+    PREFETCH_MAX_WORKERS,
+    PREFETCH_MAX_VIEWS,
+    PREFETCH_MAX_PENDING,
+    PREFETCH_DELAY,
+)
+from config.config_logger import setup_logger
+from autovisualise_data import ticker_plot, ticker_views, chart_cache, tracing
+from config.config_dashboard import ST_TABS, ST_PERIOD_MAX, ST_TABLE_AS_HTML
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Adjacent Views.
+# --------------------------------------------------------------
+
+def get_period_max(view:Dict) -> Optional[int]:
+    '''
+    Purpose :
+        Output the max value of the period slider of a view (None without the slider).
+    '''
+
+    if view['tab'] in [ST_TABS[0], ST_TABS[1]]:
+        return ST_PERIOD_MAX.get(view['interval'])
+    if view['tab'] == ST_TABS[4] and view['unique_period'] in ['first_trdr_dom_by_month', 'super_day_by_month']:
+        return 12
+    return None
+
+
+def get_adjacent_views(view:Dict) -> List[Dict]:
+    '''
+    Purpose :
+        Output the views one step away from a view, the most likely next one first:
+        next / previous period, next / previous year range, next / previous ticker.
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        List obj containing the adjacent view states.
+    '''
+
+    widgets = {widget: view[widget] for widget in ticker_views.VIEW_WIDGETS[view['tab']]}
+    adjacent = []
+
+    period_max = get_period_max(view)
+    if period_max and view.get('period') is not None:
+        for period in [view['period'] + 1, view['period'] - 1]:
+            if 1 <= period <= period_max:
+                adjacent.append(dict(widgets, period=period))
+
+    if view.get('yr_range') in YR_RANGE:
+        idx = YR_RANGE.index(view['yr_range'])
+        for yr_idx in [idx + 1, idx - 1]:
+            if 0 <= yr_idx < len(YR_RANGE):
+                adjacent.append(dict(widgets, yr_range=YR_RANGE[yr_idx]))
+
+    views = [ticker_views.make_view(view['tab'], view['etf_dir'], view['ticker'], **values) for values in adjacent]
+
+    tickers = ticker_plot.get_ticker_options(view['etf_dir'])
+    if view['ticker'] in tickers:
+        idx = tickers.index(view['ticker'])
+        for ticker_idx in [idx + 1, idx - 1]:
+            if 0 <= ticker_idx < len(tickers):
+                views.append(ticker_views.make_view(view['tab'], view['etf_dir'], tickers[ticker_idx], **widgets))
+    return views
+
+
+def prefetch_view(view:Dict, cancelled:threading.Event) -> bool:
+    '''
+    Purpose :
+        Render the charts (and styled table) of a view into the chart cache after a
+        short delay, unless the prefetch was cancelled or the view is already cached.
+        The render is skipped if a session (or another prefetch) is rendering, so a
+        session never waits behind a prefetch for more than one render. A session
+        asking for the view while it's built waits for the same render.
+
+    Input   :
+        view      : Dict. View state from (make_view).
+        cancelled : Event. Set when the session moved to another view.
+
+    Output  :
+        Boo. True if the view was rendered (or read from its artefact).
+    '''
+
+    key = chart_cache.view_key(**view)
+    if cancelled.wait(PREFETCH_DELAY) or key in chart_cache.CHART_CACHE:
+        return False
+
+    with tracing.trace('prefetch_view', **view):
+        try:
+            chart_cache.get_rendered_charts(key, lambda: ticker_views.build_view_plots(view), cancelled)
+        except chart_cache.RenderSkipped as skipped:
+            logger.debug(f'----- Skipped prefetching, {skipped}.')
+            return False
+        if ST_TABLE_AS_HTML and not cancelled.is_set():
+            ticker_views.get_view_table_html(view)
+
+    logger.debug(f'----- Prefetched ({key}).')
+    return True
+
+
+# %%
+# --------------------------------------------------------------
+# Prefetcher.
+# --------------------------------------------------------------
+
+class ViewPrefetcher:
+    '''
+    Purpose :
+        Prefetch the adjacent views on a small thread pool shared by every session.
+        Each session has one generation of prefetches at a time: scheduling a new
+        view (or moving to a tab without views) cancels the previous generation, so
+        the views still waiting are dropped and the running ones stop early.
+
+    Input   :
+        max_workers : Int. Number of prefetch threads.
+        max_views   : Int. Max number of adjacent views prefetched per view.
+        max_pending : Int. Max number of views waiting across sessions (beyond it, views are dropped).
+    '''
+
+    def __init__(self, max_workers:int, max_views:int, max_pending:int):
+        self.max_views, self.max_pending = max_views, max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.scheduled = self.dropped = self.cancelled = 0
+
+    def _count_pending(self) -> int:
+        return sum(not future.done() for _, futures in self._sessions.values() for future in futures)
+
+    def cancel(self, session_id:Hashable):
+        '''
+        Purpose :
+            Cancel the prefetches of a session.
+        '''
+
+        with self._lock:
+            cancelled, futures = self._sessions.pop(session_id, (None, []))
+        if cancelled is not None:
+            cancelled.set()
+            n_cancelled = sum(future.cancel() for future in futures)
+            with self._lock:
+                self.cancelled += n_cancelled
+
+    def schedule(self, session_id:Hashable, view:Dict) -> List[Future]:
+        '''
+        Purpose :
+            Cancel the previous prefetches of a session and prefetch the views
+            adjacent to the view it's showing.
+
+        Input   :
+            session_id : Hashable. Identifier of the session.
+            view       : Dict. View state from (make_view).
+
+        Output  :
+            List obj containing the futures of the scheduled prefetches.
+        '''
+
+        self.cancel(session_id)
+        cancelled, futures = threading.Event(), []
+
+        views = [
+            adjacent_view for adjacent_view in get_adjacent_views(view)[:self.max_views]
+            if chart_cache.view_key(**adjacent_view) not in chart_cache.CHART_CACHE
+        ]
+        with self._lock:
+            for adjacent_view in views:
+                if self._count_pending() >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                futures.append(self._executor.submit(self._run, adjacent_view, cancelled))
+            self._sessions[session_id] = (cancelled, futures)
+            self.scheduled += len(futures)
+        return futures
+
+    def _run(self, view:Dict, cancelled:threading.Event) -> bool:
+        try:
+            return prefetch_view(view, cancelled)
+        except Exception:
+            logger.exception(f'----- Exception occurs while trying to prefetch ({view}).')
+            return False
+
+    def stats(self) -> Dict[Text, int]:
+        '''
+        Purpose :
+            Output the number of views scheduled, dropped (queue full), cancelled & pending.
+        '''
+
+        with self._lock:
+            pending = self._count_pending()
+        return {'scheduled': self.scheduled, 'dropped': self.dropped, 'cancelled': self.cancelled, 'pending': pending}
+
+
+# Prefetcher shared by every session.
+PREFETCHER = ViewPrefetcher(PREFETCH_MAX_WORKERS, PREFETCH_MAX_VIEWS, PREFETCH_MAX_PENDING)
+
+
+def get_session_id() -> Optional[Hashable]:
+    '''
+    Purpose :
+        Output the identifier of the streamlit session running the script (None
+        outside of a session).
+    '''
+
+    try:
+        from streamlit.report_thread import get_report_ctx
+    except ImportError:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx as get_report_ctx
+
+    ctx = get_report_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def prefetch_adjacent_views(view:Dict):
+    '''
+    Purpose :
+        Prefetch the views adjacent to the view of the current session.
+
+    Input   :
+        view : Dict. View state from (make_view).
+    '''
+
+    session_id = get_session_id()
+    if PREFETCH_ENABLED and session_id is not None:
+        PREFETCHER.schedule(session_id, view)
+
+
+def cancel_prefetch():
+    '''
+    Purpose :
+        Cancel the prefetches of the current session (when it reruns, before the
+        new view is built). A view being rendered is finished and reused if it's
+        the view the session asks for.
+    '''
+
+    session_id = get_session_id()
+    if session_id is not None:
+        PREFETCHER.cancel(session_id)
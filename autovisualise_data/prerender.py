@@ -0,0 +1,219 @@
+
+
+# %%
+import os, logging, argparse, time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Text, Tuple
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    ETF_EQUITY,
+    YR_RANGE,
+    FREQ_KEYS,
+    HOLIDAYS_KEYS,
+    SPECIAL_DAYS_KEYS,
+)
+from config.config_logger import setup_logger
+from autovisualise_data import ticker_plot, ticker_views, chart_cache
+from config.config_dashboard import ST_TABS, ST_PERIOD_MAX
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# View Grid.
+# --------------------------------------------------------------
+
+def get_periods(interval:Text) -> List:
+    '''
+    Purpose :
+        Output the values of the period slider for a date interval (None if the
+        dashboard doesn't show the slider).
+    '''
+
+    return list(range(1, ST_PERIOD_MAX[interval] + 1)) if interval in ST_PERIOD_MAX else [None]
+
+
+def iter_views(tab:Text, etf_dir:Text, ticker:Text) -> Iterator[Dict]:
+    '''
+    Purpose :
+        Walk every combination of widget values the dashboard can show for a tab.
+
+    Input   :
+        tab     : Str. Name of the tab (one of ST_TABS[:5]).
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+
+    Output  :
+        Iterator of view states from (make_view).
+    '''
+
+    if tab == ST_TABS[0]:
+        for interval in FREQ_KEYS:
+            for yr_range in YR_RANGE:
+                for period in get_periods(interval):
+                    yield ticker_views.make_view(tab, etf_dir, ticker, interval=interval, yr_range=yr_range, period=period)
+
+    elif tab == ST_TABS[1]:
+        for interval in FREQ_KEYS:
+            overall_vols = [False, True] if interval in ST_PERIOD_MAX else [None]
+            for period in get_periods(interval):
+                for overall_vol in overall_vols:
+                    yield ticker_views.make_view(tab, etf_dir, ticker, interval=interval, period=period, overall_vol=overall_vol)
+
+    elif tab == ST_TABS[2]:
+        for yr_range in YR_RANGE:
+            for holiday_key in HOLIDAYS_KEYS:
+                yield ticker_views.make_view(tab, etf_dir, ticker, yr_range=yr_range, unique_period=holiday_key)
+
+    elif tab == ST_TABS[3]:
+        for yr_range in YR_RANGE:
+            for tww_key in SPECIAL_DAYS_KEYS[5:9]:
+                for show_weekly in [False, True]:
+                    yield ticker_views.make_view(
+                        tab, etf_dir, ticker, yr_range=yr_range, unique_period=tww_key, show_weekly=show_weekly
+                    )
+
+    elif tab == ST_TABS[4]:
+        for yr_range in YR_RANGE:
+            for special_period_key in SPECIAL_DAYS_KEYS[:5]:
+                by_month = special_period_key in ['first_trdr_dom_by_month', 'super_day_by_month']
+                for period in (range(1, 13) if by_month else [None]):
+                    yield ticker_views.make_view(
+                        tab, etf_dir, ticker, yr_range=yr_range, unique_period=special_period_key, period=period
+                    )
+
+
+# %%
+# --------------------------------------------------------------
+# Pre-render.
+# --------------------------------------------------------------
+
+def prerender_view(view:Dict, force:bool=False) -> bool:
+    '''
+    Purpose :
+        Render the charts and the styled table of a view and write them to the
+        pre-render cache directory.
+
+    Input   :
+        view  : Dict. View state from (make_view).
+        force : Boo. To render the view even if its artefact exists.
+
+    Output  :
+        Boo. True if the artefact was written.
+    '''
+
+    key = chart_cache.view_key(**view)
+    if not force and os.path.exists(chart_cache.get_artefact_path(key)):
+        return False
+
+    charts = chart_cache.render_plots(ticker_views.build_view_plots(view))
+    chart_cache.write_artefact(key, charts, ticker_views.build_view_table_html(view))
+    return True
+
+
+def prerender_ticker(tab:Text, etf_dir:Text, ticker:Text, force:bool=False) -> Tuple[int, int]:
+    '''
+    Purpose :
+        Pre-render every view of a tab for a ticker (one task for the process pool,
+        so the pivot tables are only read once per task).
+
+    Input   :
+        tab     : Str. Name of the tab (one of ST_TABS[:5]).
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        force   : Boo. To render the views even if their artefacts exist.
+
+    Output  :
+        Tuple obj containing the number of views written and failed.
+    '''
+
+    written = failed = 0
+    for view in iter_views(tab, etf_dir, ticker):
+        try:
+            written += prerender_view(view, force)
+        except Exception:
+            failed += 1
+            logger.exception(f'----- Exception occurs while trying to pre-render ({view}).')
+    return written, failed
+
+
+def prerender_all(
+        etf_dirs:List[Text],
+        tickers:List[Text]=None,
+        tabs:List[Text]=None,
+        workers:int=None,
+        force:bool=False,
+    ) -> Dict[Text, int]:
+
+    '''
+    Purpose :
+        Pre-render every view for every ticker on a process pool.
+
+    Input   :
+        etf_dirs: List. ETF directories such as ETF_sector or ETF_equity/PPA.
+        tickers : List. Ticker symbols to pre-render (all the tickers if None).
+        tabs    : List. Tabs to pre-render (all the ticker tabs if None).
+        workers : Int. Number of worker processes (number of cores if None).
+        force   : Boo. To render the views even if their artefacts exist.
+
+    Output  :
+        Dict obj containing the number of tasks, views written and views failed.
+    '''
+
+    logger.info('Start running (prerender_all) function.')
+
+    tasks = [
+        (tab, etf_dir, ticker)
+        for etf_dir in etf_dirs
+        for ticker in ticker_plot.get_ticker_options(etf_dir) if not tickers or ticker in tickers
+        for tab in (tabs or ST_TABS[:5])
+    ]
+
+    summary = {'tasks': len(tasks), 'written': 0, 'failed': 0}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(prerender_ticker, *task, force): task for task in tasks}
+        for future in as_completed(futures):
+            written, failed = future.result()
+            summary['written'] += written
+            summary['failed'] += failed
+            logger.debug(f'----- Pre-rendered ({futures[future]}): {written} written, {failed} failed.')
+    return summary
+
+
+# %%
+# --------------------------------------------------------------
+# Command Line.
+# --------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-render every chart and styled table of the ticker tabs.')
+    parser.add_argument(
+        '--etf-dir', action='append', dest='etf_dirs',
+        help='ETF directory to pre-render (repeatable). Defaults to every ETF directory.'
+    )
+    parser.add_argument('--ticker', action='append', dest='tickers', help='Ticker to pre-render (repeatable).')
+    parser.add_argument(
+        '--tab', action='append', dest='tabs', type=int, choices=range(5),
+        help='Index of the tab to pre-render (repeatable). Defaults to every ticker tab.'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('--force', action='store_true', help='Render the views even if their artefacts exist.')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = prerender_all(
+        args.etf_dirs or ['ETF_sector'] + ['/'.join(['ETF_equity', etf]) for etf in ETF_EQUITY],
+        args.tickers, [ST_TABS[idx] for idx in args.tabs] if args.tabs else None, args.workers, args.force,
+    )
+    print(f'{summary["written"]} views written, {summary["failed"]} failed '
+          f'({summary["tasks"]} tasks, {time.perf_counter() - start:.1f}s).')
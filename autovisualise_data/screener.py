@@ -0,0 +1,209 @@
+
+
+# %%
+import logging
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Text, Tuple
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH, SCREENER_MAX_WORKERS
+from config.config_logger import setup_logger
+from config.config_dashboard import HV_PN_WIDTH, HV_TOOLS_FOR_TICKER, TABLE_FORMATTER
+from autovisualise_data.data_cache import DATA_CACHE, cache_in
+from autovisualise_data.plot_backend import uses_holoviews
+from autovisualise_data.tracing import traced
+from autovisualise_data.pivot_store import LazyPivotStats
+from autovisualise_data.stats_engine import get_stats_key
+from autovisualise_data.ticker_index import get_ticker_index
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Screener Frame.
+# --------------------------------------------------------------
+
+# Column of the period (month / week number) for each date interval that can be screened.
+SCREENER_PERIOD_COLS = {'monthly': 'month', 'weekly': 'week'}
+
+
+def get_current_period(freq:Text) -> int:
+    '''
+    Purpose :
+        Output the current month (monthly) or week of the year (weekly).
+    '''
+
+    return datetime.today().month if freq == 'monthly' else datetime.today().isocalendar()[1]
+
+
+def read_ticker_table(etf_dir:Text, ticker:Text, stats_key:Text) -> Optional[pd.DataFrame]:
+    '''
+    Purpose :
+        Read a pivot table of pivot_stats.pickle for a ticker (or None if the
+        ticker doesn't have it, e.g. a year range longer than its history).
+    '''
+
+    try:
+        return LazyPivotStats(etf_dir, ticker, 'pivot_stats.pickle')[stats_key]
+    except (KeyError, OSError):
+        logger.debug(f'----- ({etf_dir}/{ticker}) doesn\'t have the ({stats_key}) table.')
+        return None
+
+
+@traced()
+def build_screener_frame(etf_dir:Text, freq:Text, yr_range:Text) -> pd.DataFrame:
+    '''
+    Purpose :
+        Read the pivot table of every ticker within an ETF directory on a thread
+        pool and stack them into one frame with a ticker column.
+
+    Input   :
+        etf_dir  : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        freq     : Str. Must be monthly / weekly.
+        yr_range : Str. Year range.
+
+    Output  :
+        Dataframe. Statistics of every ticker (one row per ticker and period).
+    '''
+
+    logger.info(f'Start running (build_screener_frame) function for ({etf_dir}).')
+
+    tickers = get_ticker_index().get_tickers(etf_dir)
+    stats_key = get_stats_key(freq, yr_range)
+    with ThreadPoolExecutor(max_workers=SCREENER_MAX_WORKERS) as executor:
+        tables = list(executor.map(lambda ticker: read_ticker_table(etf_dir, ticker, stats_key), tickers))
+
+    tables = {ticker: table for ticker, table in zip(tickers, tables) if table is not None}
+    if not tables:
+        return pd.DataFrame()
+
+    frame = pd.concat(tables, names=['ticker', None]).reset_index(level='ticker').reset_index(drop=True)
+    frame['ticker'] = frame['ticker'].astype('category')
+    return frame
+
+
+@cache_in(DATA_CACHE)
+def load_screener_frame(etf_dir:Text, freq:Text, yr_range:Text, mtimes:Tuple[float, ...]) -> pd.DataFrame:
+    '''
+    Purpose :
+        Same as (build_screener_frame) but cached in memory. The modified times of
+        the pickle files are part of the cache key, so a data update rebuilds the frame.
+    '''
+
+    return build_screener_frame(etf_dir, freq, yr_range)
+
+
+def get_screener_mtimes(etf_dir:Text) -> Tuple[float, ...]:
+    '''
+    Purpose :
+        Output the modified time of pivot_stats.pickle for every ticker within an ETF
+        directory (from the ticker index).
+    '''
+
+    ticker_index = get_ticker_index()
+    return tuple(
+        ticker_index.get_file_mtime(etf_dir, ticker, 'pivot_stats.pickle') for ticker in ticker_index.get_tickers(etf_dir)
+    )
+
+
+def read_screener_frame(etf_dir:Text, freq:Text, yr_range:Text) -> pd.DataFrame:
+    '''
+    Purpose :
+        Output the (cached) screener frame of an ETF directory.
+    '''
+
+    return load_screener_frame(etf_dir, freq, yr_range, get_screener_mtimes(etf_dir))
+
+
+# %%
+# --------------------------------------------------------------
+# Screen Tickers.
+# --------------------------------------------------------------
+
+def screen_tickers(
+        frame:pd.DataFrame,
+        freq:Text,
+        period:Optional[int]=None,
+        metric:Text='up_prob',
+        min_up_prob:Optional[float]=None,
+        ascending:bool=False,
+        top_n:Optional[int]=None,
+    ) -> pd.DataFrame:
+
+    '''
+    Purpose :
+        Filter the screener frame to a period and rank the tickers by a metric.
+
+    Input   :
+        frame       : Dataframe. Screener frame from (read_screener_frame).
+        freq        : Str. Must be monthly / weekly.
+        period      : Int. Month / week number (the current one if None).
+        metric      : Str. Column to rank by such as up_prob or avg_diff.
+        min_up_prob : Float. To keep the tickers with the up probability at or above this value.
+        ascending   : Boo. To rank the lowest value first.
+        top_n       : Int. To keep the top N tickers.
+
+    Output  :
+        Dataframe. One row per ticker, ranked by the metric.
+    '''
+
+    if frame.empty:
+        return frame
+
+    period = get_current_period(freq) if period is None else period
+    screened = frame.loc[frame[SCREENER_PERIOD_COLS[freq]].to_numpy() == period]
+    if min_up_prob:
+        screened = screened.loc[screened['up_prob'].to_numpy() >= min_up_prob]
+
+    screened = screened.sort_values(metric, ascending=ascending, kind='mergesort')
+    screened.insert(0, 'rank', screened[metric].rank(ascending=ascending, method='min').astype('Int64'))
+    screened['ticker'] = screened['ticker'].astype(str)
+    screened = screened.reset_index(drop=True)
+    return screened.head(top_n) if top_n else screened
+
+
+def formatting_screener(screened:pd.DataFrame):
+    '''
+    Purpose :
+        Format the ranked tickers for display.
+    '''
+
+    return screened.style.format(TABLE_FORMATTER).hide_index()
+
+
+@traced()
+@uses_holoviews
+def plot_screener(screened:pd.DataFrame, metric:Text) -> Tuple:
+    '''
+    Purpose :
+        Visualise the metric and the up / down counts of the screened tickers.
+
+    Input   :
+        screened : Dataframe. Ranked tickers from (screen_tickers).
+        metric   : Str. Column the tickers are ranked by.
+
+    Output  :
+        Tuple obj containing the holoview plots.
+    '''
+
+    logger.info('Start running (plot_screener) function.')
+
+    if screened.empty:
+        return None, None
+
+    bar_metric = screened.hvplot(kind='bar', x='ticker', y=metric, width=HV_PN_WIDTH, tools=HV_TOOLS_FOR_TICKER)
+    bar_counts = screened.hvplot(
+        kind='bar', x='ticker', y=['up_counts', 'down_counts'], width=HV_PN_WIDTH,
+        stacked=True, legend='top', tools=HV_TOOLS_FOR_TICKER
+    )
+    return bar_metric, bar_counts
@@ -0,0 +1,781 @@
+
+
+# %%
+import os, logging, re, argparse, pickle, warnings
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Iterator, List, Optional, Text, Tuple
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    ETF_EQUITY,
+    YR_RANGE,
+    FREQ_KEYS,
+    FREQ_GROUP_COLS,
+    STATS_ENGINE_STATE_FILENAME,
+    YEAR_RANGE_INDEX_SOURCES,
+)
+from config.config_logger import setup_logger
+from autovisualise_data.data_cache import DATA_CACHE, cache_in
+from autovisualise_data.pivot_store import get_storage_dir, get_source_mtime, list_tickers, normalise_frames
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Year Range.
+# --------------------------------------------------------------
+
+def get_stats_key(freq:Text, yr_range:Text) -> Text:
+    '''
+    Purpose :
+        Output the key of a pivot table such as monthly or monthly_range_5_yr.
+    '''
+
+    return freq if yr_range == 'max_yr' else f'{freq}_{yr_range}'
+
+
+def iter_freq_yr_ranges() -> Iterator[Tuple[Text, Text]]:
+    '''
+    Purpose :
+        Iterate over the (date interval, year range) pairs in the key order of
+        pivot_stats.pickle: max_yr for every date interval, then the other year
+        ranges date interval by date interval.
+    '''
+
+    for freq in FREQ_KEYS:
+        yield freq, YR_RANGE[0]
+    for freq in FREQ_KEYS:
+        for yr_range in YR_RANGE[1:]:
+            yield freq, yr_range
+
+
+def get_yr_window(yr_range:Text, first_yr:int, last_yr:int) -> Optional[Tuple[int, int]]:
+    '''
+    Purpose :
+        Output the years covered by a year range. The first and the last year of
+        the data are partial years, so they are excluded. A range is only
+        available if the data covers it entirely.
+
+    Input   :
+        yr_range : Str. Year range such as max_yr or range_5_yr.
+        first_yr : Int. First year of the data.
+        last_yr  : Int. Last year of the data.
+
+    Output  :
+        Tuple obj containing the (exclusive) lower and upper bound of the years,
+        or None if the data doesn't cover the range.
+    '''
+
+    if yr_range == 'max_yr':
+        return first_yr, last_yr
+
+    lower_yr = last_yr - 2 - int(re.search(r'\d+', yr_range).group())
+    return (lower_yr, last_yr) if lower_yr > first_yr else None
+
+
+# %%
+# --------------------------------------------------------------
+# Statistics Table.
+# --------------------------------------------------------------
+
+def assemble_stats(
+        group_cols:List[Text],
+        groups:np.ndarray,
+        window_values:np.ndarray,
+        counts:np.ndarray,
+        totals:np.ndarray,
+        std_diff:np.ndarray,
+        up_counts:np.ndarray,
+        down_counts:np.ndarray,
+        pos_totals:np.ndarray,
+        neg_totals:np.ndarray,
+        means:Optional[np.ndarray]=None,
+    ) -> pd.DataFrame:
+
+    '''
+    Purpose :
+        Assemble the statistics table of a year range (same columns as the tables
+        of pivot_stats.pickle) from the aggregates of each group.
+
+    Input   :
+        group_cols    : List. Columns to group by such as month / week.
+        groups        : Array. Values of the group columns (one row per group).
+        window_values : Array. (Group x year) price differences within the year range,
+                        for the median / max / min.
+        counts        : Array. Number of values of each group.
+        totals        : Array. Total of the values of each group.
+        std_diff      : Array. Sample standard deviation of each group.
+        up_counts     : Array. Number of positive values of each group.
+        down_counts   : Array. Number of negative values of each group.
+        pos_totals    : Array. Total of the positive values of each group.
+        neg_totals    : Array. Total of the negative values of each group.
+        means         : Array. Mean of each group (totals / counts if None).
+
+    Output  :
+        Dataframe. Statistics table.
+    '''
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        avg_diff = np.where(counts > 0, totals / counts if means is None else means, np.nan)
+        up_prob = np.round(up_counts / (up_counts + down_counts), 4)
+        stats = pd.DataFrame({
+            'avg_diff': avg_diff,
+            'med_diff': np.nanmedian(window_values, axis=1),
+            'tot_diff': totals,
+            'max_diff': np.nanmax(window_values, axis=1),
+            'min_diff': np.nanmin(window_values, axis=1),
+            'std_diff': std_diff,
+            'up_overall': (avg_diff > 0).astype(np.int64),
+            'pos_avg_diff': pos_totals / up_counts,
+            'up_counts': up_counts,
+            'neg_avg_diff': neg_totals / down_counts,
+            'down_counts': down_counts,
+            'up_prob': up_prob,
+            'down_prob': 1 - up_prob,
+        })
+
+    for idx, col in enumerate(group_cols):
+        stats[col] = groups[:, idx]
+    return stats.infer_objects()
+
+
+# %%
+# --------------------------------------------------------------
+# Running Aggregates.
+# --------------------------------------------------------------
+
+class RunningStats:
+    '''
+    Purpose :
+        Running aggregates for every group of a pivot table: count, mean and the sum
+        of squared deviations (Welford), total, up / down counts and the total of
+        the positive / negative values. Values are folded in (or out) one year at a
+        time, as an array with one value per group (NaN for no value).
+
+    Input   :
+        n_groups : Int. Number of groups.
+    '''
+
+    def __init__(self, n_groups:int):
+        self.counts = np.zeros(n_groups, dtype=np.int64)
+        self.means, self.m2s, self.totals = np.zeros(n_groups), np.zeros(n_groups), np.zeros(n_groups)
+        self.up_counts = np.zeros(n_groups, dtype=np.int64)
+        self.down_counts = np.zeros(n_groups, dtype=np.int64)
+        self.pos_totals, self.neg_totals = np.zeros(n_groups), np.zeros(n_groups)
+
+    def resize(self, n_groups:int):
+        '''
+        Purpose :
+            Add empty aggregates for new groups.
+        '''
+
+        n_new = n_groups - len(self.counts)
+        for attr, arr in vars(self).items():
+            setattr(self, attr, np.concatenate([arr, np.zeros(n_new, dtype=arr.dtype)]))
+
+    def add(self, values:np.ndarray):
+        '''
+        Purpose :
+            Fold one value per group into the aggregates (Welford update).
+        '''
+
+        mask = ~np.isnan(values)
+        vals = values[mask]
+
+        self.counts[mask] += 1
+        delta = vals - self.means[mask]
+        self.means[mask] += delta / self.counts[mask]
+        self.m2s[mask] += delta * (vals - self.means[mask])
+        self._add_totals(mask, vals, 1)
+
+    def remove(self, values:np.ndarray):
+        '''
+        Purpose :
+            Fold one value per group out of the aggregates (reverse Welford update).
+        '''
+
+        mask = ~np.isnan(values)
+        vals = values[mask]
+
+        self.counts[mask] -= 1
+        counts = self.counts[mask]
+        means = self.means[mask]
+        new_means = np.where(counts > 0, (means * (counts + 1) - vals) / np.maximum(counts, 1), 0.)
+        self.m2s[mask] = np.where(counts > 0, self.m2s[mask] - (vals - means) * (vals - new_means), 0.)
+        self.means[mask] = new_means
+        self._add_totals(mask, vals, -1)
+
+    def _add_totals(self, mask:np.ndarray, vals:np.ndarray, sign:int):
+        self.totals[mask] += sign * vals
+        self.up_counts[mask] += sign * (vals > 0)
+        self.down_counts[mask] += sign * (vals < 0)
+        self.pos_totals[mask] += sign * np.where(vals > 0, vals, 0.)
+        self.neg_totals[mask] += sign * np.where(vals < 0, vals, 0.)
+
+    def std(self) -> np.ndarray:
+        '''
+        Purpose :
+            Output the sample standard deviation (NaN for less than 2 values).
+        '''
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 1, np.sqrt(np.maximum(self.m2s, 0.) / (self.counts - 1)), np.nan)
+
+
+# %%
+# --------------------------------------------------------------
+# Statistics Engine.
+# --------------------------------------------------------------
+
+class FreqStats:
+    '''
+    Purpose :
+        Statistics of the price difference for one date interval of a ticker.
+        The rows are reduced once into a (group x year) grid of sums and counts
+        (the pivot table), and every year range keeps running aggregates over
+        its year columns. New rows are folded into the grid, and only the cells
+        they change (or the years entering / leaving a range) are folded into
+        the running aggregates, rather than rescanning the history.
+
+    Input   :
+        freq : Str. Must be monthly / weekly / daily_by_trdr_day / daily_by_weekday.
+    '''
+
+    def __init__(self, freq:Text):
+        self.freq, self.group_cols = freq, FREQ_GROUP_COLS[freq]
+        self.groups = np.empty((0, len(self.group_cols)), dtype=np.int64)
+        self.years = np.empty(0, dtype=np.int64)
+        self.cell_totals = np.zeros((0, 0))
+        self.cell_counts = np.zeros((0, 0), dtype=np.int64)
+        self.first_yr = self.last_yr = None
+        self.last_date, self.tail = None, None
+        self.windows, self.running = {}, {}
+
+    @classmethod
+    def from_frame(cls, df:pd.DataFrame, freq:Text) -> 'FreqStats':
+        '''
+        Purpose :
+            Build the statistics from all the rows of a date interval.
+
+        Input   :
+            df   : Dataframe. Rows of (df_ticker.pickle) for the date interval.
+            freq : Str. Must be monthly / weekly / daily_by_trdr_day / daily_by_weekday.
+        '''
+
+        freq_stats = cls(freq)
+        freq_stats.update(df)
+        return freq_stats
+
+    @property
+    def cell_values(self) -> np.ndarray:
+        '''
+        Purpose :
+            Output the (group x year) grid of price differences (the mean of the
+            rows within each cell, NaN for an empty cell).
+        '''
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.cell_counts > 0, self.cell_totals / np.maximum(self.cell_counts, 1), np.nan)
+
+    def _fold_rows(self, df:pd.DataFrame, sign:int):
+        '''
+        Purpose :
+            Add (or subtract) the rows into the grid of sums and counts, adding new
+            groups and years to the grid if needed.
+        '''
+
+        df = df.loc[df['price_diff'].notna()]
+        if df.empty:
+            return
+
+        cells = df.groupby(self.group_cols + ['year'])['price_diff'].agg(['sum', 'count'])
+        cell_groups = np.array(cells.index.droplevel('year').tolist(), dtype=np.int64).reshape(len(cells), -1)
+        cell_years = cells.index.get_level_values('year').to_numpy(dtype=np.int64)
+
+        # Add the new groups & years to the grid.
+        new_groups = np.unique(cell_groups, axis=0)
+        if len(self.groups):
+            known = {tuple(group) for group in self.groups}
+            new_groups = np.array([group for group in new_groups if tuple(group) not in known], dtype=np.int64)
+        if len(new_groups):
+            self.groups = np.concatenate([self.groups, new_groups.reshape(-1, len(self.group_cols))])
+            for running_stats in self.running.values():
+                running_stats.resize(len(self.groups))
+
+        old_years, self.years = self.years, np.union1d(self.years, cell_years)
+        self.cell_totals = self._pad_grid(self.cell_totals, old_years, 0.)
+        self.cell_counts = self._pad_grid(self.cell_counts, old_years, 0)
+
+        # Add (or subtract) the sums & counts.
+        group_pos = {tuple(group): idx for idx, group in enumerate(self.groups)}
+        row_idx = np.array([group_pos[tuple(group)] for group in cell_groups])
+        col_idx = np.searchsorted(self.years, cell_years)
+        np.add.at(self.cell_totals, (row_idx, col_idx), sign * cells['sum'].to_numpy())
+        np.add.at(self.cell_counts, (row_idx, col_idx), sign * cells['count'].to_numpy())
+
+    def _pad_grid(self, grid:np.ndarray, years:np.ndarray, fill_value) -> np.ndarray:
+        '''
+        Purpose :
+            Pad a (group x year) grid over the given years to the current groups and years.
+        '''
+
+        new_grid = np.full((len(self.groups), len(self.years)), fill_value, dtype=grid.dtype)
+        new_grid[:grid.shape[0], np.searchsorted(self.years, years)] = grid
+        return new_grid
+
+    def update(self, df:pd.DataFrame):
+        '''
+        Purpose :
+            Fold new rows into the statistics. The rows on or after the last date
+            seen replace the rows of that date (the latest period is updated as
+            new trading days arrive), and the earlier rows are ignored.
+
+        Input   :
+            df : Dataframe. Rows of (df_ticker.pickle) for the date interval.
+        '''
+
+        if self.last_date is not None:
+            df = df.loc[df['date'] >= self.last_date]
+        if df.empty:
+            return
+
+        old_values, old_years, old_windows = self.cell_values, self.years.copy(), dict(self.windows)
+
+        # Replace the rows of the last date seen.
+        if self.tail is not None:
+            self._fold_rows(self.tail, -1)
+        self._fold_rows(df, 1)
+
+        self.first_yr = int(df['year'].min()) if self.first_yr is None else min(self.first_yr, int(df['year'].min()))
+        self.last_yr = int(df['year'].max()) if self.last_yr is None else max(self.last_yr, int(df['year'].max()))
+        self.last_date = df['date'].max()
+        self.tail = df.loc[df['date'] == self.last_date, ['date', 'year', 'price_diff'] + self.group_cols].copy()
+
+        # Fold the changed cells (and the years entering / leaving a range) into the running aggregates.
+        new_values = self.cell_values
+        old_values = self._pad_grid(old_values, old_years, np.nan)
+        for yr_range in YR_RANGE:
+            window = get_yr_window(yr_range, self.first_yr, self.last_yr)
+            if window is None:
+                self.windows.pop(yr_range, None)
+                self.running.pop(yr_range, None)
+                continue
+
+            self.windows[yr_range] = window
+            running_stats = self.running.setdefault(yr_range, RunningStats(len(self.groups)))
+            old_window = old_windows.get(yr_range)
+
+            for col_idx, year in enumerate(self.years):
+                in_old = old_window is not None and old_window[0] < year < old_window[1]
+                in_new = window[0] < year < window[1]
+                old_col = old_values[:, col_idx] if in_old else np.full(len(self.groups), np.nan)
+                new_col = new_values[:, col_idx] if in_new else np.full(len(self.groups), np.nan)
+
+                changed = ~((old_col == new_col) | (np.isnan(old_col) & np.isnan(new_col)))
+                if changed.any():
+                    running_stats.remove(np.where(changed, old_col, np.nan))
+                    running_stats.add(np.where(changed, new_col, np.nan))
+
+    def _group_order(self) -> np.ndarray:
+        return np.lexsort(self.groups.T[::-1])
+
+    def to_pivot_table(self) -> pd.DataFrame:
+        '''
+        Purpose :
+            Output the pivot table of the price differences (groups by years).
+        '''
+
+        order = self._group_order()
+        has_data = self.cell_counts.sum(axis=0) > 0
+        pivot_table = pd.DataFrame(self.cell_values[order][:, has_data], columns=pd.Index(self.years[has_data], name='year'))
+        for idx, col in enumerate(self.group_cols):
+            pivot_table.insert(idx, col, self.groups[order, idx])
+        return pivot_table
+
+    def to_stats(self, yr_range:Text) -> pd.DataFrame:
+        '''
+        Purpose :
+            Output the statistics table of a year range (same columns as the tables
+            of pivot_stats.pickle).
+        '''
+
+        order = self._group_order()
+        running_stats = self.running[yr_range]
+        lower_yr, upper_yr = self.windows[yr_range]
+        window_values = self.cell_values[order][:, (self.years > lower_yr) & (self.years < upper_yr)]
+
+        return assemble_stats(
+            self.group_cols, self.groups[order], window_values, running_stats.counts[order],
+            running_stats.totals[order], running_stats.std()[order], running_stats.up_counts[order],
+            running_stats.down_counts[order], running_stats.pos_totals[order], running_stats.neg_totals[order],
+            means=running_stats.means[order],
+        )
+
+
+# %%
+# --------------------------------------------------------------
+# Single-pass Multi-window Aggregation.
+# --------------------------------------------------------------
+
+class YearPrefixSums:
+    '''
+    Purpose :
+        Prefix sums along the year-sorted (group x year) grid of price differences:
+        counts, totals, squared totals, up / down counts and positive / negative
+        totals. The rows are scanned once (a single groupby), and the aggregates of
+        any range of years are the difference of two prefix columns.
+
+    Input   :
+        group_cols : List. Columns to group by such as month / week.
+        groups     : Array. Values of the group columns (one row per group).
+        years      : Array. Sorted years (one column per year).
+        values     : Array. (Group x year) price differences (NaN for no value).
+        yr_bounds  : Tuple. First and last complete year (all the years if None).
+    '''
+
+    def __init__(
+            self,
+            group_cols:List[Text],
+            groups:np.ndarray,
+            years:np.ndarray,
+            values:np.ndarray,
+            yr_bounds:Optional[Tuple[int, int]]=None,
+        ):
+        self.group_cols, self.groups, self.years, self.values = group_cols, groups, years, values
+        self.yr_bounds = yr_bounds or (int(years.min()), int(years.max()))
+
+        has_value = ~np.isnan(values)
+        filled = np.where(has_value, values, 0.)
+        aggregates = {
+            'counts': has_value.astype(np.int64),
+            'totals': filled,
+            'sq_totals': filled ** 2,
+            'up_counts': (filled > 0).astype(np.int64),
+            'down_counts': (filled < 0).astype(np.int64),
+            'pos_totals': np.where(filled > 0, filled, 0.),
+            'neg_totals': np.where(filled < 0, filled, 0.),
+        }
+
+        # Leading column of zeros so that the window [a, b) is prefix[:, b] - prefix[:, a].
+        self.prefix = {
+            name: np.concatenate([np.zeros((len(groups), 1), dtype=arr.dtype), np.cumsum(arr, axis=1)], axis=1)
+            for name, arr in aggregates.items()
+        }
+
+    @classmethod
+    def from_frame(cls, df:pd.DataFrame, freq:Text) -> 'YearPrefixSums':
+        '''
+        Purpose :
+            Build the prefix sums from all the rows of a date interval.
+
+        Input   :
+            df   : Dataframe. Rows of (df_ticker.pickle) for the date interval.
+            freq : Str. Must be monthly / weekly / daily_by_trdr_day / daily_by_weekday.
+        '''
+
+        group_cols = FREQ_GROUP_COLS[freq]
+        grid = df.groupby(group_cols + ['year'])['price_diff'].mean().unstack('year').sort_index(axis=1)
+        groups = np.array(grid.index.tolist(), dtype=np.int64).reshape(len(grid), -1)
+
+        # The first and the last year of the data are partial years.
+        yr_bounds = int(df['year'].min()) + 1, int(df['year'].max()) - 1
+        return cls(group_cols, groups, grid.columns.to_numpy(dtype=np.int64), grid.to_numpy(dtype=float), yr_bounds)
+
+    @classmethod
+    def from_pivot_table(cls, pivot_table:pd.DataFrame, group_cols:List[Text]) -> 'YearPrefixSums':
+        '''
+        Purpose :
+            Build the prefix sums from a pivot table of complete years (group columns
+            plus one column per year) such as the compiled_holiday table of
+            pivot_unique_days.pickle. The order of the groups is kept.
+        '''
+
+        grid = pivot_table.set_index(group_cols)
+        grid.columns = grid.columns.astype(int)
+        grid = grid.sort_index(axis=1)
+        return cls(
+            group_cols, pivot_table[group_cols].to_numpy(), grid.columns.to_numpy(dtype=np.int64),
+            grid.to_numpy(dtype=float),
+        )
+
+    def __sizeof__(self) -> int:
+        return self.values.nbytes + self.groups.nbytes + sum(prefix.nbytes for prefix in self.prefix.values())
+
+    def get_window_idx(self, lower_yr:int, upper_yr:int) -> Tuple[int, int]:
+        '''
+        Purpose :
+            Output the positions [a, b) of the years within (lower_yr, upper_yr).
+        '''
+
+        return (
+            int(np.searchsorted(self.years, lower_yr, side='right')),
+            int(np.searchsorted(self.years, upper_yr, side='left')),
+        )
+
+    def stats(self, lower_yr:int, upper_yr:int) -> pd.DataFrame:
+        '''
+        Purpose :
+            Output the statistics table for the years within (lower_yr, upper_yr).
+
+        Input   :
+            lower_yr : Int. Exclusive lower bound of the years.
+            upper_yr : Int. Exclusive upper bound of the years.
+
+        Output  :
+            Dataframe. Statistics table (same columns as pivot_stats.pickle).
+        '''
+
+        start, end = self.get_window_idx(lower_yr, upper_yr)
+        window = {name: prefix[:, end] - prefix[:, start] for name, prefix in self.prefix.items()}
+
+        counts, totals = window['counts'], window['totals']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (window['sq_totals'] - totals ** 2 / counts) / (counts - 1)
+            std_diff = np.where(counts > 1, np.sqrt(np.maximum(variance, 0.)), np.nan)
+
+        return assemble_stats(
+            self.group_cols, self.groups, self.values[:, start:end], counts, totals, std_diff,
+            window['up_counts'], window['down_counts'], window['pos_totals'], window['neg_totals'],
+        )
+
+    def stats_for_years(self, start_yr:int, end_yr:int) -> pd.DataFrame:
+        '''
+        Purpose :
+            Output the statistics table from the start year to the end year (inclusive).
+        '''
+
+        return self.stats(start_yr - 1, end_yr + 1)
+
+
+def compute_multi_window_stats(df_ticker:Dict[Text, pd.DataFrame]) -> Dict[Text, pd.DataFrame]:
+    '''
+    Purpose :
+        Compute the statistics tables of every date interval and year range in a
+        single pass over the rows of each date interval (rather than one groupby
+        per year range).
+
+    Input   :
+        df_ticker : Dict. Dataframes of (df_ticker.pickle) for each date interval.
+
+    Output  :
+        Dict obj keyed like the statistics of pivot_stats.pickle (the tables read by
+        (plot_price_diff)).
+    '''
+
+    prefix_sums = {freq: YearPrefixSums.from_frame(df_ticker[freq], freq) for freq in FREQ_KEYS}
+    yr_bounds = {freq: (int(df_ticker[freq]['year'].min()), int(df_ticker[freq]['year'].max())) for freq in FREQ_KEYS}
+
+    stats = {}
+    for freq, yr_range in iter_freq_yr_ranges():
+        window = get_yr_window(yr_range, *yr_bounds[freq])
+        if window is not None:
+            stats[get_stats_key(freq, yr_range)] = prefix_sums[freq].stats(*window)
+    return stats
+
+
+# %%
+# --------------------------------------------------------------
+# Year Range Index.
+# --------------------------------------------------------------
+
+def build_year_range_index(etf_dir:Text, ticker:Text) -> Dict[Text, YearPrefixSums]:
+    '''
+    Purpose :
+        Build the prefix sums of a ticker for any range of years: one for each date
+        interval (from df_ticker.pickle) and one for the holidays (from the
+        compiled_holiday pivot table of pivot_unique_days.pickle).
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+
+    Output  :
+        Dict obj containing the prefix sums keyed like the pivot tables
+        (monthly, weekly, daily_by_trdr_day, daily_by_weekday, compiled_holiday).
+    '''
+
+    logger.info(f'Start running (build_year_range_index) function for ({etf_dir}/{ticker}).')
+
+    storage_dir = get_storage_dir(etf_dir, ticker)
+    df_ticker = normalise_frames(pd.read_pickle(os.path.join(storage_dir, 'df_ticker.pickle')))
+    index = {freq: YearPrefixSums.from_frame(df_ticker[freq], freq) for freq in FREQ_KEYS}
+
+    pivot_unique_days = pd.read_pickle(os.path.join(storage_dir, 'pivot_unique_days.pickle'))
+    index['compiled_holiday'] = YearPrefixSums.from_pivot_table(
+        pivot_unique_days[0][0]['compiled_holiday'], ['holiday_category', 'day_counts']
+    )
+    return index
+
+
+@cache_in(DATA_CACHE)
+def load_year_range_index(etf_dir:Text, ticker:Text, mtimes:Tuple[float, ...]) -> Dict[Text, YearPrefixSums]:
+    '''
+    Purpose :
+        Same as (build_year_range_index) but cached in memory. The modified times of
+        the source files are part of the cache key, so a data update rebuilds the index.
+    '''
+
+    return build_year_range_index(etf_dir, ticker)
+
+
+def read_year_range_index(etf_dir:Text, ticker:Text) -> Dict[Text, YearPrefixSums]:
+    '''
+    Purpose :
+        Output the (cached) year range index of a ticker.
+    '''
+
+    mtimes = tuple(get_source_mtime(etf_dir, ticker, filename) for filename in YEAR_RANGE_INDEX_SOURCES)
+    return load_year_range_index(etf_dir, ticker, mtimes)
+
+
+# %%
+# --------------------------------------------------------------
+# Ticker Statistics.
+# --------------------------------------------------------------
+
+def build_engine(df_ticker:Dict[Text, pd.DataFrame]) -> Dict[Text, FreqStats]:
+    '''
+    Purpose :
+        Build the statistics for every date interval of a ticker.
+
+    Input   :
+        df_ticker : Dict. Dataframes of (df_ticker.pickle) for each date interval.
+
+    Output  :
+        Dict obj containing the statistics for each date interval.
+    '''
+
+    return {freq: FreqStats.from_frame(df_ticker[freq], freq) for freq in FREQ_KEYS}
+
+
+def update_engine(engine:Dict[Text, FreqStats], df_ticker:Dict[Text, pd.DataFrame]):
+    '''
+    Purpose :
+        Fold the rows added to (df_ticker.pickle) since the last update into the statistics.
+    '''
+
+    for freq in FREQ_KEYS:
+        engine[freq].update(df_ticker[freq])
+
+
+def compute_pivot_stats(engine:Dict[Text, FreqStats]) -> Tuple[Dict[Text, pd.DataFrame], Dict[Text, pd.DataFrame]]:
+    '''
+    Purpose :
+        Output the pivot tables in the layout of pivot_stats.pickle.
+
+    Input   :
+        engine : Dict. Statistics for each date interval from (build_engine).
+
+    Output  :
+        Tuple obj containing the pivot tables of price differences and the
+        statistics tables for every date interval / year range.
+    '''
+
+    pivot_tables = {freq: engine[freq].to_pivot_table() for freq in FREQ_KEYS}
+    stats = {
+        get_stats_key(freq, yr_range): engine[freq].to_stats(yr_range)
+        for freq, yr_range in iter_freq_yr_ranges() if yr_range in engine[freq].windows
+    }
+    return pivot_tables, stats
+
+
+def refresh_pivot_stats(etf_dir:Text, ticker:Text, rebuild:bool=False, write:bool=True) -> Tuple[Dict, Dict]:
+    '''
+    Purpose :
+        Update the statistics of a ticker with (df_ticker.pickle) and write
+        pivot_stats.pickle. The running aggregates are kept within the storage
+        directory so the next refresh only folds in the new rows.
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker  : Str. Ticker symbol.
+        rebuild : Boo. To rebuild the statistics from all the rows.
+        write   : Boo. To write pivot_stats.pickle and the running aggregates.
+
+    Output  :
+        Tuple obj in the layout of pivot_stats.pickle.
+    '''
+
+    logger.info(f'Start running (refresh_pivot_stats) function for ({etf_dir}/{ticker}).')
+
+    storage_dir = get_storage_dir(etf_dir, ticker)
+    state_path = os.path.join(storage_dir, STATS_ENGINE_STATE_FILENAME)
+    df_ticker = pd.read_pickle(os.path.join(storage_dir, 'df_ticker.pickle'))
+
+    if not rebuild and os.path.exists(state_path):
+        with open(state_path, 'rb') as in_file:
+            engine = pickle.load(in_file)
+        update_engine(engine, df_ticker)
+    else:
+        engine = build_engine(df_ticker)
+
+    pivot_stats = compute_pivot_stats(engine)
+    if write:
+        for path, obj in [(state_path, engine), (os.path.join(storage_dir, 'pivot_stats.pickle'), pivot_stats)]:
+            with open(f'{path}.tmp', 'wb') as out_file:
+                pickle.dump(obj, out_file)
+            os.replace(f'{path}.tmp', path)
+    return pivot_stats
+
+
+def compare_pivot_stats(pivot_stats:Tuple[Dict, Dict], other:Tuple[Dict, Dict]) -> List[Text]:
+    '''
+    Purpose :
+        Output the keys of the tables that differ between two pivot_stats tuples.
+    '''
+
+    mismatches = []
+    for tables, other_tables in zip(pivot_stats, other):
+        for key in sorted(set(tables) | set(other_tables)):
+            try:
+                pd.testing.assert_frame_equal(
+                    tables[key], other_tables[key], check_dtype=False, check_names=False, check_column_type=False
+                )
+            except (KeyError, AssertionError):
+                mismatches.append(key)
+    return mismatches
+
+
+# %%
+# --------------------------------------------------------------
+# Command Line.
+# --------------------------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute pivot_stats.pickle from df_ticker.pickle.')
+    parser.add_argument(
+        '--etf-dir', action='append', dest='etf_dirs',
+        help='ETF directory to compute (repeatable). Defaults to every ETF directory.'
+    )
+    parser.add_argument('--ticker', action='append', dest='tickers', help='Ticker to compute (repeatable).')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the statistics from all the rows.')
+    parser.add_argument(
+        '--check', action='store_true',
+        help='Compare with the existing pivot_stats.pickle instead of writing it.'
+    )
+    args = parser.parse_args()
+
+    etf_dirs = args.etf_dirs or ['ETF_sector'] + ['/'.join(['ETF_equity', etf]) for etf in ETF_EQUITY]
+    for etf_dir in etf_dirs:
+        for ticker in list_tickers(etf_dir):
+            if args.tickers and ticker not in args.tickers:
+                continue
+
+            pivot_stats = refresh_pivot_stats(etf_dir, ticker, args.rebuild, write=not args.check)
+            if args.check:
+                existing = pd.read_pickle(os.path.join(get_storage_dir(etf_dir, ticker), 'pivot_stats.pickle'))
+                mismatches = compare_pivot_stats(pivot_stats, existing)
+                print(f'{etf_dir}/{ticker}: {"mismatch " + ", ".join(mismatches) if mismatches else "match"}')
+            else:
+                print(f'{etf_dir}/{ticker}: {len(pivot_stats[1])} tables written')
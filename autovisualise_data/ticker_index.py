@@ -0,0 +1,311 @@
+
+
+# %%
+import os, re, hashlib, logging, threading
+import pandas as pd
+
+from typing import Dict, List, Optional, Text, Tuple
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    DATASET_ABS_DIR,
+    ETF_DIRS,
+    COLUMNAR_STORE_DIRNAME,
+    PANEL_STORE_FILENAME,
+    PIVOT_PICKLE_FILENAMES,
+    TICKER_INDEX_WATCH,
+    TICKER_INDEX_REFRESH_DELAY,
+)
+from config.config_logger import setup_logger
+from autovisualise_data.pivot_store import get_storage_dir, get_bundle_name, read_bundles
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# File Entries.
+# --------------------------------------------------------------
+
+def hash_file(file_path:Text, chunk_size:int=1024 ** 2) -> Text:
+    '''
+    Purpose :
+        Output the sha256 hash of a file (read in chunks).
+    '''
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as in_file:
+        for chunk in iter(lambda: in_file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_table_keys(etf_dir:Text, ticker:Text, filename:Text) -> Dict[Text, List[Text]]:
+    '''
+    Purpose :
+        Output the keys of the pivot tables within a pickle file for each bundle.
+    '''
+
+    return {
+        get_bundle_name(filename, get_idx): list(pivot_stats.keys())
+        for get_idx, pivot_stats in read_bundles(etf_dir, ticker, filename).items()
+    }
+
+
+def read_date_coverage(etf_dir:Text, ticker:Text) -> Optional[Tuple[Text, Text]]:
+    '''
+    Purpose :
+        Output the first & last date (ISO format) of the price data of a ticker.
+    '''
+
+    with open(os.path.join(get_storage_dir(etf_dir, ticker), 'df_ticker.pickle'), 'rb') as in_file:
+        df_ticker = pd.read_pickle(in_file)
+
+    dates = pd.concat([df['date'] for df in df_ticker.values()])
+    return dates.min().date().isoformat(), dates.max().date().isoformat()
+
+
+# %%
+# --------------------------------------------------------------
+# Ticker Index.
+# --------------------------------------------------------------
+
+class TickerIndex:
+    '''
+    Purpose :
+        Manifest of the ETF directories -> tickers -> files (mtime, size, sha256),
+        table keys and date coverage. It's built once, then only the changed ETF
+        directories are rescanned (files are only hashed / read again if their mtime
+        or size changed). Queries are dict lookups, they never touch the filesystem.
+
+        The manifest is replaced as a whole on refresh, so a reader on another
+        thread sees either the old or the new manifest.
+
+    Input   :
+        etf_dirs : List. ETF directories such as ETF_sector or ETF_equity/PPA.
+    '''
+
+    def __init__(self, etf_dirs:List[Text]=ETF_DIRS):
+        self.etf_dirs = list(etf_dirs)
+        self._manifest = {}
+        self._file_entries = {}
+        self._lock = threading.Lock()
+        self._observer, self._timer, self._dirty = None, None, set()
+
+    def __repr__(self) -> Text:
+        return f'TickerIndex({", ".join(self.etf_dirs)})'
+
+    # ----------------------------------------------------------
+    # Build.
+    # ----------------------------------------------------------
+
+    def _scan_file(self, etf_dir:Text, ticker:Text, filename:Text) -> Dict:
+        file_path = os.path.join(get_storage_dir(etf_dir, ticker), filename)
+        stat = os.stat(file_path)
+
+        # Reuse the entry if the file hasn't changed since the last scan.
+        cached = self._file_entries.get(file_path)
+        if cached is not None and (cached['mtime'], cached['size']) == (stat.st_mtime, stat.st_size):
+            return cached
+
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': hash_file(file_path), 'table_keys': {}}
+        try:
+            if filename in PIVOT_PICKLE_FILENAMES:
+                entry['table_keys'] = read_table_keys(etf_dir, ticker, filename)
+            elif filename == 'df_ticker.pickle':
+                entry['coverage'] = read_date_coverage(etf_dir, ticker)
+        except Exception:
+            logger.exception(f'----- Exception occurs while trying to index ({file_path}).')
+
+        self._file_entries[file_path] = entry
+        return entry
+
+    def _scan_ticker(self, etf_dir:Text, ticker:Text) -> Dict:
+        storage_dir = get_storage_dir(etf_dir, ticker)
+        filenames = sorted(filename for filename in os.listdir(storage_dir) if filename.endswith('.pickle'))
+        files = {filename: self._scan_file(etf_dir, ticker, filename) for filename in filenames}
+
+        table_keys = {}
+        for entry in files.values():
+            table_keys.update(entry['table_keys'])
+
+        return {
+            'files': {filename: {key: entry[key] for key in ['mtime', 'size', 'sha256']} for filename, entry in files.items()},
+            'table_keys': table_keys,
+            'coverage': files.get('df_ticker.pickle', {}).get('coverage'),
+        }
+
+    def _scan_etf_dir(self, etf_dir:Text) -> Dict[Text, Dict]:
+        re_compile = re.compile(r'[^.][A-Z]')
+        try:
+            tickers = sorted(filter(re_compile.match, os.listdir(os.path.join(DATASET_ABS_DIR, etf_dir))))
+        except OSError:
+            logger.debug(f'----- Failed to capture a list of ticker symbol for ({etf_dir}) directory.')
+            return {}
+
+        scanned = {}
+        for ticker in tickers:
+            try:
+                scanned[ticker] = self._scan_ticker(etf_dir, ticker)
+            except OSError:
+                logger.exception(f'----- Exception occurs while trying to index ({etf_dir}/{ticker}).')
+        return scanned
+
+    def build(self) -> 'TickerIndex':
+        '''
+        Purpose :
+            Scan every ETF directory.
+        '''
+
+        logger.info('Start running (TickerIndex.build) function.')
+
+        self.refresh(self.etf_dirs)
+        return self
+
+    def refresh(self, etf_dirs:List[Text]):
+        '''
+        Purpose :
+            Rescan some ETF directories and swap them into the manifest.
+        '''
+
+        with self._lock:
+            manifest = dict(self._manifest)
+            for etf_dir in etf_dirs:
+                manifest[etf_dir] = self._scan_etf_dir(etf_dir)
+                logger.debug(f'----- Indexed ({len(manifest[etf_dir])}) tickers for ({etf_dir}) directory.')
+            self._manifest = manifest
+
+    # ----------------------------------------------------------
+    # File Watcher.
+    # ----------------------------------------------------------
+
+    def _get_etf_dir(self, path:Text) -> Optional[Text]:
+        rel_path = os.path.relpath(path, DATASET_ABS_DIR).replace(os.sep, '/')
+
+        # The columnar store, the panel file and temporary files don't change the manifest.
+        if f'/{COLUMNAR_STORE_DIRNAME}/' in f'/{rel_path}/' or rel_path.endswith(('.tmp', PANEL_STORE_FILENAME)):
+            return None
+
+        matched = [etf_dir for etf_dir in self.etf_dirs if f'{rel_path}/'.startswith(f'{etf_dir}/')]
+        return max(matched, key=len) if matched else None
+
+    def _refresh_dirty(self):
+        with self._lock:
+            dirty, self._dirty, self._timer = self._dirty, set(), None
+        self.refresh(sorted(dirty))
+
+    def on_file_event(self, path:Text):
+        '''
+        Purpose :
+            Mark the ETF directory of a changed path as dirty. Dirty directories are
+            rescanned once the events have settled for (TICKER_INDEX_REFRESH_DELAY).
+        '''
+
+        etf_dir = self._get_etf_dir(path)
+        if etf_dir is None:
+            return
+
+        with self._lock:
+            self._dirty.add(etf_dir)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(TICKER_INDEX_REFRESH_DELAY, self._refresh_dirty)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def start_watching(self):
+        '''
+        Purpose :
+            Refresh the manifest whenever a file changes within the dataset directory.
+        '''
+
+        if self._observer is not None:
+            return
+
+        self._observer = Observer()
+        self._observer.schedule(TickerIndexEventHandler(self), DATASET_ABS_DIR, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def stop_watching(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    # ----------------------------------------------------------
+    # Queries.
+    # ----------------------------------------------------------
+
+    def get_tickers(self, etf_dir:Text) -> List[Text]:
+        return list(self._manifest.get(etf_dir, {}))
+
+    def get_ticker(self, etf_dir:Text, ticker:Text) -> Dict:
+        return self._manifest[etf_dir][ticker]
+
+    def get_files(self, etf_dir:Text, ticker:Text) -> Dict[Text, Dict]:
+        return self.get_ticker(etf_dir, ticker)['files']
+
+    def get_file_hash(self, etf_dir:Text, ticker:Text, filename:Text) -> Text:
+        return self.get_files(etf_dir, ticker)[filename]['sha256']
+
+    def get_file_mtime(self, etf_dir:Text, ticker:Text, filename:Text) -> float:
+        file_entry = self.get_files(etf_dir, ticker).get(filename)
+        return file_entry['mtime'] if file_entry else 0.
+
+    def get_table_keys(self, etf_dir:Text, ticker:Text, bundle:Text) -> List[Text]:
+        return self.get_ticker(etf_dir, ticker)['table_keys'].get(bundle, [])
+
+    def get_coverage(self, etf_dir:Text, ticker:Text) -> Optional[Tuple[Text, Text]]:
+        return self.get_ticker(etf_dir, ticker)['coverage']
+
+
+class TickerIndexEventHandler(FileSystemEventHandler):
+    '''
+    Purpose :
+        Pass the file events within the dataset directory to the ticker index.
+    '''
+
+    def __init__(self, ticker_index:TickerIndex):
+        self.ticker_index = ticker_index
+
+    def on_any_event(self, event):
+        self.ticker_index.on_file_event(event.src_path)
+        if getattr(event, 'dest_path', None):
+            self.ticker_index.on_file_event(event.dest_path)
+
+
+# %%
+# --------------------------------------------------------------
+# Shared Index.
+# --------------------------------------------------------------
+
+TICKER_INDEX = None
+TICKER_INDEX_LOCK = threading.Lock()
+
+
+def get_ticker_index() -> TickerIndex:
+    '''
+    Purpose :
+        Output the ticker index shared by every session. It's built on first use
+        and watched for file changes (unless TICKER_INDEX_WATCH is disabled).
+    '''
+
+    global TICKER_INDEX
+    if TICKER_INDEX is None:
+        with TICKER_INDEX_LOCK:
+            if TICKER_INDEX is None:
+                ticker_index = TickerIndex(ETF_DIRS).build()
+                if TICKER_INDEX_WATCH:
+                    ticker_index.start_watching()
+                TICKER_INDEX = ticker_index
+    return TICKER_INDEX
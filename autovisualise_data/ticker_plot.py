@@ -2,16 +2,11 @@
 
 # %%
 import os, logging, re
+import numpy as np
 import pandas as pd
-import streamlit as st
-import holoviews as hv 
-import hvplot.pandas
 
 from datetime import datetime
-from typing import Dict, List, Text, Optional, Tuple
-
-# Holoview config. 
-hv.extension('bokeh')
+from typing import Dict, List, Mapping, Text, Optional, Tuple, Union
 
 # Pandas config. 
 pd.options.display.float_format = '{:,.4f}'.format 
@@ -20,8 +15,15 @@ pd.options.display.float_format = '{:,.4f}'.format
 from config.config import FREQ_KEYS, LOG_PROCESSING_FILEPATH
 from config.config_logger import setup_logger
 from config.config_dashboard import (
-    HV_PN_WIDTH, HV_TOOLS_FOR_TICKER
+    HV_PN_WIDTH, HV_TOOLS_FOR_TICKER, 
+    TABLE_FORMATTER, TABLE_HIGHLIGHT_CSS, TABLE_NULL_CSS, TABLE_BAR_CSS, TABLE_BAR_COLORS, 
 )
+from autovisualise_data.data_cache import DATA_CACHE, cache_in
+from autovisualise_data.group_index import select_group
+from autovisualise_data.plot_backend import hv, uses_holoviews
+from autovisualise_data.pivot_store import LazyPivotStats, derive_table, get_source_mtime, read_pickle_bundle
+from autovisualise_data.ticker_index import get_ticker_index
+from autovisualise_data.stats_engine import get_stats_key, read_year_range_index
 
 
 # --------------------------------------------------------------
@@ -41,38 +43,16 @@ def get_ticker_options(etf_dir:Text) -> List[Text]:
     '''
     Purpose : 
         Output a list of ticker options based on the specified ETF directory. 
+        The tickers are looked up from the shared ticker index (no directory scan). 
 
     Input   :
-        etf_dir : Str. Full absolute path for the ETF directory. 
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA. 
                           
     Output  : 
         List obj containing a list of ticker options. 
     '''
 
-    logger.info('Start running (ticker_selector) function.')
-
-    # REFINE: Need to test how the data is being extracted on Streamlit Sharing. 
-    # Change directory. 
-    default_dir = os.getcwd()
-    os.chdir(os.environ['DATA_ABS_DIR'])
-    logger.debug(f'----- Changed to the data warehouse directory.') 
-
-    # Try, get a list of ticker symbols. 
-    # Otherwise, output an empty list. 
-    try:
-        ticker_list_dir = os.path.join(os.getcwd(), 'docs', 'dataset', etf_dir) 
-        re_compile = re.compile(r'[^.][A-Z]')
-        ls_tickers = list( filter(re_compile.match, os.listdir(ticker_list_dir)) )
-        logger.debug(f'----- Captured a list of ticker symbol for ({etf_dir}) directory.') 
-    except:
-        ls_tickers = []
-        logger.debug(f'----- Failed to capture a list of ticker symbol for ({etf_dir}) directory.') 
-    
-    # Change back to the original directory. 
-    os.chdir(default_dir) 
-    logger.debug(f'----- Changed to original directory.') 
-
-    return ls_tickers
+    return get_ticker_index().get_tickers(etf_dir)
 
 
 # %%
@@ -80,7 +60,30 @@ def get_ticker_options(etf_dir:Text) -> List[Text]:
 # Read File.
 # --------------------------------------------------------------
 
-@st.cache(persist=True)
+@cache_in(DATA_CACHE)
+def load_pickle(
+        etf_dir:Text, 
+        ticker:Text, 
+        filename:Text, 
+        get_idx:Optional[int], 
+        mtime:float, 
+    ) -> Dict[Text, pd.DataFrame]: 
+
+    '''
+    Purpose : 
+        Same as (read_pickle) but cached in memory. The modified time of the pickle 
+        file is part of the cache key, so a data update reads the file again. 
+    '''
+
+    # The path is resolved from the absolute dataset directory, so concurrent sessions 
+    # never depend on (or change) the process working directory. 
+    try:
+        return read_pickle_bundle(etf_dir, ticker, filename, get_idx) 
+    except: 
+        logger.exception(f'----- Exception occurs while trying to read data from ({filename}) file.') 
+        raise 
+
+
 def read_pickle(
         etf_dir:Text, 
         ticker:Text, 
@@ -94,7 +97,7 @@ def read_pickle(
         contains multiple dataframes. 
 
     Input   :
-        etf_dir : Str. Full absolute path for the ETF directory. 
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA. 
         ticker  : Str. Ticker symbol. 
         filename: Str. Name of the pickle file. 
         get_idx : Int. To get the specified internal tuple obj from an 
@@ -106,29 +109,38 @@ def read_pickle(
 
     logger.info('Start running (read_pickle) function.')
 
-    # REFINE: Need to test how the data is being extracted on Streamlit Sharing. 
-    # Change directory. 
-    default_dir = os.getcwd()
-    os.chdir(os.environ['DATA_ABS_DIR'])
-    logger.debug(f'----- Changed to the data warehouse directory.') 
+    return load_pickle(etf_dir, ticker, filename, get_idx, get_source_mtime(etf_dir, ticker, filename)) 
 
-    # Path to the directory that contains all the pickle files. 
-    storage_dir = os.path.join(os.getcwd(), 'docs', 'dataset', etf_dir, ticker, 'storage') 
 
-    try:
-        with open(f'{storage_dir}/{filename}', 'rb') as in_file: 
-            # Get the second dict obj which contains the statistics data from the tuple 
-            # if the pickle obj doesn't contain a tuple of tuples. 
-            pivot_stats = pd.read_pickle(in_file)[get_idx][1] if isinstance(get_idx, int) else pd.read_pickle(in_file)[1] 
-            logger.debug(f'----- Read data from ({filename}) file.') 
-    except: 
-        logger.exception(f'----- Exception occurs while trying to read data from ({filename}) file.') 
+def read_pivot_stats(
+        etf_dir:Text, 
+        ticker:Text, 
+        filename:Text, 
+        get_idx:Optional[int]=None
+    ) -> Mapping[Text, pd.DataFrame]: 
+
+    '''
+    Purpose : 
+        Same as (read_pickle) but return a lazy mapping which only reads a pivot 
+        table when its key is accessed. Tables are read from the columnar store 
+        if it's up to date, otherwise from the panel or pickle file. The mapping 
+        is cheap to create and holds no data (the tables are cached in DATA_CACHE 
+        under the pickle mtime), so it's created on each call. 
+
+    Input   :
+        etf_dir : Str. ETF directory such as ETF_sector or ETF_equity/PPA. 
+        ticker  : Str. Ticker symbol. 
+        filename: Str. Name of the pickle file. 
+        get_idx : Int. To get the specified internal tuple obj from an 
+                          external tuple if the pickle contains a tuple of tuples, 
+                          
+    Output  : 
+        Mapping obj containing multiple dataframes. 
+    '''
 
-    # Change back to the original directory. 
-    os.chdir(default_dir) 
-    logger.debug(f'----- Changed to original directory.') 
+    logger.info('Start running (read_pivot_stats) function.')
 
-    return pivot_stats 
+    return LazyPivotStats(etf_dir, ticker, filename, get_idx) 
 
 
 # %%
@@ -136,6 +148,18 @@ def read_pickle(
 # Display Price Change Table.
 # --------------------------------------------------------------
 
+def rearrange_columns(df:pd.DataFrame, freq:Text) -> pd.DataFrame:
+    '''
+    Purpose: 
+        Move the period columns (month / week / weekday, etc) to the front. 
+    '''
+
+    columns = df.columns.tolist()
+    freq_to_compare = set(['monthly', 'weekly', 'first_trdr_dom', 'super_day', 'santa_rally'])
+    col_idx = 1 if freq in freq_to_compare else 2 
+    return df.loc[:, columns[-col_idx:] + columns[:-col_idx]]
+
+
 def formatting_dataframe(df, freq):
     '''
     Purpose: 
@@ -149,26 +173,10 @@ def formatting_dataframe(df, freq):
         Formatted dataframe.
     '''
     
-    df_copy = df.copy()
-    
-    # Rearrange the column names. 
-    columns = df_copy.columns.tolist()
-    freq_to_compare = set(['monthly', 'weekly', 'first_trdr_dom', 'super_day', 'santa_rally'])
-    col_idx = 1 if freq in freq_to_compare else 2 
-    df_copy = df_copy.loc[:, columns[-col_idx:] + columns[:-col_idx]]
+    df_copy = rearrange_columns(df, freq)
     
     # Apply formatting. 
-    df_formatted = df_copy.style.format(formatter={
-        "avg_diff": "{:.3%}", 
-        "med_diff": "{:.3%}", 
-        "tot_diff": "{:.3%}",
-        "max_diff": "{:.3%}",
-        "min_diff": "{:.3%}",
-        "std_diff": "{:.3%}",
-        "pos_avg_diff": "{:.3%}",
-        "neg_avg_diff": "{:.3%}",
-        "up_prob": "{:.2%}",
-        "down_prob": "{:.2%}",})\
+    df_formatted = df_copy.style.format(formatter=TABLE_FORMATTER)\
     .hide_index()\
     .highlight_null(null_color='gray')\
     .applymap(lambda x: f'background-color: {"lightblue" if x > 0 else ""}', subset=['up_overall'])\
@@ -189,6 +197,108 @@ def formatting_dataframe(df, freq):
     return df_formatted
 
 
+def compute_bar_css(values:np.ndarray) -> np.ndarray:
+    '''
+    Purpose: 
+        Compute the CSS of the bars (as drawn by Styler.bar with align='mid') for 
+        a whole column at once. 
+
+    Input  :
+        values: Array. Float values of the column. 
+        
+    Return :
+        Array of CSS str (empty for null values). 
+    '''
+
+    is_null = np.isnan(values)
+    if is_null.all():
+        return np.full(values.shape, '', dtype=object)
+
+    # Position (percentage of the cell width) of each value and of zero. 
+    left, right = min(0., np.nanmin(values)), max(0., np.nanmax(values))
+    normed = 100 * (values - left) / (right - left + 1e-12)
+    zero = -100 * left / (right - left + 1e-12)
+    start, end = np.minimum(normed, zero), np.minimum(np.maximum(normed, zero), 100)
+
+    color = np.where(normed > zero, TABLE_BAR_COLORS[1], TABLE_BAR_COLORS[0]).astype(object)
+    start_pct = np.char.mod('%.1f%%', start).astype(object)
+    end_pct = np.char.mod('%.1f%%', end).astype(object)
+
+    gradient = np.where(start > 0, ' transparent ' + start_pct + ', ' + color + ' ' + start_pct + ',', '')
+    bar_css = (
+        TABLE_BAR_CSS + 'background: linear-gradient(90deg,' + gradient 
+        + ' ' + color + ' ' + end_pct + ', transparent ' + end_pct + ')'
+    )
+    bar_css = np.where(end > start, bar_css, TABLE_BAR_CSS)
+    return np.where(is_null, '', bar_css)
+
+
+def compute_table_css(df:pd.DataFrame, freq:Text) -> pd.DataFrame:
+    '''
+    Purpose: 
+        Compute the CSS of every cell with boolean masks, one pass per column: 
+        null cells, up_overall > 0, up / down probability >= 70 %, the bars and 
+        today's month / week. 
+
+    Input  :
+        df  : Dataframe. Pivot table with rearranged columns. 
+        freq: Str. Pivot table key such as monthly / weekly / compiled_holiday. 
+        
+    Return :
+        Dataframe of CSS str with the same shape as the pivot table. 
+    '''
+
+    css = np.full(df.shape, '', dtype=object)
+    col_pos = {col: idx for idx, col in enumerate(df.columns)}
+
+    # Get the current month or week of the year. 
+    today, freq_col = datetime.today().month, 'month'
+    if freq in set(['weekly','daily_by_weekday']):
+        today, freq_col = datetime.today().isocalendar()[1], 'week'
+
+    masks = [('up_overall', lambda x: x > 0), ('up_prob', lambda x: x >= .70), ('down_prob', lambda x: x >= .70)]
+    if freq in set(['monthly', 'weekly', 'daily_by_trdr_day', 'daily_by_weekday']): 
+        masks.append((freq_col, lambda x: x == today))
+
+    # Highlight (light blue). 
+    for col, to_mask in masks: 
+        if col in col_pos: 
+            with np.errstate(invalid='ignore'): 
+                mask = to_mask(df[col].to_numpy(dtype=float))
+            css[:, col_pos[col]] = np.where(mask, TABLE_HIGHLIGHT_CSS, '')
+
+    # Draw the bars. 
+    for col in ['avg_diff', 'med_diff', 'tot_diff', 'pos_avg_diff', 'neg_avg_diff']: 
+        if col in col_pos: 
+            css[:, col_pos[col]] = compute_bar_css(df[col].to_numpy(dtype=float))
+
+    # Highlight null (gray). 
+    css = np.where(df.isna().to_numpy(), TABLE_NULL_CSS, css)
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+
+def formatting_dataframe_vectorised(df, freq):
+    '''
+    Purpose: 
+        Formatting the dataframe like (formatting_dataframe), but the CSS of every 
+        cell is computed with boolean masks and applied with a single 
+        (Styler.apply) rather than with (applymap) lambdas run cell by cell. 
+
+    Input  :
+        df  : Dataframe. 
+        freq: Str. Must be either monthly / weekly / daily_by_trdr_day / daily_by_weekday. 
+        
+    Return :
+        Formatted dataframe.
+    '''
+
+    df_copy = rearrange_columns(df, freq)
+    table_css = compute_table_css(df_copy, freq)
+    return df_copy.style.format(formatter=TABLE_FORMATTER)\
+    .hide_index()\
+    .apply(lambda _: table_css, axis=None)
+
+
 def styling_dataframe(pivot_stats:Dict[Text, pd.DataFrame]) -> Dict[Text, pd.DataFrame]:
     '''
     Purpose: 
@@ -222,12 +332,40 @@ def styling_dataframe(pivot_stats:Dict[Text, pd.DataFrame]) -> Dict[Text, pd.Dat
     return pivot_stats_styled
 
 
+def get_pivot_data(
+        pivot_stats:Mapping[Text, pd.DataFrame], 
+        pivot_stats_key:Text, 
+        yr_range:Union[Text, Tuple[int, int]], 
+    ) -> pd.DataFrame:
+
+    '''
+    Purpose : 
+        Look for the pivot table of a year range. A year range given as a 
+        (start year, end year) tuple is computed from the year range index of 
+        the ticker rather than read from the pivot tables. 
+
+    Input   : 
+        pivot_stats    : Mapping. Lazy mapping of pivot tables from (read_pivot_stats). 
+        pivot_stats_key: Str. Key such as monthly / compiled_holiday. 
+        yr_range       : Str or Tuple. Year range key, or start & end year (inclusive). 
+
+    Return  :
+        Pivot table (dataframe). 
+    '''
+
+    if isinstance(yr_range, tuple): 
+        year_range_index = read_year_range_index(pivot_stats.etf_dir, pivot_stats.ticker)
+        return year_range_index[pivot_stats_key].stats_for_years(*yr_range)
+    return pivot_stats[get_stats_key(pivot_stats_key, yr_range)]
+
+
 def display_styled_table(
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         pivot_stats_key:Text, 
-        yr_range:Text, 
+        yr_range:Union[Text, Tuple[int, int]], 
         col_filter_by:Optional[Text]=None, 
         val_filter_to:Optional[List[Text]]=None, 
+        vectorised:bool=True, 
     ) -> pd.DataFrame:
 
     '''
@@ -237,24 +375,26 @@ def display_styled_table(
     Input   : 
         pivot_stats  : Dict. Containing multiple pivot tables (dataframes). 
         freq         : Str. Must be monthly / weekly / daily_by_trdr_day / daily_by_weekday. 
-        yr_range     : Str. Year range. 
+        yr_range     : Str or Tuple. Year range key, or start & end year (inclusive). 
         col_filter_by: Str. The column name to perform filtering. 
         val_filter_to: Str. The value for filtering the data. 
+        vectorised   : Boo. To style with (formatting_dataframe_vectorised). 
 
     Return  :
         Return specific styled pivot table (dataframe). 
     '''
     
-    stats_key = pivot_stats_key if yr_range == 'max_yr' else f'{pivot_stats_key}_{yr_range}' 
+    formatting = formatting_dataframe_vectorised if vectorised else formatting_dataframe
+    pivot_data = get_pivot_data(pivot_stats, pivot_stats_key, yr_range) 
     if (
         pivot_stats_key == 'compiled_holiday'
         or pivot_stats_key == 'compiled_tww'
         or pivot_stats_key == 'first_trdr_dom_by_month'
         or pivot_stats_key == 'super_day_by_month'
     ): 
-        to_filter = pivot_stats[stats_key][col_filter_by].isin(val_filter_to)
-        return formatting_dataframe(pivot_stats[stats_key].loc[to_filter,:], pivot_stats_key) 
-    return formatting_dataframe(pivot_stats[stats_key], pivot_stats_key) 
+        to_filter = pivot_data[col_filter_by].isin(val_filter_to)
+        return formatting(pivot_data.loc[to_filter,:], pivot_stats_key) 
+    return formatting(pivot_data, pivot_stats_key) 
     
 
 # %%
@@ -262,10 +402,11 @@ def display_styled_table(
 # Plot Price Change.
 # --------------------------------------------------------------
 
+@uses_holoviews
 def plot_price_diff(
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         freq:Text, 
-        yr_range:Text, 
+        yr_range:Union[Text, Tuple[int, int]], 
         period_spec:Optional[int]=None, 
     ) -> Tuple:
 
@@ -276,7 +417,7 @@ def plot_price_diff(
     Input  :
         pivot_stats : Str. Ticker symbol.
         freq        : Str. Must be monthly / weekly / daily_by_trdr_day / daily_by_weekday. 
-        yr_range    : Str. Year range. 
+        yr_range    : Str or Tuple. Year range key, or start & end year (inclusive). 
         period_spec : Int. To indicate the specific period for either month or week. 
 
     Return :
@@ -286,7 +427,7 @@ def plot_price_diff(
     logger.info('Start running (plot_price_diff) function.')
 
     # Look for the dataframe within the dictionary. 
-    pivot_data = pivot_stats[freq] if yr_range == 'max_yr' else pivot_stats[f'{freq}_{yr_range}']
+    pivot_data = get_pivot_data(pivot_stats, freq, yr_range)
 
     # Horizontal lines for probability. 
     upper_prob_hline = hv.HLine(0.7).opts(line_width=1, color='black')
@@ -294,9 +435,9 @@ def plot_price_diff(
 
     if freq in ['daily_by_trdr_day', 'daily_by_weekday']:
         try: 
-            # Filter the data to that specific period. 
+            # Filter the data to that specific period (a view from the group index of the table). 
             period = 'month' if freq == 'daily_by_trdr_day' else 'week' 
-            pivot_data = pivot_data.loc[pivot_data[period] == period_spec,:].copy()
+            pivot_data = select_group(pivot_data, period, period_spec)
 
             # Visualise the price change by month or week. 
             errorbar = pivot_data.hvplot.errorbars(y='avg_diff', yerr1='std_diff') 
@@ -342,8 +483,28 @@ def plot_price_diff(
 # Plot Volume Change.
 # --------------------------------------------------------------
 
+def get_overall_vol_table(pivot_stats:Mapping[Text, pd.DataFrame], key:Text) -> pd.DataFrame:
+    '''
+    Purpose : 
+        Look for an overall volume table of the volume bundle, or derive it if 
+        the pivot tables (such as a dict obj built elsewhere) don't have it. 
+
+    Input   : 
+        pivot_stats : Mapping. Pivot tables of the volume bundle. 
+        key         : Str. Key such as daily_by_weekday_overall_vol_row. 
+
+    Return  :
+        Dataframe. 
+    '''
+
+    if key in pivot_stats: 
+        return pivot_stats[key]
+    return derive_table(pivot_stats, key)
+
+
+@uses_holoviews
 def plot_vol_avg(
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         freq:Text, 
         period_spec:Optional[int]=None, 
         overall_vol:Optional[bool]=None, 
@@ -373,38 +534,32 @@ def plot_vol_avg(
     # Look for the dataframe within the dictionary. 
     pivot_data_vol_row = pivot_stats[f'{freq}_avg_vol_row'] 
 
-    # FIX: Level and axis for averaging. 
     if (freq == 'daily_by_trdr_day') or (freq == 'daily_by_weekday'):
         try: 
             period = 'month' if freq == 'daily_by_trdr_day' else 'week' 
-            col_for_computing_overall_avg = 'trdr_day' if freq == 'daily_by_trdr_day' else 'weekday' 
-            boo_period_spec = pivot_stats[freq][period] == period_spec
-
             if overall_vol:
-                # Set multi-level index for computing (mean) for specific index level at later stage. 
-                pivot_data_vol_row_multi_index = pivot_data_vol_row.set_index([period, col_for_computing_overall_avg]).copy()
-                
+                # Overall volume by month / week, precomputed within the volume bundle (see derive_table). 
+                pivot_data_overall_vol = get_overall_vol_table(pivot_stats, f'{freq}_overall_vol_row')
+
                 # Average volume horizontal line. 
-                avg_hline = hv.HLine(pivot_data_vol_row_multi_index.mean(level=1, axis=0).mean(axis=0)[0]).opts(line_width=1, color='black')
+                avg_hline = hv.HLine(pivot_data_overall_vol['avg_vol_row'].mean()).opts(line_width=1, color='black')
 
                 # Average volume by month / week. 
-                bar_avg_vol = pivot_data_vol_row_multi_index.mean(level=1, axis=0).hvplot(
+                bar_avg_vol = pivot_data_overall_vol.hvplot(
                     kind='bar', y='avg_vol_row', width=HV_PN_WIDTH, tools=HV_TOOLS_FOR_TICKER
                 )
                 logger.debug('----- Plotted (bar_avg_vol).')
 
                 # Above and below average counts by month / week. 
-                pivot_stats_filtered = pivot_stats[freq].loc[boo_period_spec,:]\
-                    .set_index([period, col_for_computing_overall_avg])\
-                    .copy()
-                bar_counts = pivot_stats_filtered.mean(level=1, axis=0).hvplot(
+                pivot_data_overall_counts = get_overall_vol_table(pivot_stats, f'{freq}_overall_vol_counts')
+                bar_counts = select_group(pivot_data_overall_counts, period, period_spec).hvplot(
                     kind='bar', y=['abv_avg_vol_counts','blw_avg_vol_counts'], width=HV_PN_WIDTH, 
                     stacked=True, legend='top', tools=HV_TOOLS_FOR_TICKER
                 )
                 logger.debug('----- Plotted (bar_counts).')
             else:
                 # Filter the data to that specific period. 
-                pivot_data_vol_row_filtered = pivot_data_vol_row.loc[pivot_data_vol_row[period] == period_spec,:]
+                pivot_data_vol_row_filtered = select_group(pivot_data_vol_row, period, period_spec)
 
                 # Average volume horizontal line. 
                 avg_hline = hv.HLine(pivot_data_vol_row_filtered.mean(axis=0)[0]).opts(line_width=1, color='black', tools=HV_TOOLS_FOR_TICKER)
@@ -414,8 +569,8 @@ def plot_vol_avg(
                 logger.debug('----- Plotted (pbar_avg_vol).')
 
                 # Above and below average counts by month / week. 
-                pivot_stats_filtered = pivot_stats[freq].loc[boo_period_spec,:]
-                bar_counts = pivot_stats_filtered.hvplot(
+                pivot_stats_period = select_group(pivot_stats[freq], period, period_spec)
+                bar_counts = pivot_stats_period.hvplot(
                     kind='bar', y=['abv_avg_vol_counts','blw_avg_vol_counts'], width=HV_PN_WIDTH, 
                     stacked=True, legend='top', tools=HV_TOOLS_FOR_TICKER
                 )
@@ -446,10 +601,11 @@ def plot_vol_avg(
 # Plot Price Change For Holiday.
 # --------------------------------------------------------------
 
+@uses_holoviews
 def plot_price_diff_holiday_period(        
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         holiday_key:Text, 
-        yr_range:Text, 
+        yr_range:Union[Text, Tuple[int, int]], 
     ) -> Tuple:
 
     '''
@@ -459,7 +615,7 @@ def plot_price_diff_holiday_period(
     Input  :
         pivot_stats : Str. Ticker symbol.
         holiday_key : Str. Specify the name of the holiday. 
-        yr_range    : Str. Year range. 
+        yr_range    : Str or Tuple. Year range key, or start & end year (inclusive). 
     
     Return :
         Tuple obj containing the holoview plots.
@@ -468,22 +624,22 @@ def plot_price_diff_holiday_period(
     logger.info('Start running (plot_price_diff_holiday_period) function.')
 
     # Look for the dataframe within the dictionary. 
-    pivot_data = pivot_stats['compiled_holiday'] if yr_range == 'max_yr' else pivot_stats[f'compiled_holiday_{yr_range}']
-    boo_holiday = pivot_data['holiday_category'] == holiday_key
+    pivot_data = get_pivot_data(pivot_stats, 'compiled_holiday', yr_range)
+    pivot_data_holiday = select_group(pivot_data, 'holiday_category', holiday_key)
 
     # Visualise the price change.
-    errorbar = pivot_data.loc[boo_holiday, :].hvplot.errorbars(y='avg_diff', yerr1='std_diff') 
-    bar_avg_diff = pivot_data.loc[boo_holiday, :].hvplot(kind='bar', y='avg_diff', width=HV_PN_WIDTH, tools=HV_TOOLS_FOR_TICKER)
+    errorbar = pivot_data_holiday.hvplot.errorbars(y='avg_diff', yerr1='std_diff') 
+    bar_avg_diff = pivot_data_holiday.hvplot(kind='bar', y='avg_diff', width=HV_PN_WIDTH, tools=HV_TOOLS_FOR_TICKER)
     logger.debug('----- Plotted (bar_avg_diff).')
 
     # Visualise the probability and horizontal lines for probability. 
     upper_prob_hline = hv.HLine(0.7).opts(line_width=1, color='black')
     lower_prob_hline = hv.HLine(0.3).opts(line_width=1, color='black')
-    bar_up_prob = pivot_data.loc[boo_holiday, :].hvplot(kind='bar', y='up_prob', width=HV_PN_WIDTH, ylim=(0,1), tools=HV_TOOLS_FOR_TICKER)
+    bar_up_prob = pivot_data_holiday.hvplot(kind='bar', y='up_prob', width=HV_PN_WIDTH, ylim=(0,1), tools=HV_TOOLS_FOR_TICKER)
     logger.debug('----- Plotted (bar_up_prob).')
 
     # Visualise up and down counts. 
-    bar_counts = pivot_data.loc[boo_holiday, :].hvplot(
+    bar_counts = pivot_data_holiday.hvplot(
         kind='bar', y=['up_counts', 'down_counts'], 
         width=HV_PN_WIDTH, stacked=True, legend='top', tools=HV_TOOLS_FOR_TICKER
     )
@@ -497,8 +653,9 @@ def plot_price_diff_holiday_period(
 # Plot Price Change For TWW.
 # --------------------------------------------------------------
 
+@uses_holoviews
 def plot_price_diff_tww_period(
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         tww_key:Text, 
         yr_range:Text, 
         show_weekly:Optional[bool]=None, 
@@ -521,10 +678,8 @@ def plot_price_diff_tww_period(
 
     # Look for the dataframe within the dictionary. 
     pivot_data = pivot_stats['compiled_tww'] if yr_range == 'max_yr' else pivot_stats[f'compiled_tww_{yr_range}']
-    boo_tww = pivot_data['tww_period'] == tww_key
-    boo_tww_week_aft = pivot_data['tww_period'] == f'{tww_key}_week_aft'
-    pivot_data_tww = pivot_data.loc[boo_tww, :]
-    pivot_data_tww_week_aft = pivot_data.loc[boo_tww_week_aft, :]
+    pivot_data_tww = select_group(pivot_data, 'tww_period', tww_key)
+    pivot_data_tww_week_aft = select_group(pivot_data, 'tww_period', f'{tww_key}_week_aft')
 
     upper_prob_hline = hv.HLine(0.7).opts(line_width=1, color='black')
     lower_prob_hline = hv.HLine(0.3).opts(line_width=1, color='black')
@@ -568,8 +723,9 @@ def plot_price_diff_tww_period(
 # Plot Price Change For Special Period.
 # --------------------------------------------------------------
 
+@uses_holoviews
 def plot_price_diff_special_period(        
-        pivot_stats:Dict[Text, pd.DataFrame], 
+        pivot_stats:Mapping[Text, pd.DataFrame], 
         special_period_key:Text, 
         yr_range:Text, 
         period_spec:int, 
@@ -598,9 +754,9 @@ def plot_price_diff_special_period(
     lower_prob_hline = hv.HLine(0.3).opts(line_width=1, color='black')
 
     if special_period_key == 'first_trdr_dom_by_month' or special_period_key == 'super_day_by_month': 
-        # Filter the data to that specific period. 
+        # Filter the data to that specific period (a view from the group index of the table). 
         period = 'month' if special_period_key == 'first_trdr_dom_by_month' else 'super_day_spec_month' 
-        pivot_data = pivot_data.loc[pivot_data[period] == period_spec,:].copy()
+        pivot_data = select_group(pivot_data, period, period_spec)
 
         # Visualise the price change by month or week. 
         errorbar = pivot_data.hvplot.errorbars(y='avg_diff', yerr1='std_diff') 
@@ -0,0 +1,266 @@
+
+
+# %%
+import logging
+import streamlit as st
+
+from datetime import date
+from typing import Dict, Optional, Sequence, Text, Tuple
+
+# Personal modules.
+from config.config import LOG_PROCESSING_FILEPATH, YEAR_RANGE_INDEX_SOURCES
+from config.config_logger import setup_logger
+from autovisualise_data import ticker_plot, chart_cache, tracing
+from config.config_dashboard import ST_TABS, ST_TABLE_AS_HTML
+from autovisualise_data.pivot_store import get_source_mtime
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# View State.
+# --------------------------------------------------------------
+
+# Widget values used by each ticker tab (on top of the ETF directory and ticker).
+VIEW_WIDGETS = {
+    ST_TABS[0]: ['interval', 'yr_range', 'period'],
+    ST_TABS[1]: ['interval', 'period', 'overall_vol'],
+    ST_TABS[2]: ['yr_range', 'unique_period'],
+    ST_TABS[3]: ['yr_range', 'unique_period', 'show_weekly'],
+    ST_TABS[4]: ['yr_range', 'unique_period', 'period'],
+}
+
+
+def get_view_source(view:Dict) -> Tuple[Text, Optional[int]]:
+    '''
+    Purpose :
+        Output the pickle file (and the index of the inner tuple obj) read by a view.
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        Tuple obj containing the filename and the index (or None).
+    '''
+
+    if view['tab'] == ST_TABS[0]:
+        return 'pivot_stats.pickle', None
+    if view['tab'] == ST_TABS[1]:
+        return 'pivot_vol_stats.pickle', None
+    if view['tab'] == ST_TABS[2]:
+        return 'pivot_unique_days.pickle', 0
+    if view['tab'] == ST_TABS[3]:
+        return 'pivot_unique_days.pickle', 2 if view['show_weekly'] else 1
+    return 'pivot_unique_days.pickle', 1
+
+
+def make_view(tab:Text, etf_dir:Text, ticker:Text, **widget_values) -> Dict:
+    '''
+    Purpose :
+        Output the view state of a ticker tab: the widget values it depends on plus
+        the modified time of its pickle file, so a data update invalidates the view.
+        A start / end year range also adds the modified times of the files the year
+        range index is built from (such as df_ticker.pickle).
+
+    Input   :
+        tab           : Str. Name of the tab (one of ST_TABS[:5]).
+        etf_dir       : Str. ETF directory such as ETF_sector or ETF_equity/PPA.
+        ticker        : Str. Ticker symbol.
+        widget_values : Widget values (extra ones not used by the tab are ignored).
+
+    Output  :
+        Dict obj containing the view state.
+    '''
+
+    view = {'tab': tab, 'etf_dir': etf_dir, 'ticker': ticker}
+    view.update({widget: widget_values.get(widget) for widget in VIEW_WIDGETS[tab]})
+
+    filename, _ = get_view_source(view)
+    view['mtime'] = get_source_mtime(etf_dir, ticker, filename)
+    if isinstance(view.get('yr_range'), tuple):
+        view['index_mtimes'] = tuple(get_source_mtime(etf_dir, ticker, filename) for filename in YEAR_RANGE_INDEX_SOURCES)
+    return view
+
+
+# %%
+# --------------------------------------------------------------
+# Build View.
+# --------------------------------------------------------------
+
+def read_view_data(view:Dict):
+    '''
+    Purpose :
+        Output the lazy mapping of pivot tables read by a view.
+    '''
+
+    filename, get_idx = get_view_source(view)
+    return ticker_plot.read_pivot_stats(view['etf_dir'], view['ticker'], filename, get_idx)
+
+
+@tracing.traced()
+def build_view_plots(view:Dict) -> Sequence:
+    '''
+    Purpose :
+        Build the holoview plots of a view with the (ticker_plot) functions.
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        Tuple obj containing the holoview plots.
+    '''
+
+    pivot_stats = read_view_data(view)
+
+    if view['tab'] == ST_TABS[0]:
+        return ticker_plot.plot_price_diff(pivot_stats, view['interval'], view['yr_range'], view['period'])[1]
+    if view['tab'] == ST_TABS[1]:
+        return ticker_plot.plot_vol_avg(pivot_stats, view['interval'], view['period'], view['overall_vol'])[1]
+    if view['tab'] == ST_TABS[2]:
+        return ticker_plot.plot_price_diff_holiday_period(pivot_stats, view['unique_period'], view['yr_range'])[1]
+    if view['tab'] == ST_TABS[3]:
+        return ticker_plot.plot_price_diff_tww_period(pivot_stats, view['unique_period'], view['yr_range'])[1]
+    return ticker_plot.plot_price_diff_special_period(
+        pivot_stats, view['unique_period'], view['yr_range'], view['period']
+    )[1]
+
+
+def get_view_table_args(view:Dict) -> Optional[Tuple]:
+    '''
+    Purpose :
+        Output the arguments of (display_styled_table) for a view, after the pivot
+        tables: key, year range, column to filter by and values to filter to.
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        Tuple obj (or None for the tab without a table).
+    '''
+
+    if view['tab'] == ST_TABS[0]:
+        return view['interval'], view['yr_range'], None, None
+    if view['tab'] == ST_TABS[2]:
+        return 'compiled_holiday', view['yr_range'], 'holiday_category', [view['unique_period']]
+    if view['tab'] == ST_TABS[3]:
+        return (
+            'compiled_tww', view['yr_range'], 'tww_period',
+            [view['unique_period'], f'{view["unique_period"]}_week_aft']
+        )
+    if view['tab'] == ST_TABS[4]:
+        period_col = None
+        if view['unique_period'] == 'first_trdr_dom_by_month' or view['unique_period'] == 'super_day_by_month':
+            period_col = 'month' if view['unique_period'] == 'first_trdr_dom_by_month' else 'super_day_spec_month'
+        return view['unique_period'], view['yr_range'], period_col, [view['period']]
+    return None
+
+
+def build_view_table(view:Dict):
+    '''
+    Purpose :
+        Build the styled pivot table of a view (or None for the tab without a table).
+    '''
+
+    table_args = get_view_table_args(view)
+    if table_args is None:
+        return None
+    return ticker_plot.display_styled_table(read_view_data(view), *table_args)
+
+
+@tracing.traced()
+def build_view_table_html(view:Dict) -> Optional[Text]:
+    '''
+    Purpose :
+        Render the styled pivot table of a view into HTML (or None for the tab
+        without a table).
+    '''
+
+    table = build_view_table(view)
+    return table.render() if table is not None else None
+
+
+# %%
+# --------------------------------------------------------------
+# Styled Table HTML.
+# --------------------------------------------------------------
+
+def get_view_table_key(view:Dict) -> Optional[Tuple]:
+    '''
+    Purpose :
+        Output the cache key of the styled table of a view: ticker, pivot table key,
+        year range and filter, plus the source mtimes and today's date (the table
+        highlights today's month / week).
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        Tuple obj (or None for the tab without a table).
+    '''
+
+    table_args = get_view_table_args(view)
+    if table_args is None:
+        return None
+
+    pivot_stats_key, yr_range, col_filter_by, val_filter_to = table_args
+    return (
+        'table_html', view['etf_dir'], view['ticker'], get_view_source(view), pivot_stats_key, yr_range,
+        col_filter_by, tuple(val_filter_to or ()), view['mtime'], view.get('index_mtimes'), date.today().isoformat(),
+    )
+
+
+def get_view_table_html(view:Dict) -> Optional[Text]:
+    '''
+    Purpose :
+        Output the styled table HTML of a view. The HTML is read from the
+        pre-rendered artefact if it was styled today, and the table is only
+        formatted when it's neither cached nor pre-rendered.
+
+    Input   :
+        view : Dict. View state from (make_view).
+
+    Output  :
+        Str. Styled table HTML (or None for the tab without a table).
+    '''
+
+    table_key = get_view_table_key(view)
+    if table_key is None:
+        return None
+
+    def render_table_html() -> Text:
+        artefact = chart_cache.read_artefact(chart_cache.view_key(**view))
+        if artefact is not None and artefact['table_html'] and artefact['styled_on'] == table_key[-1]:
+            logger.debug(f'----- Read pre-rendered table for ({table_key}).')
+            return artefact['table_html']
+
+        logger.debug(f'----- Rendering table for ({table_key}).')
+        return build_view_table_html(view)
+
+    return chart_cache.CHART_CACHE.get_or_load(table_key, render_table_html)
+
+
+def display_view_table(view:Dict):
+    '''
+    Purpose :
+        Display the styled table of a view, either as the cached HTML or (if
+        ST_TABLE_AS_HTML is off) as a styler formatted on every rerun.
+
+    Input   :
+        view : Dict. View state from (make_view).
+    '''
+
+    if not ST_TABLE_AS_HTML:
+        with tracing.trace('build_view_table'):
+            st.table(build_view_table(view))
+        return
+
+    table_html = get_view_table_html(view)
+    if table_html is not None:
+        st.markdown(f'<div style="overflow-x: auto;">{table_html}</div>', unsafe_allow_html=True)
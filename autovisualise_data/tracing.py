@@ -0,0 +1,372 @@
+
+
+# %%
+import os, time, logging, threading, resource, functools
+import numpy as np
+
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Mapping, Optional, Text, Tuple
+
+# Personal modules.
+from config.config import (
+    LOG_PROCESSING_FILEPATH,
+    TRACING_ENABLED,
+    TRACING_METRICS_PORT,
+    TRACING_MAX_SAMPLES,
+    TRACING_LABELS,
+    TRACING_BUCKETS,
+)
+from config.config_logger import setup_logger
+
+
+# --------------------------------------------------------------
+# Logger setup.
+# --------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+logger, file_handler, stream_handler = setup_logger(logger, LOG_PROCESSING_FILEPATH)
+
+
+# %%
+# --------------------------------------------------------------
+# Memory.
+# --------------------------------------------------------------
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# File descriptor of /proc/self/statm kept open (reading it is ~20x faster than opening it per span),
+# with the pid it belongs to since a forked process has to open its own.
+_STATM = {'pid': None, 'fd': None}
+
+
+def get_rss_bytes() -> int:
+    '''
+    Purpose :
+        Output the resident memory of the process (the peak resident memory where
+        /proc isn't available, e.g. on Mac).
+    '''
+
+    try:
+        if _STATM['pid'] != os.getpid():
+            _STATM.update(pid=os.getpid(), fd=os.open('/proc/self/statm', os.O_RDONLY))
+        return int(os.pread(_STATM['fd'], 128, 0).split()[1]) * PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# %%
+# --------------------------------------------------------------
+# Stage Statistics.
+# --------------------------------------------------------------
+
+class StageStats:
+    '''
+    Purpose :
+        Aggregate the samples of a stage: counts & sums, the wall time histogram
+        and the latest (TRACING_MAX_SAMPLES) samples for the percentiles.
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.sums = [0.0, 0.0, 0.0]
+        self.bucket_counts = [0] * len(TRACING_BUCKETS)
+        self.samples = deque(maxlen=TRACING_MAX_SAMPLES)
+
+    def add(self, wall:float, cpu:float, rss_delta:int):
+        self.count += 1
+        self.sums[0] += wall
+        self.sums[1] += cpu
+        self.sums[2] += rss_delta
+        self.samples.append((wall, cpu, rss_delta))
+        for idx, bound in enumerate(TRACING_BUCKETS):
+            if wall <= bound:
+                self.bucket_counts[idx] += 1
+
+    def quantiles(self, quantiles:Tuple[float, ...]=(0.5, 0.95)) -> np.ndarray:
+        '''
+        Purpose :
+            Output the quantiles of the wall time, CPU time & memory delta (one row
+            per quantile).
+        '''
+
+        return np.quantile(np.array(self.samples), quantiles, axis=0)
+
+
+class StageTracer:
+    '''
+    Purpose :
+        Keep the statistics of every (stage, label) pair traced by the process.
+
+    Input   :
+        enabled : Boo. To record the spans (a disabled tracer records nothing).
+        labels  : List obj containing the tag names exported as metric labels.
+    '''
+
+    def __init__(self, enabled:bool=TRACING_ENABLED, labels:List[Text]=TRACING_LABELS):
+        self.enabled = enabled
+        self.labels = list(labels)
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple, StageStats] = {}
+
+    def record(self, stage:Text, tags:Mapping, wall:float, cpu:float, rss_delta:int):
+        label_values = tuple(str(tags.get(label, '')) for label in self.labels)
+        with self._lock:
+            stats = self._stats.get((stage, label_values))
+            if stats is None:
+                stats = self._stats[(stage, label_values)] = StageStats()
+            stats.add(wall, cpu, rss_delta)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f'----- ({stage}) {wall * 1000:.1f} ms wall, {cpu * 1000:.1f} ms cpu, '
+                f'{rss_delta / 1024:+.0f} KB rss, tags {dict(tags)}.'
+            )
+
+    def get_stats(self) -> List[Dict]:
+        '''
+        Purpose :
+            Output a summary per (stage, label): count, mean & p50 / p95 of the wall
+            time (ms), CPU time (ms) and memory delta (KB).
+        '''
+
+        with self._lock:
+            items = [(key, stats.count, list(stats.sums), stats.quantiles()) for key, stats in self._stats.items()]
+
+        summary = []
+        for (stage, label_values), count, sums, (p50, p95) in sorted(items, key=lambda item: item[0]):
+            summary.append({
+                'stage': stage, **dict(zip(self.labels, label_values)), 'count': count,
+                'wall_ms_mean': sums[0] / count * 1000, 'wall_ms_p50': p50[0] * 1000, 'wall_ms_p95': p95[0] * 1000,
+                'cpu_ms_p50': p50[1] * 1000, 'cpu_ms_p95': p95[1] * 1000,
+                'rss_kb_p50': p50[2] / 1024, 'rss_kb_p95': p95[2] / 1024,
+            })
+        return summary
+
+    def snapshot(self) -> List[Tuple]:
+        with self._lock:
+            return [
+                (stage, label_values, stats.count, list(stats.sums), list(stats.bucket_counts), stats.quantiles())
+                for (stage, label_values), stats in self._stats.items()
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+TRACER = StageTracer()
+
+
+def enable_tracing(enabled:bool=True):
+    TRACER.enabled = enabled
+
+
+# %%
+# --------------------------------------------------------------
+# Spans.
+# --------------------------------------------------------------
+
+# Tags of the current session / thread (e.g. the widget state), inherited by the nested spans.
+TRACE_TAGS: ContextVar[Mapping] = ContextVar('trace_tags', default={})
+
+
+def set_tags(**tags):
+    '''
+    Purpose :
+        Add tags (e.g. the widget state of a view) to the spans of the current
+        session / thread, including the open ones.
+    '''
+
+    if TRACER.enabled:
+        TRACE_TAGS.set({**TRACE_TAGS.get(), **tags})
+
+
+class Span:
+    '''
+    Purpose :
+        Measure a stage between (start) and (stop), or as a context manager: wall
+        time, CPU time of the thread and the change of resident memory. The span
+        is recorded with the tags of the session / thread when it stops.
+
+    Input   :
+        stage : Str. Name of the stage such as read_pickle or render_charts.
+        tags  : Tags added to the span and the spans nested within it.
+    '''
+
+    __slots__ = ('stage', 'tags', '_token', '_wall', '_cpu', '_rss')
+
+    def __init__(self, stage:Text, tags:Mapping):
+        self.stage, self.tags = stage, tags
+
+    def start(self) -> 'Span':
+        self._token = TRACE_TAGS.set({**TRACE_TAGS.get(), **self.tags})
+        self._rss = get_rss_bytes()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def stop(self):
+        wall, cpu = time.perf_counter() - self._wall, time.thread_time() - self._cpu
+        tags = TRACE_TAGS.get()
+        try:
+            TRACE_TAGS.reset(self._token)
+        except ValueError:
+            # Stopped from another context (e.g. a span kept across threads).
+            pass
+        TRACER.record(self.stage, tags, wall, cpu, get_rss_bytes() - self._rss)
+
+    def __enter__(self) -> 'Span':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class NullSpan:
+    '''
+    Purpose :
+        Span returned while the tracing is disabled (records nothing).
+    '''
+
+    __slots__ = ()
+
+    def start(self) -> 'NullSpan':
+        return self
+
+    def stop(self):
+        pass
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+def trace(stage:Text, **tags):
+    '''
+    Purpose :
+        Context manager measuring a stage (a shared no-op span if tracing is disabled).
+
+    Input   :
+        stage : Str. Name of the stage.
+        tags  : Tags of the span such as the widget state.
+    '''
+
+    return Span(stage, tags) if TRACER.enabled else NULL_SPAN
+
+
+def start_span(stage:Text, **tags):
+    '''
+    Purpose :
+        Same as (trace) but started right away, to measure a stage that doesn't fit
+        in a block (call stop on the output).
+    '''
+
+    return trace(stage, **tags).start()
+
+
+# %%
+# --------------------------------------------------------------
+# Decorator
+# --------------------------------------------------------------
+
+# To measure each call of a function as a stage (named after the function by default).
+def traced(stage:Optional[Text]=None):
+
+    def decorator(func):
+        stage_name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with Span(stage_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# %%
+# --------------------------------------------------------------
+# Metrics Endpoint.
+# --------------------------------------------------------------
+
+class StageCollector:
+    '''
+    Purpose :
+        Prometheus collector exporting the statistics of the tracer when scraped:
+        wall time histogram, CPU time & memory delta sums and the p50 / p95 of each.
+    '''
+
+    def __init__(self, tracer:StageTracer):
+        self.tracer = tracer
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+        label_names = ['stage'] + self.tracer.labels
+        wall = HistogramMetricFamily('dashboard_stage_wall_seconds', 'Wall time per stage.', labels=label_names)
+        cpu = CounterMetricFamily('dashboard_stage_cpu_seconds', 'CPU time (thread) per stage.', labels=label_names)
+        rss = GaugeMetricFamily('dashboard_stage_rss_delta_bytes_sum', 'Resident memory change per stage.', labels=label_names)
+        quantiles = {
+            measure: GaugeMetricFamily(
+                f'dashboard_stage_{measure}_quantile', f'Quantiles of the {measure} of the latest spans per stage.',
+                labels=label_names + ['quantile'],
+            )
+            for measure in ['wall_seconds', 'cpu_seconds', 'rss_delta_bytes']
+        }
+
+        for stage, label_values, count, sums, bucket_counts, stage_quantiles in self.tracer.snapshot():
+            labels = [stage, *label_values]
+            buckets = [(str(bound), bucket_count) for bound, bucket_count in zip(TRACING_BUCKETS, bucket_counts)]
+            wall.add_metric(labels, buckets + [('+Inf', count)], sums[0])
+            cpu.add_metric(labels, sums[1])
+            rss.add_metric(labels, sums[2])
+            for quantile, values in zip(['0.5', '0.95'], stage_quantiles):
+                for metric, value in zip(quantiles.values(), values):
+                    metric.add_metric(labels + [quantile], value)
+
+        yield from [wall, cpu, rss, *quantiles.values()]
+
+
+_SERVER_LOCK = threading.Lock()
+# Port of the metrics endpoint: None until it's served, 0 if the port couldn't be bound.
+_SERVER_PORT = None
+
+
+def serve_metrics(port:int=TRACING_METRICS_PORT) -> Optional[int]:
+    '''
+    Purpose :
+        Serve the stage metrics for prometheus on a port (once per process, and
+        only if tracing is enabled). The port is only tried once, so the reruns
+        don't retry it if it's taken.
+
+    Output  :
+        Int. Port of the metrics endpoint (or None if it isn't served).
+    '''
+
+    global _SERVER_PORT
+    if not TRACER.enabled or not port:
+        return None
+
+    with _SERVER_LOCK:
+        if _SERVER_PORT is None:
+            from prometheus_client import CollectorRegistry, start_http_server
+
+            registry = CollectorRegistry()
+            registry.register(StageCollector(TRACER))
+            try:
+                start_http_server(port, registry=registry)
+                _SERVER_PORT = port
+                logger.info(f'----- Serving the stage metrics on port ({port}).')
+            except OSError as error:
+                _SERVER_PORT = 0
+                logger.warning(f'----- Not serving the stage metrics, port ({port}) is unavailable ({error}).')
+    return _SERVER_PORT or None
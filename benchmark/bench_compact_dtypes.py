@@ -0,0 +1,96 @@
+# %%
+import os, sys, json, time, argparse, warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from config.config import ETF_DIRS, PIVOT_PICKLE_FILENAMES
+from autovisualise_data.pivot_store import get_storage_dir, list_tickers, normalise_frames
+
+
+# %%
+# --------------------------------------------------------------
+# Memory Saved.
+# --------------------------------------------------------------
+
+def frames_bytes(frames) -> int:
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames.values() if isinstance(df, pd.DataFrame)))
+
+
+def iter_ticker_frames(etf_dir:str, ticker:str):
+    '''
+    Purpose :
+        Output the dict obj of dataframes of each pickle file of a ticker: the pivot
+        tables (one per inner tuple obj) and the raw ticker frames (df_ticker.pickle).
+    '''
+
+    storage_dir = get_storage_dir(etf_dir, ticker)
+    for filename in PIVOT_PICKLE_FILENAMES + ['df_ticker.pickle']:
+        path = os.path.join(storage_dir, filename)
+        if not os.path.exists(path):
+            continue
+        pickle_obj = pd.read_pickle(path)
+        if filename == 'df_ticker.pickle':
+            yield 'df_ticker', pickle_obj
+        elif isinstance(pickle_obj[0], tuple):
+            for inner_obj in pickle_obj:
+                yield 'pivot', inner_obj[1]
+        else:
+            yield 'pivot', pickle_obj[1]
+
+
+def measure_ticker(etf_dir:str, ticker:str) -> dict:
+    '''
+    Purpose :
+        Measure the memory of the pivot tables & raw ticker frames of a ticker as
+        stored and after the dtype normalisation, and the time to normalise them.
+    '''
+
+    report = {'pivot_bytes': 0, 'pivot_compact_bytes': 0, 'df_ticker_bytes': 0, 'df_ticker_compact_bytes': 0, 'normalise_ms': 0.0}
+    for kind, frames in iter_ticker_frames(etf_dir, ticker):
+        start = time.perf_counter()
+        compact_frames = normalise_frames(frames)
+        report['normalise_ms'] += (time.perf_counter() - start) * 1000
+        report[f'{kind}_bytes'] += frames_bytes(frames)
+        report[f'{kind}_compact_bytes'] += frames_bytes(compact_frames)
+    return report
+
+
+def run_benchmark(etf_dirs, output:str=None):
+    print(f'{"ticker":<24}{"pivot KB":>10}{"compact":>10}{"saved":>8}{"raw KB":>10}{"compact":>10}{"saved":>8}{"ms":>8}')
+
+    reports, totals = {}, {}
+    for etf_dir in etf_dirs:
+        for ticker in list_tickers(etf_dir):
+            report = reports[f'{etf_dir}/{ticker}'] = measure_ticker(etf_dir, ticker)
+            for metric, value in report.items():
+                totals[metric] = totals.get(metric, 0) + value
+            print_row(ticker, report)
+
+    print_row('total', totals)
+    if output:
+        with open(output, 'w') as out_file:
+            json.dump({'tickers': reports, 'total': totals}, out_file, indent=2, sort_keys=True)
+        print(f'Written to ({output}).')
+
+
+def print_row(name:str, report:dict):
+    def saved(kind):
+        return 1 - report[f'{kind}_compact_bytes'] / report[f'{kind}_bytes'] if report[f'{kind}_bytes'] else 0.
+
+    print(
+        f'{name:<24}{report["pivot_bytes"] / 1024:>10.0f}{report["pivot_compact_bytes"] / 1024:>10.0f}{saved("pivot"):>8.0%}'
+        f'{report["df_ticker_bytes"] / 1024:>10.0f}{report["df_ticker_compact_bytes"] / 1024:>10.0f}{saved("df_ticker"):>8.0%}'
+        f'{report["normalise_ms"]:>8.1f}'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory saved per ticker by the compact dtypes.')
+    parser.add_argument('--etf-dir', action='append', dest='etf_dirs', help='ETF directory (repeatable). Defaults to every ETF directory.')
+    parser.add_argument('--output', help='JSON file to write the report to.')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    run_benchmark(args.etf_dirs or ETF_DIRS, args.output)
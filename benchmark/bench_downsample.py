@@ -0,0 +1,75 @@
+# %%
+import os, sys, time, argparse, warnings
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from autovisualise_data import fred_plot, fred_store, chart_cache
+from config.config_dashboard import XLIM
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def make_daily_series(years:int, seed:int=0) -> pd.DataFrame:
+    '''
+    Purpose :
+        Output a random walk with one value per day (e.g. a daily price series).
+    '''
+
+    dates = pd.date_range(end=XLIM[1], periods=years * 365, freq='D', name='date')
+    values = np.random.default_rng(seed).standard_normal(len(dates)).cumsum()
+    return pd.DataFrame({'value': values}, index=dates)
+
+
+def time_render(eco_data, eco_cat, method, repeat:int):
+    '''
+    Purpose :
+        Build & render a FRED chart into bokeh JSON, output the best time (ms) and the payload (bytes).
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chart_json = chart_cache.render_json(fred_plot.plot_eco_trend(eco_data, eco_cat, XLIM, True, method))
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, len(chart_json)
+
+
+def run_benchmark(series_list, years:int, repeat:int):
+    '''
+    Purpose :
+        Compare the payload & render time of the FRED charts without decimation and
+        with the LTTB / min-max decimation, on FRED series and a daily series.
+    '''
+
+    datasets = {
+        ' + '.join(series_list): (fred_store.read_fred_series(series_list, XLIM), series_list),
+        f'daily x {years} yr (x2)': (
+            {'daily_1': make_daily_series(years, 0), 'daily_2': make_daily_series(years, 1)}, ['daily_1', 'daily_2']
+        ),
+    }
+
+    for name, (eco_data, eco_cat) in datasets.items():
+        print(f'{name}: {sum(len(eco_data[series]) for series in eco_cat)} points (best of {repeat}).')
+        baseline = None
+        for method in [None, 'lttb', 'minmax']:
+            timing, payload = time_render(eco_data, eco_cat, method, repeat)
+            baseline = baseline or (timing, payload)
+            print(f'    {str(method):<10}{payload / 1024:>10.1f} KB{baseline[1] / payload:>7.1f}x'
+                  f'{timing:>10.1f} ms{baseline[0] / timing:>7.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the FRED line decimation.')
+    parser.add_argument('--series', action='append', help='FRED series to plot (repeatable, max 2).')
+    parser.add_argument('--years', type=int, default=60, help='Years of the synthetic daily series.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    run_benchmark(args.series or ['unemployment', 'participation_rate'], args.years, args.repeat)
@@ -0,0 +1,61 @@
+# %%
+import os, sys, time, argparse, warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from autovisualise_data import fred_plot, fred_template, chart_cache
+from config.config_dashboard import XLIM
+from bench_downsample import make_daily_series
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def time_best(render, repeat:int) -> float:
+    '''
+    Purpose :
+        Output the best time (ms) of a render function.
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run_benchmark(years_list, repeat:int):
+    '''
+    Purpose :
+        Compare the rerun cost of the FRED charts built & rendered with holoviews
+        and filled from the prebuilt template, with / without the recession spans
+        and for a growing number of points (every point is sent, no decimation).
+    '''
+
+    print(f'{"points":>10}{"recession":>11}{"holoviews":>13}{"template":>12}{"speedup":>9} (best of {repeat})')
+    for years in years_list:
+        eco_data = {'daily_1': make_daily_series(years, 0), 'daily_2': make_daily_series(years, 1)}
+        eco_cat = list(eco_data)
+        for show_recession in [False, True]:
+            timing_hv = time_best(
+                lambda: chart_cache.render_json(fred_plot.plot_eco_trend(eco_data, eco_cat, XLIM, show_recession)), repeat
+            )
+            timing_template = time_best(
+                lambda: fred_template.render_eco_trend(eco_data, eco_cat, XLIM, show_recession), repeat
+            )
+            print(f'{sum(len(data) for data in eco_data.values()):>10}{str(show_recession):>11}'
+                  f'{timing_hv:>10.1f} ms{timing_template:>9.1f} ms{timing_hv / timing_template:>8.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the FRED chart template.')
+    parser.add_argument('--years', type=int, action='append', help='Years of the synthetic daily series (repeatable).')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    run_benchmark(args.years or [1, 10, 60], args.repeat)
@@ -0,0 +1,112 @@
+# %%
+import os, sys, gc, time, argparse, weakref, warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from config.config import ETF_DIRS
+from autovisualise_data.group_index import _GROUP_INDEXES, GroupIndex, select_group
+from autovisualise_data.pivot_store import LazyPivotStats, list_tickers
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+# Tables sliced by week (daily_by_weekday of the price & volume statistics, every year range).
+TABLE_SOURCES = [
+    ('pivot_stats.pickle', ['daily_by_weekday'] + [f'daily_by_weekday_range_{years}_yr' for years in [20, 15, 10, 5]]),
+    ('pivot_vol_stats.pickle', ['daily_by_weekday', 'daily_by_weekday_avg_vol_row']),
+]
+
+
+def list_tables(etf_dirs):
+    tables = []
+    for etf_dir in etf_dirs:
+        for ticker in list_tickers(etf_dir):
+            for filename, keys in TABLE_SOURCES:
+                pivot_stats = LazyPivotStats(etf_dir, ticker, filename)
+                tables += [pivot_stats[key] for key in keys if key in pivot_stats]
+    return tables
+
+
+def time_slices(tables, slice_func, repeat:int) -> float:
+    '''
+    Purpose :
+        Output the best time (µs) per slice of every week of every table.
+    '''
+
+    n_slices = sum(len(np.unique(table['week'])) for table in tables)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for table in tables:
+            for week in np.unique(table['week']).tolist():
+                slice_func(table, week)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / n_slices * 1e6
+
+
+def check_tables_released(table):
+    '''
+    Purpose :
+        Check that the group index doesn't keep a table alive: once the table is
+        dropped (e.g. evicted from the data cache), the table and its entry within
+        the group indexes must be gone.
+    '''
+
+    table = table.copy()
+    select_group(table, 'week', table['week'].iloc[0])
+    table_ref, table_id = weakref.ref(table), id(table)
+    assert table_id in _GROUP_INDEXES
+
+    del table
+    gc.collect()
+    assert table_ref() is None, 'The group index keeps the table alive.'
+    assert table_id not in _GROUP_INDEXES, 'The group index of a dropped table is kept.'
+
+
+def run_benchmark(etf_dirs, repeat:int):
+    '''
+    Purpose :
+        Compare the boolean mask & copy of a week (as the plot functions did) with
+        the slice from the group index, on the 53-week daily_by_weekday tables.
+    '''
+
+    tables = list_tables(etf_dirs)
+    weeks = [np.unique(table['week']).tolist() for table in tables]
+    print(f'{len(tables)} tables, {sum(map(len, weeks))} weeks (best of {repeat}).')
+
+    # Every slice must have the same rows, order & index labels as the mask.
+    for table, table_weeks in zip(tables, weeks):
+        for week in table_weeks:
+            assert select_group(table, 'week', week).equals(table.loc[table['week'] == week, :])
+    check_tables_released(tables[0])
+
+    start = time.perf_counter()
+    group_indexes = [GroupIndex(table, 'week') for table in tables]
+    build_us = (time.perf_counter() - start) / len(tables) * 1e6
+    n_taken = sum(not group_index.is_contiguous for group_index in group_indexes)
+
+    mask_us = time_slices(tables, lambda table, week: table.loc[table['week'] == week, :].copy(), repeat)
+    index_us = time_slices(tables, lambda table, week: select_group(table, 'week', week), repeat)
+    shares_memory = all(
+        np.shares_memory(select_group(table, 'week', table_weeks[0])['week'].to_numpy(), table['week'].to_numpy())
+        for table, table_weeks in zip(tables, weeks)
+    )
+
+    print(f'{"mask & copy":<24}{mask_us:>10.1f} µs per slice')
+    print(f'{"group index":<24}{index_us:>10.1f} µs per slice{mask_us / index_us:>8.1f}x')
+    print(f'{"build (once per table)":<24}{build_us:>10.1f} µs, {n_taken} tables taken by position, slices are views: {shares_memory}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the group index against boolean masks.')
+    parser.add_argument('--etf-dir', action='append', dest='etf_dirs', help='ETF directory (repeatable). Defaults to every ETF directory.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    run_benchmark(args.etf_dirs or ETF_DIRS, args.repeat)
@@ -0,0 +1,106 @@
+# %%
+import os, sys, ast, json, argparse, subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# %%
+# --------------------------------------------------------------
+# Import Time.
+# --------------------------------------------------------------
+
+def get_startup_imports(script:str='run_streamlit.py') -> str:
+    '''
+    Purpose :
+        Output the module level import statements of the dashboard script (the
+        imports run when the app starts, before any tab is rendered).
+    '''
+
+    with open(os.path.join(ROOT_DIR, script)) as in_file:
+        tree = ast.parse(in_file.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def run_python(code:str, importtime:bool=False) -> subprocess.CompletedProcess:
+    args = [sys.executable, '-W', 'ignore'] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    return subprocess.run(args, cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr:str):
+    '''
+    Purpose :
+        Parse the (-X importtime) report into the cumulative time (ms) of each top
+        level package, keeping the first (outermost) import of each.
+
+    Output  :
+        Dict obj of {package: cumulative ms} & the total ms.
+    '''
+
+    packages, total = {}, 0.0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            total += int(cumulative) / 1000
+        package = name.strip().split('.')[0]
+        packages[package] = max(packages.get(package, 0.0), int(cumulative) / 1000)
+    return packages, total
+
+
+def measure_first_plot(startup_imports:str) -> dict:
+    '''
+    Purpose :
+        Time the startup imports and the first use of holoviews (deferred to the
+        first plot a tab builds) in a fresh interpreter.
+    '''
+
+    code = (
+        'import time, sys\n'
+        'start = time.perf_counter()\n'
+        f'{startup_imports}\n'
+        'startup = time.perf_counter() - start\n'
+        'deferred = [name for name in ("holoviews", "hvplot") if name not in sys.modules]\n'
+        'from autovisualise_data.plot_backend import load_holoviews\n'
+        'start = time.perf_counter()\n'
+        'load_holoviews()\n'
+        'print(startup * 1000, (time.perf_counter() - start) * 1000, ",".join(deferred))\n'
+    )
+    startup, first_plot, deferred = (run_python(code).stdout.strip().split(' ') + [''])[:3]
+    return {'startup_ms': float(startup), 'first_plot_ms': float(first_plot), 'deferred': [name for name in deferred.split(',') if name]}
+
+
+def run_benchmark(top:int, repeat:int, output:str=None):
+    '''
+    Purpose :
+        Report the import time of the dashboard startup (best of repeat fresh
+        interpreters) and the slowest packages, and optionally write it as JSON.
+    '''
+
+    startup_imports = get_startup_imports()
+    reports = [parse_importtime(run_python(startup_imports, importtime=True).stderr) for _ in range(repeat)]
+    packages, total = min(reports, key=lambda report: report[1])
+    timings = min((measure_first_plot(startup_imports) for _ in range(repeat)), key=lambda timing: timing['startup_ms'])
+
+    print(f'Startup imports: {total:.0f} ms (-X importtime), {timings["startup_ms"]:.0f} ms wall (best of {repeat}).')
+    print(f'Deferred to the first plot: {", ".join(timings["deferred"]) or "none"} '
+          f'({timings["first_plot_ms"]:.0f} ms on first use).')
+    print(f'Slowest {top} packages (cumulative):')
+    for package, timing in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f'    {package:<24}{timing:>8.0f} ms')
+
+    if output:
+        with open(output, 'w') as out_file:
+            json.dump({'importtime_ms': total, **timings, 'packages_ms': packages}, out_file, indent=2, sort_keys=True)
+        print(f'Written to ({output}).')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import time profile of the dashboard startup.')
+    parser.add_argument('--top', type=int, default=15, help='Number of packages to list.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON file to write the report to.')
+    args = parser.parse_args()
+
+    run_benchmark(args.top, args.repeat, args.output)
@@ -0,0 +1,107 @@
+
+
+# %%
+import os, sys, time, argparse, warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from config.config import FREQ_KEYS, FREQ_GROUP_COLS
+from autovisualise_data import stats_engine
+from autovisualise_data.pivot_store import get_storage_dir
+
+
+# %%
+# --------------------------------------------------------------
+# Baseline.
+# --------------------------------------------------------------
+
+def compute_stats_per_window(df_ticker):
+    '''
+    Purpose :
+        Compute the statistics tables with one groupby per date interval and year
+        range (every year range scans the rows again).
+    '''
+
+    stats = {}
+    for freq, yr_range in stats_engine.iter_freq_yr_ranges():
+        df, group_cols = df_ticker[freq], FREQ_GROUP_COLS[freq]
+        window = stats_engine.get_yr_window(yr_range, df['year'].min(), df['year'].max())
+        if window is None:
+            continue
+
+        # Keep every group of the date interval, even without any value within the year range.
+        all_groups = df.loc[df['price_diff'].notna(), group_cols].drop_duplicates().sort_values(group_cols)
+        df_window = df.loc[(df['year'] > window[0]) & (df['year'] < window[1])]
+        grid = df_window.groupby(group_cols + ['year'])['price_diff'].mean().unstack('year')
+        grid = grid.reindex(pd.MultiIndex.from_frame(all_groups) if len(group_cols) > 1 else all_groups[group_cols[0]])
+
+        up_counts, down_counts = (grid > 0).sum(axis=1), (grid < 0).sum(axis=1)
+        table = pd.DataFrame({
+            'avg_diff': grid.mean(axis=1), 'med_diff': grid.median(axis=1), 'tot_diff': grid.sum(axis=1),
+            'max_diff': grid.max(axis=1), 'min_diff': grid.min(axis=1), 'std_diff': grid.std(axis=1),
+            'up_overall': (grid.mean(axis=1) > 0).astype(int), 'pos_avg_diff': grid.where(grid > 0).mean(axis=1),
+            'up_counts': up_counts, 'neg_avg_diff': grid.where(grid < 0).mean(axis=1), 'down_counts': down_counts,
+            'up_prob': (up_counts / (up_counts + down_counts)).round(4),
+        })
+        table['down_prob'] = 1 - table['up_prob']
+        stats[stats_engine.get_stats_key(freq, yr_range)] = table.reset_index(drop=True).join(
+            all_groups.reset_index(drop=True)
+        )
+    return stats
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def time_it(func, repeat:int):
+    '''
+    Purpose :
+        Output the best time (ms) of a function and its output.
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, output
+
+
+def run_benchmark(etf_dir:str, ticker:str, repeat:int):
+    '''
+    Purpose :
+        Compare the per-window groupbys, the running aggregates of the statistics
+        engine and the single-pass prefix sums on the rows of df_ticker.pickle.
+    '''
+
+    df_ticker = pd.read_pickle(os.path.join(get_storage_dir(etf_dir, ticker), 'df_ticker.pickle'))
+    print(f'{etf_dir}/{ticker}: {sum(len(df_ticker[freq]) for freq in FREQ_KEYS)} rows (best of {repeat}).')
+
+    methods = {
+        'groupby per window': lambda: compute_stats_per_window(df_ticker),
+        'running aggregates': lambda: stats_engine.compute_pivot_stats(stats_engine.build_engine(df_ticker))[1],
+        'single-pass prefix sums': lambda: stats_engine.compute_multi_window_stats(df_ticker),
+    }
+
+    baseline = None
+    for name, func in methods.items():
+        timing, stats = time_it(func, repeat)
+        baseline = baseline or timing
+        mismatches = stats_engine.compare_pivot_stats(({}, stats), ({}, methods['groupby per window']()))
+        print(f'{name:<28}{timing:>10.2f} ms{baseline / timing:>8.1f}x   {len(stats)} tables, '
+              f'{"match" if not mismatches else "mismatch " + ", ".join(mismatches)}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the multi-window statistics aggregation.')
+    parser.add_argument('--etf-dir', default='ETF_sector')
+    parser.add_argument('--ticker', default='SPY')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=RuntimeWarning)
+    run_benchmark(args.etf_dir, args.ticker, args.repeat)
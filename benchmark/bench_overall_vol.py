@@ -0,0 +1,98 @@
+# %%
+import os, sys, time, argparse, warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from config.config import ETF_DIRS, FREQ_GROUP_COLS, OVERALL_VOL_FREQS
+from autovisualise_data.group_index import select_group
+from autovisualise_data.pivot_store import VOL_COUNTS_COLS, LazyPivotStats, list_tickers
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def aggregate_by_level(pivot_stats, freq:str, period_spec:int):
+    '''
+    Purpose :
+        Output the overall volume, its average & the counts of a month / week by
+        averaging an index level on each rerun (as plot_vol_avg did).
+    '''
+
+    period, col = FREQ_GROUP_COLS[freq]
+    pivot_data_vol_row = pivot_stats[f'{freq}_avg_vol_row'].set_index([period, col]).copy()
+    overall_vol = pivot_data_vol_row.mean(level=1, axis=0)
+    avg_vol = overall_vol.mean(axis=0)[0]
+    pivot_data = pivot_stats[freq]
+    counts = pivot_data.loc[pivot_data[period] == period_spec, :].set_index([period, col]).mean(level=1, axis=0)
+    return overall_vol, avg_vol, counts
+
+
+def look_up_derived(pivot_stats, freq:str, period_spec:int):
+    '''
+    Purpose :
+        Output the same from the derived tables of the volume bundle.
+    '''
+
+    period, _ = FREQ_GROUP_COLS[freq]
+    overall_vol = pivot_stats[f'{freq}_overall_vol_row']
+    avg_vol = overall_vol['avg_vol_row'].mean()
+    counts = select_group(pivot_stats[f'{freq}_overall_vol_counts'], period, period_spec)
+    return overall_vol, avg_vol, counts
+
+
+def time_reruns(cases, func, repeat:int) -> float:
+    '''
+    Purpose :
+        Output the best time (µs) per rerun of every ticker, frequency & period.
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for pivot_stats, freq, period_spec in cases:
+            func(pivot_stats, freq, period_spec)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(cases) * 1e6
+
+
+def run_benchmark(etf_dirs, repeat:int):
+    '''
+    Purpose :
+        Compare the overall volume of plot_vol_avg averaged by index level on each
+        rerun with the lookup of the derived tables (read once per bundle).
+    '''
+
+    cases = []
+    for etf_dir in etf_dirs:
+        for ticker in list_tickers(etf_dir):
+            pivot_stats = LazyPivotStats(etf_dir, ticker, 'pivot_vol_stats.pickle')
+            for freq in OVERALL_VOL_FREQS:
+                period, _ = FREQ_GROUP_COLS[freq]
+                cases += [(pivot_stats, freq, period_spec) for period_spec in np.unique(pivot_stats[freq][period]).tolist()]
+    print(f'{len(cases)} reruns (best of {repeat}).')
+
+    # Both must give the same overall volume, average & counts.
+    for case in cases:
+        (old_vol, old_avg, old_counts), (new_vol, new_avg, new_counts) = aggregate_by_level(*case), look_up_derived(*case)
+        assert old_vol.index.equals(new_vol.index) and np.allclose(old_vol['avg_vol_row'], new_vol['avg_vol_row'])
+        assert np.isclose(old_avg, new_avg) and old_counts.index.equals(new_counts.index)
+        assert np.allclose(old_counts[VOL_COUNTS_COLS].to_numpy(float), new_counts[VOL_COUNTS_COLS].to_numpy(float), equal_nan=True)
+
+    level_us = time_reruns(cases, aggregate_by_level, repeat)
+    derived_us = time_reruns(cases, look_up_derived, repeat)
+    print(f'{"mean by level":<24}{level_us:>10.1f} µs per rerun')
+    print(f'{"derived tables":<24}{derived_us:>10.1f} µs per rerun{level_us / derived_us:>8.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the derived overall volume tables against averaging by index level.')
+    parser.add_argument('--etf-dir', action='append', dest='etf_dirs', help='ETF directory (repeatable). Defaults to every ETF directory.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    run_benchmark(args.etf_dirs or ETF_DIRS, args.repeat)
@@ -0,0 +1,358 @@
+# %%
+import os, sys, json, time, platform, resource, argparse, subprocess, warnings
+import statistics
+
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Default directory of the result files (one JSON file per run).
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmark', 'results')
+
+# Groups of cases, each run in a fresh interpreter (so the first load is cold and the peak memory is its own).
+GROUPS = ['startup', 'tab_0', 'tab_1', 'tab_2', 'tab_3', 'tab_4', 'fred', 'screener']
+
+# Prefix of the worker output line holding the results.
+RESULT_PREFIX = 'BENCH_RESULT '
+
+
+# %%
+# --------------------------------------------------------------
+# Measurements.
+# --------------------------------------------------------------
+
+def time_call(func, repeat:int, setup=None):
+    '''
+    Purpose :
+        Call a function (repeat) times, after (setup) each time, and output the
+        median time (ms) and the last output.
+    '''
+
+    timings, output = [], None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        output = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), output
+
+
+def get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 1024 ** 2 if sys.platform == 'darwin' else peak_rss / 1024
+
+
+def clear_caches():
+    from autovisualise_data.data_cache import DATA_CACHE
+    from autovisualise_data.chart_cache import CHART_CACHE
+
+    DATA_CACHE.clear()
+    CHART_CACHE.clear()
+
+
+def payload_bytes(charts) -> int:
+    return sum(len(chart) for chart in charts if chart is not None)
+
+
+# %%
+# --------------------------------------------------------------
+# Cases.
+# --------------------------------------------------------------
+
+def bench_startup(args) -> dict:
+    '''
+    Purpose :
+        Time the module level imports of the dashboard and the first use of holoviews.
+    '''
+
+    from bench_import_time import get_startup_imports
+
+    start = time.perf_counter()
+    exec(get_startup_imports(), {})
+    results = {'startup/imports_ms': (time.perf_counter() - start) * 1000}
+
+    from autovisualise_data.plot_backend import load_holoviews
+    start = time.perf_counter()
+    load_holoviews()
+    results['startup/load_holoviews_ms'] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def bench_ticker_tab(tab_idx:int, args) -> dict:
+    '''
+    Purpose :
+        For the default view of a ticker tab & each ticker: read the pickle file
+        (cold / warm), build the plots (cold / warm data), render them into bokeh
+        JSON, style the table into HTML and measure the payloads.
+    '''
+
+    from autovisualise_data import ticker_plot, ticker_views, chart_cache
+    from autovisualise_data.plot_backend import load_holoviews
+    from autovisualise_data.prerender import iter_views
+    from config.config_dashboard import ST_TABS
+
+    # Loaded up front so the first ticker doesn't carry it (see the startup group).
+    load_holoviews()
+
+    tab, results = ST_TABS[tab_idx], {}
+    for etf_dir, ticker in args.tickers:
+        view = next(iter_views(tab, etf_dir, ticker))
+        name = f'{tab}/{ticker}'
+        filename, get_idx = ticker_views.get_view_source(view)
+
+        results[f'{name}/read_pickle_cold_ms'], _ = time_call(
+            lambda: ticker_plot.read_pickle(etf_dir, ticker, filename, get_idx), args.repeat, clear_caches
+        )
+        results[f'{name}/read_pickle_warm_ms'], _ = time_call(
+            lambda: ticker_plot.read_pickle(etf_dir, ticker, filename, get_idx), args.repeat
+        )
+        results[f'{name}/build_cold_ms'], _ = time_call(lambda: ticker_views.build_view_plots(view), args.repeat, clear_caches)
+        results[f'{name}/build_warm_ms'], plots = time_call(lambda: ticker_views.build_view_plots(view), args.repeat)
+        results[f'{name}/render_ms'], charts = time_call(lambda: chart_cache.render_plots(plots), args.repeat)
+        results[f'{name}/payload_bytes'] = payload_bytes(charts)
+
+        if ticker_views.get_view_table_args(view) is not None:
+            results[f'{name}/table_ms'], table_html = time_call(lambda: ticker_views.build_view_table_html(view), args.repeat)
+            results[f'{name}/table_bytes'] = len(table_html)
+    return results
+
+
+def bench_fred(args) -> dict:
+    '''
+    Purpose :
+        For the default series of the FRED tab: read the series (cold / warm), build
+        & render the holoview chart and render the chart from the template.
+    '''
+
+    from autovisualise_data import fred_plot, fred_store, fred_template, chart_cache
+    from autovisualise_data.plot_backend import load_holoviews
+    from config.config import FRED_DATA_GROUPING
+    from config.config_dashboard import XLIM
+
+    load_holoviews()
+
+    results = {}
+    results['fred/read_pickle_cold_ms'], _ = time_call(lambda: fred_plot.read_pickle('fred_data.pickle'), args.repeat, clear_caches)
+    for series in list(FRED_DATA_GROUPING.values())[0][:3]:
+        name, eco_cat = f'fred/{series}', [series]
+        results[f'{name}/read_cold_ms'], _ = time_call(lambda: fred_store.read_fred_series(eco_cat, XLIM), args.repeat, clear_caches)
+        results[f'{name}/read_warm_ms'], eco_data = time_call(lambda: fred_store.read_fred_series(eco_cat, XLIM), args.repeat)
+        results[f'{name}/build_ms'], plot = time_call(lambda: fred_plot.plot_eco_trend(eco_data, eco_cat, XLIM, True), args.repeat)
+        results[f'{name}/render_ms'], chart = time_call(lambda: chart_cache.render_json(plot), args.repeat)
+        results[f'{name}/payload_bytes'] = payload_bytes([chart])
+        results[f'{name}/template_render_ms'], chart = time_call(
+            lambda: fred_template.render_eco_trend(eco_data, eco_cat, XLIM, True), args.repeat
+        )
+        results[f'{name}/template_payload_bytes'] = payload_bytes([chart])
+    return results
+
+
+def bench_screener(args) -> dict:
+    '''
+    Purpose :
+        For each ETF directory: stack the screener frame (cold / warm), rank the
+        tickers and build & render the plots.
+    '''
+
+    from autovisualise_data import screener, chart_cache
+    from autovisualise_data.plot_backend import load_holoviews
+
+    load_holoviews()
+
+    results = {}
+    for etf_dir in sorted({etf_dir for etf_dir, _ in args.tickers}):
+        name = f'screener/{etf_dir}'
+        read_frame = lambda: screener.read_screener_frame(etf_dir, 'monthly', 'max_yr')
+        results[f'{name}/frame_cold_ms'], _ = time_call(read_frame, args.repeat, clear_caches)
+        results[f'{name}/frame_warm_ms'], frame = time_call(read_frame, args.repeat)
+        results[f'{name}/screen_ms'], screened = time_call(lambda: screener.screen_tickers(frame, 'monthly', period=1), args.repeat)
+        results[f'{name}/build_ms'], plots = time_call(lambda: screener.plot_screener(screened, 'up_prob'), args.repeat)
+        results[f'{name}/render_ms'], charts = time_call(lambda: chart_cache.render_plots(plots), args.repeat)
+        results[f'{name}/payload_bytes'] = payload_bytes(charts)
+    return results
+
+
+def run_group(group:str, args) -> dict:
+    if group == 'startup':
+        results = bench_startup(args)
+    elif group.startswith('tab_'):
+        results = bench_ticker_tab(int(group[len('tab_'):]), args)
+    elif group == 'fred':
+        results = bench_fred(args)
+    else:
+        results = bench_screener(args)
+
+    results[f'{group}/peak_rss_mb'] = get_peak_rss_mb()
+    return results
+
+
+# %%
+# --------------------------------------------------------------
+# Run.
+# --------------------------------------------------------------
+
+def get_tickers(tickers):
+    '''
+    Purpose :
+        Output the (etf_dir, ticker) pairs to benchmark: the given tickers or every
+        ticker of the bundled dataset.
+    '''
+
+    from config.config import ETF_DIRS
+    from autovisualise_data.ticker_index import TickerIndex
+
+    ticker_index = TickerIndex(ETF_DIRS).build()
+    return [
+        (etf_dir, ticker) for etf_dir in ETF_DIRS for ticker in ticker_index.get_tickers(etf_dir)
+        if not tickers or ticker in tickers
+    ]
+
+
+def get_meta(args) -> dict:
+    import numpy, pandas, pyarrow, bokeh, holoviews, streamlit
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'versions': {module.__name__: module.__version__ for module in [numpy, pandas, pyarrow, bokeh, holoviews, streamlit]},
+        'repeat': args.repeat, 'tickers': [ticker for _, ticker in args.tickers],
+    }
+
+
+def run_suite(args) -> str:
+    '''
+    Purpose :
+        Run every group of cases in a fresh interpreter and write the results (and
+        the versions / commit they were measured with) into a JSON file.
+
+    Output  :
+        Str. Path of the result file.
+    '''
+
+    results = {}
+    for group in args.groups:
+        start = time.perf_counter()
+        worker = subprocess.run(
+            [sys.executable, '-W', 'ignore', os.path.abspath(__file__), 'worker', group, '--repeat', str(args.repeat)]
+            + [arg for ticker in (args.ticker or []) for arg in ['--ticker', ticker]],
+            cwd=ROOT_DIR, capture_output=True, text=True, env={**os.environ, 'TICKER_INDEX_WATCH': '0'},
+        )
+        lines = [line for line in worker.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if worker.returncode or not lines:
+            print(f'{group}: failed.\n{worker.stderr[-2000:]}')
+            continue
+        results.update(json.loads(lines[-1][len(RESULT_PREFIX):]))
+        print(f'{group}: done in {time.perf_counter() - start:.1f}s.')
+
+    meta = get_meta(args)
+    output = args.output or os.path.join(RESULTS_DIR, f'bench_{datetime.now():%Y%m%d_%H%M%S}_{meta["commit"] or "nocommit"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as out_file:
+        json.dump({'meta': meta, 'results': results}, out_file, indent=2, sort_keys=True)
+
+    print(f'{len(results)} results written to ({output}).')
+    return output
+
+
+# %%
+# --------------------------------------------------------------
+# Compare.
+# --------------------------------------------------------------
+
+def compare_results(baseline:dict, current:dict, threshold:float, min_ms:float):
+    '''
+    Purpose :
+        Compare two runs metric by metric. A time (_ms), payload (_bytes) or memory
+        (_mb) metric regresses when it grows by more than the threshold (and, for a
+        time, by more than min_ms so the noise of fast cases isn't flagged).
+
+    Output  :
+        List obj of (metric, baseline, current, ratio, status) & the number of regressions.
+    '''
+
+    rows, n_regressions = [], 0
+    for metric in sorted(set(baseline) | set(current)):
+        if metric not in baseline or metric not in current:
+            rows.append((metric, baseline.get(metric), current.get(metric), None, 'new' if metric in current else 'removed'))
+            continue
+
+        old, new = baseline[metric], current[metric]
+        ratio = new / old if old else float('inf') if new else 1.0
+        above_noise = not metric.endswith('_ms') or abs(new - old) >= min_ms
+        status = ''
+        if ratio > 1 + threshold and above_noise:
+            status, n_regressions = 'REGRESSION', n_regressions + 1
+        elif ratio < 1 / (1 + threshold) and above_noise:
+            status = 'improved'
+        rows.append((metric, old, new, ratio, status))
+    return rows, n_regressions
+
+
+def run_compare(args) -> int:
+    with open(args.baseline) as in_file:
+        baseline = json.load(in_file)
+    with open(args.current) as in_file:
+        current = json.load(in_file)
+
+    for label, run in [('baseline', baseline), ('current', current)]:
+        meta = run['meta']
+        print(f'{label:<9}: {meta["timestamp"]} commit {meta["commit"]} '
+              + ' '.join(f'{name} {version}' for name, version in sorted(meta['versions'].items())))
+
+    rows, n_regressions = compare_results(baseline['results'], current['results'], args.threshold, args.min_ms)
+    print(f'\n{"metric":<60}{"baseline":>12}{"current":>12}{"ratio":>8}')
+    for metric, old, new, ratio, status in rows:
+        if args.all or status:
+            old_text, new_text = [f'{value:>12.1f}' if value is not None else f'{"-":>12}' for value in (old, new)]
+            ratio_text = f'{ratio:>7.2f}x' if ratio is not None else f'{"-":>8}'
+            print(f'{metric:<60}{old_text}{new_text}{ratio_text}  {status}')
+
+    print(f'\n{n_regressions} regressions (threshold {args.threshold:.0%}, min {args.min_ms} ms).')
+    return 1 if n_regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark suite of the dashboard against the bundled dataset.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite & save the results as JSON.')
+    run_parser.add_argument('--group', dest='groups', action='append', choices=GROUPS, help='Group to run (repeatable).')
+    run_parser.add_argument('--ticker', action='append', help='Ticker to benchmark (repeatable). Defaults to every ticker.')
+    run_parser.add_argument('--repeat', type=int, default=3, help='Number of runs per case (the median is kept).')
+    run_parser.add_argument('--output', help='Path of the result file.')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two result files & flag the regressions.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2, help='Relative growth flagged as a regression.')
+    compare_parser.add_argument('--min-ms', type=float, default=5.0, help='Min time difference (ms) flagged.')
+    compare_parser.add_argument('--all', action='store_true', help='List every metric, not only the changed ones.')
+
+    worker_parser = subparsers.add_parser('worker', help=argparse.SUPPRESS)
+    worker_parser.add_argument('group', choices=GROUPS)
+    worker_parser.add_argument('--ticker', action='append')
+    worker_parser.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        sys.exit(run_compare(args))
+
+    warnings.filterwarnings('ignore')
+    if args.command == 'worker':
+        args.tickers = get_tickers(args.ticker)
+        print(RESULT_PREFIX + json.dumps(run_group(args.group, args)))
+    else:
+        args.command = args.command or 'run'
+        args.groups = getattr(args, 'groups', None) or GROUPS
+        args.ticker, args.repeat, args.output = getattr(args, 'ticker', None), getattr(args, 'repeat', 3), getattr(args, 'output', None)
+        args.tickers = get_tickers(args.ticker)
+        run_suite(args)
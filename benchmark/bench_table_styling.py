@@ -0,0 +1,67 @@
+
+
+# %%
+import os, sys, time, argparse, warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from config.config import FREQ_KEYS, YR_RANGE
+from autovisualise_data import ticker_plot
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def time_styling(formatting, df, freq, repeat:int, render:bool) -> float:
+    '''
+    Purpose :
+        Output the best time (ms) to compute the CSS of a pivot table (the styler
+        is lazy, so the CSS is only computed by (_compute) or when it's rendered),
+        or to render it into HTML.
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        styler = formatting(df, freq)
+        styler.render() if render else styler._compute()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run_benchmark(etf_dir:str, ticker:str, repeat:int, render:bool):
+    '''
+    Purpose :
+        Compare (formatting_dataframe) with (formatting_dataframe_vectorised) on
+        every price difference pivot table of a ticker.
+    '''
+
+    pivot_stats = ticker_plot.read_pivot_stats(etf_dir, ticker, 'pivot_stats.pickle')
+
+    print(f'Time to {"style and render" if render else "style"} the tables (best of {repeat}).')
+    print(f'{"pivot table":<40}{"cells":>8}{"applymap (ms)":>16}{"vectorised (ms)":>18}{"speedup":>10}')
+    total_old = total_new = 0
+    for freq in FREQ_KEYS:
+        for yr_range in YR_RANGE:
+            key = freq if yr_range == 'max_yr' else f'{freq}_{yr_range}'
+            df = pivot_stats[key]
+            time_old = time_styling(ticker_plot.formatting_dataframe, df, freq, repeat, render)
+            time_new = time_styling(ticker_plot.formatting_dataframe_vectorised, df, freq, repeat, render)
+            total_old, total_new = total_old + time_old, total_new + time_new
+            print(f'{key:<40}{df.size:>8}{time_old:>16.2f}{time_new:>18.2f}{time_old / time_new:>9.1f}x')
+    print(f'{"total":<40}{"":>8}{total_old:>16.2f}{total_new:>18.2f}{total_old / total_new:>9.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmark of the table styling.')
+    parser.add_argument('--etf-dir', default='ETF_sector')
+    parser.add_argument('--ticker', default='SPY')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--render', action='store_true', help='Include the HTML rendering in the timings.')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    run_benchmark(args.etf_dir, args.ticker, args.repeat, args.render)
@@ -0,0 +1,65 @@
+# %%
+import os, sys, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Personal modules.
+from autovisualise_data import tracing
+
+
+# %%
+# --------------------------------------------------------------
+# Benchmark.
+# --------------------------------------------------------------
+
+def stage():
+    return None
+
+
+traced_stage = tracing.traced('bench_stage')(stage)
+
+
+def with_trace():
+    with tracing.trace('bench_stage', tab='bench'):
+        return None
+
+
+def time_per_call(func, n_calls:int, repeat:int) -> float:
+    '''
+    Purpose :
+        Output the best time per call (ns) of a function.
+    '''
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / n_calls * 1e9
+
+
+def run_benchmark(n_calls:int, repeat:int):
+    '''
+    Purpose :
+        Compare the cost of a call without tracing, with the (traced) decorator and
+        the (trace) context manager, while the tracing is disabled and enabled.
+    '''
+
+    baseline = time_per_call(stage, n_calls, repeat)
+    print(f'{"untraced":<32}{baseline:>10.0f} ns')
+    for enabled in [False, True]:
+        tracing.enable_tracing(enabled)
+        for name, func in [('traced', traced_stage), ('trace', with_trace)]:
+            timing = time_per_call(func, n_calls, repeat)
+            print(f'{name + (" (enabled)" if enabled else " (disabled)"):<32}{timing:>10.0f} ns{timing - baseline:>+10.0f} ns')
+    tracing.TRACER.reset()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of the tracing overhead per call.')
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.calls, args.repeat)
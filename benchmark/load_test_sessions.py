@@ -0,0 +1,362 @@
+# %%
+import os, sys, json, time, socket, random, asyncio, argparse, platform, subprocess
+import numpy as np
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from tornado.websocket import websocket_connect, WebSocketError
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Websocket endpoint of the streamlit server (newer versions / the pinned version).
+STREAM_PATHS = ['_stcore/stream', 'stream']
+
+# Widgets the sessions interact with (the state of a selectbox / radio is the option index).
+WIDGET_TYPES = ['selectbox', 'radio', 'checkbox', 'slider']
+
+# Container budget of the deployed app (docker-compose.yml).
+MEM_LIMIT_MB = 70
+
+
+# %%
+# --------------------------------------------------------------
+# Server.
+# --------------------------------------------------------------
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(script:str, port:int) -> subprocess.Popen:
+    '''
+    Purpose :
+        Start the dashboard with (streamlit run) in headless mode, from the repo
+        directory so the config & dataset paths resolve as in the deployment.
+    '''
+
+    args = [
+        sys.executable, '-m', 'streamlit', 'run', script, '--server.headless', 'true',
+        '--server.port', str(port), '--browser.gatherUsageStats', 'false',
+    ]
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get('PYTHONPATH')]))}
+    return subprocess.Popen(args, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def get_rss_mb(pid:Optional[int]) -> Optional[float]:
+    '''
+    Purpose :
+        Output the resident memory (MB) of the server process (None if it isn't
+        known or /proc isn't available).
+    '''
+
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/statm') as in_file:
+            return int(in_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return None
+
+
+async def connect(url:str, timeout:float=60.0):
+    '''
+    Purpose :
+        Connect to the websocket of the server, trying each endpoint path until the
+        server is up (or the timeout is reached).
+
+    Output  :
+        Websocket connection & the URL it is connected to.
+    '''
+
+    urls = [url] if url.rstrip('/').endswith(tuple(STREAM_PATHS)) else [f'{url.rstrip("/")}/{path}' for path in STREAM_PATHS]
+    deadline = time.monotonic() + timeout
+    while True:
+        for stream_url in urls:
+            try:
+                return await websocket_connect(stream_url, max_message_size=2 ** 30), stream_url
+            except (OSError, WebSocketError) as error:
+                last_error = error
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Cannot connect to ({url}): {last_error}.')
+        await asyncio.sleep(0.5)
+
+
+# %%
+# --------------------------------------------------------------
+# Session.
+# --------------------------------------------------------------
+
+class Session:
+    '''
+    Purpose :
+        Browser session driving the dashboard through the websocket protocol: each
+        rerun sends the widget states and waits for the script to finish, and the
+        widgets of the run are kept to pick the next interaction from.
+
+    Input   :
+        conn : Websocket connection to the server.
+        rng  : Random obj picking the widgets & their values.
+    '''
+
+    def __init__(self, conn, rng:random.Random):
+        self.conn, self.rng = conn, rng
+        self.widgets: Dict[str, tuple] = {}
+        self.states: Dict[str, WidgetState] = {}
+        self.cached_widgets: Dict[str, tuple] = {}
+
+    async def rerun(self) -> Dict:
+        '''
+        Purpose :
+            Rerun the script with the current widget states.
+
+        Output  :
+            Dict obj of the rerun latency (ms), the bytes received & the errors shown.
+        '''
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = ''
+        back_msg.rerun_script.widget_states.widgets.extend(self.states.values())
+
+        start = time.perf_counter()
+        await self.conn.write_message(back_msg.SerializeToString(), binary=True)
+
+        widgets, n_bytes, n_errors = {}, 0, 0
+        while True:
+            data = await self.conn.read_message()
+            if data is None:
+                raise ConnectionError('The server closed the session.')
+            n_bytes += len(data)
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+
+            msg_type = msg.WhichOneof('type')
+            if msg_type == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    n_errors += 1
+                elif element_type in WIDGET_TYPES:
+                    widget = (element_type, getattr(element, element_type))
+                    widgets[widget[1].id] = widget
+                    if msg.hash:
+                        self.cached_widgets[msg.hash] = widget
+            elif msg_type == 'ref_hash' and msg.ref_hash in self.cached_widgets:
+                # Message the session already received, sent as a reference to its hash.
+                widget = self.cached_widgets[msg.ref_hash]
+                widgets[widget[1].id] = widget
+            elif msg_type == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                n_errors += msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+                break
+
+        # Widgets not shown anymore (e.g. another tab) are dropped, as a browser does.
+        self.widgets = widgets
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in widgets}
+        return {'latency_ms': (time.perf_counter() - start) * 1000, 'bytes': n_bytes, 'errors': n_errors}
+
+    def interact(self) -> Optional[str]:
+        '''
+        Purpose :
+            Change one of the widgets shown to a random value (tab, ticker, checkbox
+            or slider).
+
+        Output  :
+            Str. Label of the widget changed (None if no widget is shown).
+        '''
+
+        if not self.widgets:
+            return None
+
+        widget_type, widget = self.widgets[self.rng.choice(sorted(self.widgets))]
+        state = WidgetState(id=widget.id)
+        if widget_type in ['selectbox', 'radio']:
+            state.int_value = self.rng.randrange(max(len(widget.options), 1))
+        elif widget_type == 'checkbox':
+            current = self.states.get(widget.id)
+            state.bool_value = not (current.bool_value if current is not None else widget.default)
+        else:
+            steps = int(round((widget.max - widget.min) / widget.step)) if widget.step else 0
+            values = sorted(widget.min + self.rng.randint(0, steps) * widget.step for _ in widget.default)
+            state.double_array_value.data.extend(values)
+        self.states[widget.id] = state
+        return widget.label
+
+
+async def run_session(url:str, seed:int, steps:int, think:float) -> Dict:
+    '''
+    Purpose :
+        Open a session, load the default view and run (steps) random interactions
+        with a think time between each.
+    '''
+
+    conn, _ = await connect(url)
+    session = Session(conn, random.Random(seed))
+    try:
+        first_run = await session.rerun()
+        reruns = []
+        for _ in range(steps):
+            if think:
+                await asyncio.sleep(session.rng.uniform(0, 2 * think))
+            session.interact()
+            reruns.append(await session.rerun())
+    finally:
+        conn.close()
+    return {'first_run': first_run, 'reruns': reruns}
+
+
+# %%
+# --------------------------------------------------------------
+# Load Test.
+# --------------------------------------------------------------
+
+async def sample_rss(pid:Optional[int], samples:List[float], stop:asyncio.Event, interval:float=0.1):
+    while not stop.is_set():
+        rss = get_rss_mb(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(interval)
+
+
+async def run_phase(url:str, pid:Optional[int], n_sessions:int, steps:int, think:float, seed:int) -> Dict:
+    '''
+    Purpose :
+        Run (n_sessions) concurrent sessions & summarise the rerun latencies, the
+        throughput and the memory of the server during the phase.
+    '''
+
+    rss_start, rss_samples, stop = get_rss_mb(pid), [], asyncio.Event()
+    sampler = asyncio.ensure_future(sample_rss(pid, rss_samples, stop))
+
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*[run_session(url, seed + idx, steps, think) for idx in range(n_sessions)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+    # Let the server drop the closed sessions before measuring what is retained.
+    await asyncio.sleep(1.0)
+    rss_end = get_rss_mb(pid)
+
+    reruns = [rerun for session in sessions for rerun in session['reruns']]
+    first_runs = [session['first_run'] for session in sessions]
+    latencies = np.array([rerun['latency_ms'] for rerun in reruns] or [np.nan])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'sessions': n_sessions, 'reruns': len(reruns), 'elapsed_s': elapsed,
+        'throughput_rps': (len(reruns) + len(first_runs)) / elapsed,
+        'rerun_p50_ms': p50, 'rerun_p95_ms': p95, 'rerun_p99_ms': p99,
+        'first_run_p50_ms': float(np.median([run['latency_ms'] for run in first_runs])),
+        'kb_per_rerun': float(np.mean([rerun['bytes'] for rerun in reruns] or [0])) / 1024,
+        'errors': sum(run['errors'] for run in reruns + first_runs),
+        'rss_start_mb': rss_start, 'rss_peak_mb': max(rss_samples, default=None), 'rss_end_mb': rss_end,
+        'rss_growth_mb': rss_end - rss_start if rss_start is not None and rss_end is not None else None,
+    }
+
+
+def print_phase(phase:Dict, mem_limit_mb:float):
+    def mb(value):
+        return f'{value:>9.1f}' if value is not None else f'{"-":>9}'
+
+    over_limit = phase['rss_peak_mb'] is not None and phase['rss_peak_mb'] > mem_limit_mb
+    print(
+        f'{phase["sessions"]:>8}{phase["reruns"]:>8}{phase["throughput_rps"]:>10.2f}'
+        f'{phase["rerun_p50_ms"]:>10.0f}{phase["rerun_p95_ms"]:>10.0f}{phase["rerun_p99_ms"]:>10.0f}'
+        f'{phase["first_run_p50_ms"]:>10.0f}{phase["kb_per_rerun"]:>10.0f}{phase["errors"]:>8}'
+        f'{mb(phase["rss_peak_mb"])}{mb(phase["rss_growth_mb"])}' + ('  OVER LIMIT' if over_limit else ''),
+        flush=True,
+    )
+
+
+async def run_load_test(args) -> List[Dict]:
+    '''
+    Purpose :
+        Start the server (unless a URL is given) and run a phase per session count
+        against it, the caches staying warm from one phase to the next.
+    '''
+
+    server, pid, url = None, args.pid, args.url
+    if url is None:
+        port = get_free_port()
+        server = start_server(args.script, port)
+        pid, url = server.pid, f'ws://127.0.0.1:{port}'
+
+    try:
+        conn, stream_url = await connect(url)
+        conn.close()
+        print(f'Server ({stream_url}), pid {pid}, {get_rss_mb(pid) or 0:.1f} MB at start, '
+              f'{args.steps} interactions per session, think time {args.think}s.')
+        print(f'{"sessions":>8}{"reruns":>8}{"rerun/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+              f'{"first ms":>10}{"KB/run":>10}{"errors":>8}{"peak MB":>9}{"grow MB":>9}')
+
+        phases = []
+        for n_sessions in args.sessions:
+            phase = await run_phase(stream_url, pid, n_sessions, args.steps, args.think, args.seed)
+            print_phase(phase, args.mem_limit_mb)
+            phases.append(phase)
+        return phases
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def get_meta(args) -> Dict:
+    import streamlit, tornado
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': commit,
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'versions': {'streamlit': streamlit.__version__, 'tornado': tornado.version},
+        'script': args.script, 'steps': args.steps, 'think': args.think, 'seed': args.seed,
+    }
+
+
+def write_results(phases:List[Dict], args):
+    '''
+    Purpose :
+        Write the phases as JSON in the format of bench_suite.py, so two load tests
+        can be compared with (bench_suite.py compare). Only the latency & memory
+        metrics go in the results (a lower value is better), the full phases are
+        kept in the summary.
+    '''
+
+    results = {}
+    for phase in phases:
+        for metric in ['rerun_p50_ms', 'rerun_p95_ms', 'rerun_p99_ms', 'first_run_p50_ms', 'rss_peak_mb']:
+            if phase[metric] is not None:
+                results[f'load/sessions_{phase["sessions"]}/{metric}'] = phase[metric]
+
+    with open(args.output, 'w') as out_file:
+        json.dump({'meta': get_meta(args), 'results': results, 'summary': phases}, out_file, indent=2, sort_keys=True)
+    print(f'Written to ({args.output}).')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test of the dashboard with concurrent sessions over the websocket.')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8], help='Session counts, one phase each.')
+    parser.add_argument('--steps', type=int, default=20, help='Number of random interactions per session.')
+    parser.add_argument('--think', type=float, default=0.0, help='Mean think time (s) between interactions.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--script', default='run_streamlit.py', help='Dashboard script to serve.')
+    parser.add_argument('--url', help='URL of a running server (e.g. ws://localhost:8501) instead of starting one.')
+    parser.add_argument('--pid', type=int, help='Pid of the running server, to report its memory.')
+    parser.add_argument('--mem-limit-mb', type=float, default=MEM_LIMIT_MB, help='Memory budget flagged when exceeded.')
+    parser.add_argument('--output', help='JSON file to write the results to.')
+    args = parser.parse_args()
+
+    phases = asyncio.run(run_load_test(args))
+    if args.output:
+        write_results(phases, args)
+    sys.exit(1 if any(phase['errors'] for phase in phases) else 0)
@@ -0,0 +1,300 @@
+# %%
+import os, sys, json, time, random, argparse, tempfile, threading, subprocess
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Personal modules.
+from config.config import ETF_DIRS
+from config.config_dashboard import ST_TABS
+from autovisualise_data import ticker_plot, fred_plot, screener, prerender, ticker_views, chart_cache
+from autovisualise_data.data_cache import DATA_CACHE
+from autovisualise_data.pivot_store import LazyPivotStats
+from autovisualise_data.ticker_index import get_ticker_index
+
+
+# %%
+# --------------------------------------------------------------
+# Reads.
+# --------------------------------------------------------------
+
+# Pickle files & the index of the inner tuple obj read by the dashboard.
+PICKLE_SOURCES = [
+    ('pivot_stats.pickle', None), ('pivot_unique_days.pickle', 0), ('pivot_unique_days.pickle', 1),
+    ('pivot_vol_stats.pickle', None),
+]
+
+
+def fingerprint(df:pd.DataFrame) -> int:
+    return int(pd.util.hash_pandas_object(df, index=True).sum())
+
+
+def list_reads(max_keys:int):
+    '''
+    Purpose :
+        Output every read a session can make: pivot tables through the pickle reader
+        and the lazy accessor, FRED series and the screener frame of each ETF directory.
+    '''
+
+    reads = []
+    ticker_index = get_ticker_index()
+    for etf_dir in ETF_DIRS:
+        for ticker in ticker_index.get_tickers(etf_dir):
+            for filename, get_idx in PICKLE_SOURCES:
+                for key in list(ticker_plot.read_pickle(etf_dir, ticker, filename, get_idx))[:max_keys]:
+                    reads.append(('read_pickle', etf_dir, ticker, filename, get_idx, key))
+                    reads.append(('lazy_pivot_stats', etf_dir, ticker, filename, get_idx, key))
+        reads.append(('screener', etf_dir, 'monthly', 'max_yr'))
+
+    reads += [('fred', series) for series in list(fred_plot.read_pickle('fred_data.pickle'))[:max_keys]]
+    return reads
+
+
+def run_read(read) -> pd.DataFrame:
+    kind, args = read[0], read[1:]
+    if kind == 'read_pickle':
+        return ticker_plot.read_pickle(*args[:4])[args[4]]
+    if kind == 'lazy_pivot_stats':
+        return LazyPivotStats(*args[:4])[args[4]]
+    if kind == 'screener':
+        return screener.read_screener_frame(*args)
+    return fred_plot.read_pickle('fred_data.pickle')[args[0]]
+
+
+# %%
+# --------------------------------------------------------------
+# Rendered Charts.
+# --------------------------------------------------------------
+
+def canonical_chart(chart_json):
+    '''
+    Purpose :
+        Output a canonical form of a serialised bokeh JSON item to compare renders:
+        the models are walked from the root and numbered in order of visit, since
+        the model ids (and so the order of the references) differ on each render.
+    '''
+
+    if chart_json is None:
+        return None
+
+    item = json.loads(chart_json)
+    references = {reference['id']: reference for reference in item['doc']['roots']['references']}
+    visited = {}
+
+    def walk(obj):
+        if isinstance(obj, dict):
+            if set(obj) == {'id'} and obj['id'] in references:
+                if obj['id'] in visited:
+                    return ['ref', visited[obj['id']]]
+                visited[obj['id']] = len(visited)
+                reference = references[obj['id']]
+                return ['model', visited[obj['id']], reference['type'], walk(reference.get('attributes', {}))]
+            return {key: walk(val) for key, val in sorted(obj.items())}
+        if isinstance(obj, list):
+            return [walk(val) for val in obj]
+        return obj
+
+    return json.dumps(walk({'id': item['root_id']}))
+
+
+def render_view(view, run, background:bool=False) -> list:
+    '''
+    Purpose :
+        Render the charts of a view through the chart cache as a session (or the
+        prefetcher, in the background) does. The key is tagged with the run, so every
+        run renders the view (it's neither cached nor pre-rendered). Output None if
+        the background render was skipped.
+    '''
+
+    key = ('stress_test', run) + chart_cache.view_key(**view)
+    try:
+        charts = chart_cache.get_rendered_charts(key, lambda: ticker_views.build_view_plots(view), threading.Event() if background else None)
+    except chart_cache.RenderSkipped:
+        return None
+    return [canonical_chart(chart) for chart in charts]
+
+
+def check_skipped_renders(view) -> list:
+    '''
+    Purpose :
+        Check that a background render is skipped (and not cached) while another view
+        is rendering or once it's cancelled, rather than waiting for the render lock.
+    '''
+
+    errors = []
+    cancelled = threading.Event()
+    for case in ['lock taken', 'cancelled']:
+        key = ('stress_test', case) + chart_cache.view_key(**view)
+        if case == 'lock taken':
+            chart_cache.RENDER_LOCK.acquire()
+        else:
+            cancelled.set()
+        start = time.perf_counter()
+        try:
+            chart_cache.get_rendered_charts(key, lambda: ticker_views.build_view_plots(view), cancelled)
+            errors.append(f'skipped render: rendered with the {case}')
+        except chart_cache.RenderSkipped:
+            pass
+        finally:
+            if case == 'lock taken':
+                chart_cache.RENDER_LOCK.release()
+        if key in chart_cache.CHART_CACHE:
+            errors.append(f'skipped render: cached with the {case}')
+        if time.perf_counter() - start > 10:
+            errors.append(f'skipped render: waited with the {case}')
+    return errors
+
+
+def check_rendered_charts(etf_dir:str, ticker:str, n_views:int, sessions:int, runs:int) -> list:
+    '''
+    Purpose :
+        Render views of a ticker on concurrent threads (half of them in the background)
+        and compare the charts with the ones rendered serially. Skipped background
+        renders aren't compared.
+    '''
+
+    views = [view for tab in ST_TABS[:5] for view in prerender.iter_views(tab, etf_dir, ticker)]
+    views = random.Random(0).sample(views, min(n_views, len(views)))
+    expected = [render_view(view, 'serial') for view in views]
+
+    errors, n_skipped = check_skipped_renders(views[0]), 0
+    # Without another render, a background render renders the view.
+    errors += [
+        f'background render: charts differ for {view}' for view, serial in zip(views[:3], expected)
+        if render_view(view, 'background', background=True) != serial
+    ]
+    for run in range(runs):
+        background = [idx % 2 == 1 for idx in range(len(views))]
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            rendered = list(executor.map(render_view, views, [run] * len(views), background))
+        n_skipped += sum(charts is None for charts in rendered)
+        errors += [
+            f'render run {run}: charts differ for {view}' for view, charts, serial in zip(views, rendered, expected)
+            if charts is not None and charts != serial
+        ]
+
+    chart_cache.CHART_CACHE.clear()
+    print(f'{len(views)} views rendered serially & on {sessions} threads ({runs} runs, {n_skipped} background renders skipped).')
+    return errors
+
+
+# %%
+# --------------------------------------------------------------
+# Stress Test.
+# --------------------------------------------------------------
+
+def run_session(session:int, reads, expected, n_reads:int, evict_every:int):
+    '''
+    Purpose :
+        Make random reads and compare each output with the one read serially. Every
+        (evict_every) reads the data cache is cleared so the files are read again.
+    '''
+
+    rng, errors = random.Random(session), []
+    for idx in range(n_reads):
+        read = rng.choice(reads)
+        if evict_every and idx % evict_every == evict_every - 1:
+            DATA_CACHE.clear()
+        try:
+            if fingerprint(run_read(read)) != expected[read]:
+                errors.append(f'session {session}: mismatch for {read}')
+        except Exception as error:
+            errors.append(f'session {session}: {type(error).__name__} ({error}) for {read}')
+    return errors
+
+
+def change_cwd(stop:threading.Event):
+    '''
+    Purpose :
+        Keep changing the process working directory, which would break any read
+        that depends on it.
+    '''
+
+    default_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        while not stop.is_set():
+            os.chdir(tmp_dir if os.getcwd() != tmp_dir else default_dir)
+            time.sleep(0.001)
+    os.chdir(default_dir)
+
+
+def read_from_other_cwd(read) -> int:
+    '''
+    Purpose :
+        Make a read in a new process started from another working directory (so the
+        config is imported there) and output the fingerprint of the output.
+    '''
+
+    script = (
+        f'import sys, warnings; warnings.filterwarnings("ignore"); sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); '
+        f'from stress_concurrent_sessions import fingerprint, run_read; print(fingerprint(run_read({read!r})))'
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = {**os.environ, 'PYTHONPATH': ROOT_DIR}
+        env.pop('DATA_ABS_DIR', None)
+        output = subprocess.run([sys.executable, '-c', script], cwd=tmp_dir, env=env, capture_output=True, text=True)
+    if output.returncode:
+        raise RuntimeError(output.stderr.strip().splitlines()[-1])
+    return int(output.stdout.strip().splitlines()[-1])
+
+
+def run_stress_test(sessions:int, n_reads:int, max_keys:int, evict_every:int, render_views:int, render_runs:int) -> int:
+    '''
+    Purpose :
+        Run concurrent sessions against the data access layer while another thread
+        changes the working directory, then make a few reads from a process started
+        from another working directory, and count the reads that don't match. Then
+        render charts on concurrent threads and count the ones that don't match.
+    '''
+
+    reads = list_reads(max_keys)
+    expected = {read: fingerprint(run_read(read)) for read in reads}
+    DATA_CACHE.clear()
+    print(f'{len(reads)} distinct reads, {sessions} sessions x {n_reads} reads.')
+
+    stop = threading.Event()
+    cwd_thread = threading.Thread(target=change_cwd, args=(stop,), daemon=True)
+    cwd_thread.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(run_session, session, reads, expected, n_reads, evict_every) for session in range(sessions)]
+        errors = [error for future in futures for error in future.result()]
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    cwd_thread.join()
+
+    # The data paths must not depend on the working directory the config is imported from either.
+    for read in [reads[0], reads[-1]]:
+        try:
+            if read_from_other_cwd(read) != expected[read]:
+                errors.append(f'other cwd: mismatch for {read}')
+        except Exception as error:
+            errors.append(f'other cwd: {type(error).__name__} ({error}) for {read}')
+
+    if render_views:
+        errors += check_rendered_charts(ETF_DIRS[0], get_ticker_index().get_tickers(ETF_DIRS[0])[0], render_views, sessions, render_runs)
+
+    print(f'{sessions * n_reads} reads in {elapsed:.2f}s ({sessions * n_reads / elapsed:.0f} reads/s), '
+          f'cache {DATA_CACHE.stats()}.')
+    for error in errors[:20]:
+        print(error)
+    print(f'{len(errors)} errors.' if errors else 'All reads & charts match.')
+    return len(errors)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stress test of concurrent sessions reading the data.')
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--reads', type=int, default=100, help='Number of reads per session.')
+    parser.add_argument('--max-keys', type=int, default=3, help='Number of table keys read per pickle file.')
+    parser.add_argument('--evict-every', type=int, default=50, help='Clear the data cache every N reads (0 to never).')
+    parser.add_argument('--render-views', type=int, default=30, help='Number of views rendered on concurrent threads (0 to skip).')
+    parser.add_argument('--render-runs', type=int, default=3, help='Number of concurrent renders of the views.')
+    args = parser.parse_args()
+
+    sys.exit(1 if run_stress_test(args.sessions, args.reads, args.max_keys, args.evict_every, args.render_views, args.render_runs) else 0)
@@ -13,6 +13,9 @@ from config.config_naming import *
 
 YR_RANGE = ['max_yr', 'range_20_yr', 'range_15_yr', 'range_10_yr', 'range_5_yr']
 
+# Year range option for selecting any start / end year (served from the year range index). 
+YR_RANGE_CUSTOM = 'custom_yr'
+
 
 # ----------------------------------------------------------------------
 # Ticker (Equity).
@@ -24,13 +27,14 @@ ETF_EQUITY = [
     # 'IYW', 'IYZ', 'XRT', 'XHB',
 ]
 
+# ETF directories (relative to the dataset directory) shown on the dashboard. 
+ETF_DIRS = ['ETF_sector'] + ['/'.join(['ETF_equity', etf]) for etf in ETF_EQUITY]
+
 
 # ----------------------------------------------------------------------
 # Directory / File Path.
 # ---------------------------------------------------------------------- 
 
-# Logging file path. 
-LOG_PROCESSING_FILEPATH = 'logs/runtime/log_processing.log'
 
 # Others.  
 PROJECT_PATH = os.getcwd()
@@ -39,10 +43,25 @@ PROJECT_PATH = os.getcwd()
 # ETF_SECTOR_ABS_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'ETF_sector') 
 # ETF_EQUITY_ABS_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'ETF_equity') 
 
+# Absolute path to the data warehouse: DATA_ABS_DIR if it's given as an absolute path, else the 
+# project directory (resolved from this file, not from the working directory at import time). 
+# Every data path is resolved from it, so reads never depend on the process working directory. 
+PROJECT_ABS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not os.path.isabs(os.environ.get('DATA_ABS_DIR', '')): 
+    os.environ['DATA_ABS_DIR'] = PROJECT_ABS_DIR
+
+# Logging file path. 
+LOG_PROCESSING_FILEPATH = os.path.join(PROJECT_ABS_DIR, 'logs', 'runtime', 'log_processing.log')
+
 # Path to the FRED data directory.
-os.environ['DATA_ABS_DIR'] = '.'
 FRED_DATA_ABS_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'docs', 'dataset', 'economic_data', 'FRED') 
 
+# Path to the dataset directory which contains the ETF directories. 
+DATASET_ABS_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'docs', 'dataset') 
+
+# Path to the directory for the pre-rendered charts and tables. 
+PRERENDER_CACHE_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'docs', 'cache', 'prerender') 
+
 # # Compile a list of ticker names. 
 # re_compile = re.compile(r'(?<!\..*)[A-Z]') 
 # LS_ETF_SECTOR = list( filter(re_compile.match, os.listdir(ETF_SECTOR_ABS_DIR)) ) 
@@ -53,12 +72,85 @@ FRED_DATA_ABS_DIR = os.path.join(os.environ['DATA_ABS_DIR'], 'docs', 'dataset',
 # For Ticker Data Processing. 
 # ---------------------------------------------------------------------- 
 
+# To trace the wall / CPU time & memory of each stage (read, build, render, styling), and the port of 
+# the prometheus metrics endpoint (0 to not serve it). 
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', '0') == '1'
+TRACING_METRICS_PORT = int(os.environ.get('TRACING_METRICS_PORT', 9464))
+
+# Max number of samples kept per stage for the percentiles, the tags exported as metric labels 
+# (others are only logged) & the buckets (seconds) of the wall time histogram. 
+TRACING_MAX_SAMPLES = 2048
+TRACING_LABELS = ['tab']
+TRACING_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
 # Store keys for dictionary indexing. 
 FREQ_KEYS = ['monthly', 'weekly', 'daily_by_trdr_day', 'daily_by_weekday']
 
 # Column names for creating pivot tables. 
 FREQ_COLS = ['month', 'week', 'trdr_day', 'weekday']
 
+# Columns to group by (pivot table index) for each date interval. 
+FREQ_GROUP_COLS = {
+    'monthly': ['month'], 
+    'weekly': ['week'], 
+    'daily_by_trdr_day': ['month', 'trdr_day'], 
+    'daily_by_weekday': ['week', 'weekday'], 
+}
+
+# Frequencies of the volume statistics whose overall volume (averaged over every month / week) is
+# precomputed as derived tables of the volume bundle, with the suffixes of the derived table keys. 
+OVERALL_VOL_FREQS = ['daily_by_trdr_day', 'daily_by_weekday']
+OVERALL_VOL_SUFFIXES = ['_overall_vol_row', '_overall_vol_counts']
+
+# Running aggregates of the statistics engine, kept within each ticker storage directory. 
+STATS_ENGINE_STATE_FILENAME = 'stats_engine_state.pickle'
+
+# Pickle files read to build the year range index (prefix sums for any range of years). 
+YEAR_RANGE_INDEX_SOURCES = ['df_ticker.pickle', 'pivot_unique_days.pickle']
+
+# Pivot pickle files that are read by the dashboard. 
+PIVOT_PICKLE_FILENAMES = ['pivot_stats.pickle', 'pivot_unique_days.pickle', 'pivot_vol_stats.pickle']
+
+# Columnar store (one Arrow IPC file per pivot table) within each ticker storage directory. 
+COLUMNAR_STORE_DIRNAME = 'columnar'
+COLUMNAR_STORE_EXT = '.arrow'
+
+# Rows per record batch of the FRED series store (each batch keeps its date range to skip it on read). 
+FRED_STORE_BATCH_ROWS = 64
+
+# Panel file (every pivot table of every ticker, one Arrow record batch per ticker) within each ETF directory. 
+PANEL_STORE_FILENAME = 'panel.arrow'
+
+# To downcast the pivot tables & raw ticker frames on load and in the converted stores (integers to 
+# int8 / int16 / int32, exact floats to float32 and repeated strings to categoricals), and the max ratio 
+# of unique values to rows for a string column to become a categorical. 
+COMPACT_DTYPES = os.environ.get('COMPACT_DTYPES', '1') != '0'
+COMPACT_CATEGORY_MAX_RATIO = 0.5
+
+# Memory budget (bytes) for the data cached in memory (LRU eviction beyond it). 
+DATA_CACHE_MAX_BYTES = int(os.environ.get('DATA_CACHE_MAX_BYTES', 20 * 1024 ** 2))
+
+# To refresh the ticker index with a file watcher, and the delay (seconds) to batch the file events. 
+TICKER_INDEX_WATCH = os.environ.get('TICKER_INDEX_WATCH', '1') != '0'
+TICKER_INDEX_REFRESH_DELAY = 1.0
+
+# To prefetch the adjacent views (period, year range & ticker) into the chart cache after a view renders. 
+PREFETCH_ENABLED = os.environ.get('PREFETCH_ENABLED', '1') != '0'
+PREFETCH_MAX_WORKERS = int(os.environ.get('PREFETCH_MAX_WORKERS', 2))
+
+# Max number of adjacent views prefetched per view, and max number of views waiting across sessions. 
+PREFETCH_MAX_VIEWS = 6
+PREFETCH_MAX_PENDING = 24
+
+# Delay (seconds) before a prefetch starts, so views scrubbed past are dropped before any work. 
+PREFETCH_DELAY = 0.25
+
+# Number of threads reading the pivot tables of every ticker for the screener. 
+SCREENER_MAX_WORKERS = int(os.environ.get('SCREENER_MAX_WORKERS', 8))
+
+# Memory budget (bytes) for the rendered charts (serialised bokeh JSON) cached by widget state. 
+CHART_CACHE_MAX_BYTES = int(os.environ.get('CHART_CACHE_MAX_BYTES', 10 * 1024 ** 2))
+
 # Store keys for dictionary indexing. 
 HOLIDAYS_KEYS = [
     'new_year', 'mar_lut_king_jr', 'valentine', 'president', 
@@ -1,6 +1,5 @@
-import holoviews as hv
+import os
 from datetime import datetime
-from bokeh.models import HoverTool
 
 
 # ----------------------------------------------------------------------
@@ -10,6 +9,27 @@ from bokeh.models import HoverTool
 # To store styled dataframes. 
 PIVOT_STATS_STYLED = {}
 
+# To display the styled tables as cached HTML rather than formatting them on every rerun. 
+ST_TABLE_AS_HTML = os.environ.get('ST_TABLE_AS_HTML', '1') != '0'
+
+# Formatting & CSS for the styled dataframes. 
+TABLE_FORMATTER = {
+    "avg_diff": "{:.3%}", 
+    "med_diff": "{:.3%}", 
+    "tot_diff": "{:.3%}",
+    "max_diff": "{:.3%}",
+    "min_diff": "{:.3%}",
+    "std_diff": "{:.3%}",
+    "pos_avg_diff": "{:.3%}",
+    "neg_avg_diff": "{:.3%}",
+    "up_prob": "{:.2%}",
+    "down_prob": "{:.2%}",
+}
+TABLE_HIGHLIGHT_CSS = 'background-color: lightblue'
+TABLE_NULL_CSS = 'background-color: gray'
+TABLE_BAR_CSS = 'width: 10em; height: 80%;'
+TABLE_BAR_COLORS = ['#FFA07A', 'lightgreen']
+
 
 # ----------------------------------------------------------------------
 # Streamlit CSS Styling. 
@@ -30,6 +50,10 @@ ST_BACKGROUND_COLOR = "rgb(255,255,255)"
 
 HV_PN_HEIGHT, HV_PN_WIDTH = (350,850)
 HV_PN_VSPACE, HV_PN_HSPACE = (10,10)
+
+# Decimation of the FRED lines to about one point per pixel of the chart width (lttb / minmax, empty to 
+# send every point). The charts embedded by streamlit are static, so the date slider sets the range. 
+FRED_DOWNSAMPLE = os.environ.get('FRED_DOWNSAMPLE', 'lttb') or None
 XLIM = (datetime(1980,1,1), datetime(datetime.today().year, 12, 1))
 
 
@@ -38,12 +62,11 @@ XLIM = (datetime(1980,1,1), datetime(datetime.today().year, 12, 1))
 # ---------------------------------------------------------------------- 
 
 # Hover.
-hover_for_eco = HoverTool(
-    tooltips=[('date','@date{%F}'), ('value','@{value}{0.2f}')],
-    formatters={'@date': 'datetime'}, mode='vline'
-)
+HOVER_ECO_TOOLTIPS = [('date','@date{%F}'), ('value','@{value}{0.2f}')]
+HOVER_ECO_FORMATTERS = {'@date': 'datetime'}
 HV_TOOLS_FOR_TICKER = ['crosshair'] 
-HV_TOOLS_FOR_ECO = [hover_for_eco, 'crosshair'] 
+
+# The hover tool (hover_for_eco, HV_TOOLS_FOR_ECO) is built on first use, see (__getattr__) below. 
 
 
 # ----------------------------------------------------------------------
@@ -57,7 +80,8 @@ ST_TABS = [
     'Price Difference During Holiday Period', 
     'Price Difference During TWW Period', 
     'Price Difference During Special Period', 
-    'Economic Data From FRED'
+    'Economic Data From FRED', 
+    'Seasonality Screener', 
 ]
 
 
@@ -68,26 +92,70 @@ ST_TABS = [
 FORMAT_WIDGET_OPTIONS_TITLE_CASE = lambda x: x.replace('_', ' ').title()
 FORMAT_WIDGET_OPTIONS_LOWERCASE = lambda x: x.replace('_', ' ').lower()
 
+# Max value of the period slider for each date interval (month / week number).
+ST_PERIOD_MAX = {'daily_by_trdr_day': 12, 'daily_by_weekday': 53}
+
+# Metrics the screener can rank the tickers by. 
+ST_SCREENER_METRICS = ['up_prob', 'avg_diff', 'med_diff', 'tot_diff', 'std_diff', 'pos_avg_diff', 'neg_avg_diff']
+
 
 # ----------------------------------------------------------------------
 # For Including Span 
 # ---------------------------------------------------------------------- 
 
-# Period / Span for rinancial trouble / recession / crisis. 
-DEBT_CRISIS_2008 = hv.VSpan(datetime(2007,12,1), datetime(2009,6,1)).opts(line_width=1, color='lightgray')
-DOT_COM_2001 = hv.VSpan(datetime(2001,3,1), datetime(2001,11,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1990 = hv.VSpan(datetime(1990,7,1), datetime(1991,3,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1982 = hv.VSpan(datetime(1981,11,1), datetime(1982,7,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1980 = hv.VSpan(datetime(1980,1,1), datetime(1980,7,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1974 = hv.VSpan(datetime(1973,11,1), datetime(1975,3,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1970 = hv.VSpan(datetime(1969,12,1), datetime(1970,11,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1960 = hv.VSpan(datetime(1960,4,1), datetime(1961,2,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1957 = hv.VSpan(datetime(1957,8,1), datetime(1958,4,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1953 = hv.VSpan(datetime(1953,7,1), datetime(1954,5,1)).opts(line_width=1, color='lightgray')
-TROUBLE_1949 = hv.VSpan(datetime(1948,11,1), datetime(1949,10,1)).opts(line_width=1, color='lightgray')
-
-# Combine the span. 
-V_SPAN_ECO_RECESSION = (
-    DEBT_CRISIS_2008 * DOT_COM_2001 \
-    * TROUBLE_1990 * TROUBLE_1982 * TROUBLE_1980 * TROUBLE_1974 * TROUBLE_1970 * TROUBLE_1960
-)
+# Period / Span for rinancial trouble / recession / crisis (start & end date). Each is also available 
+# as a holoview span under its name (e.g. DEBT_CRISIS_2008), built on first use. 
+ECO_RECESSION_DATES = {
+    'DEBT_CRISIS_2008': (datetime(2007,12,1), datetime(2009,6,1)), 
+    'DOT_COM_2001': (datetime(2001,3,1), datetime(2001,11,1)), 
+    'TROUBLE_1990': (datetime(1990,7,1), datetime(1991,3,1)), 
+    'TROUBLE_1982': (datetime(1981,11,1), datetime(1982,7,1)), 
+    'TROUBLE_1980': (datetime(1980,1,1), datetime(1980,7,1)), 
+    'TROUBLE_1974': (datetime(1973,11,1), datetime(1975,3,1)), 
+    'TROUBLE_1970': (datetime(1969,12,1), datetime(1970,11,1)), 
+    'TROUBLE_1960': (datetime(1960,4,1), datetime(1961,2,1)), 
+    'TROUBLE_1957': (datetime(1957,8,1), datetime(1958,4,1)), 
+    'TROUBLE_1953': (datetime(1953,7,1), datetime(1954,5,1)), 
+    'TROUBLE_1949': (datetime(1948,11,1), datetime(1949,10,1)), 
+}
+
+# Periods of the combined span (V_SPAN_ECO_RECESSION) & the FRED chart template. 
+ECO_RECESSION_PERIODS = [
+    ECO_RECESSION_DATES[name] for name in [
+        'DEBT_CRISIS_2008', 'DOT_COM_2001', 'TROUBLE_1990', 'TROUBLE_1982', 
+        'TROUBLE_1980', 'TROUBLE_1974', 'TROUBLE_1970', 'TROUBLE_1960', 
+    ]
+]
+ECO_RECESSION_STYLE = dict(fill_color='lightgray', fill_alpha=0.5, line_color='lightgray', line_alpha=0.5, line_width=1)
+
+# Line colours of the FRED chart template (the default holoviews colour cycle). 
+FRED_LINE_COLORS = ['#30a2da', '#fc4f30']
+
+
+# ----------------------------------------------------------------------
+# Holoviews / Bokeh Objects. 
+# ---------------------------------------------------------------------- 
+
+def __getattr__(name):
+    '''
+    Purpose : 
+        Build the holoview spans & the bokeh hover tool on first use, so importing the 
+        config doesn't import holoviews & bokeh (built once, then kept as module attributes). 
+    '''
+
+    if name in ECO_RECESSION_DATES or name == 'V_SPAN_ECO_RECESSION': 
+        from autovisualise_data.plot_backend import load_holoviews
+        hv = load_holoviews()
+        periods = [ECO_RECESSION_DATES[name]] if name in ECO_RECESSION_DATES else ECO_RECESSION_PERIODS
+        spans = [hv.VSpan(*period).opts(line_width=1, color='lightgray') for period in periods]
+        value = spans[0] if name in ECO_RECESSION_DATES else hv.Overlay(spans)
+    elif name == 'hover_for_eco': 
+        from bokeh.models import HoverTool
+        value = HoverTool(tooltips=HOVER_ECO_TOOLTIPS, formatters=HOVER_ECO_FORMATTERS, mode='vline')
+    elif name == 'HV_TOOLS_FOR_ECO': 
+        value = [__getattr__('hover_for_eco'), 'crosshair']
+    else: 
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value
+    return value
@@ -17,8 +17,7 @@ LOG_FORMATTER = logging.Formatter("[%(asctime)s] %(levelname)s – %(name)s | %(
 # Logger setup. 
 def setup_logger(logger: Logger, log_filename: Text) -> Tuple[Logger, FileHandler, StreamHandler]: 
     # Create a new folder for the log filename if it doesn't exist. 
-    if not os.path.exists('logs/runtime'): 
-        os.makedirs('logs/runtime')
+    os.makedirs(os.path.dirname(log_filename), exist_ok=True)
 
     logger.setLevel(LOG_LEVEL)
 
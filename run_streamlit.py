@@ -2,15 +2,10 @@
 # # Python modules.
 import logging
 import streamlit as st
-import holoviews as hv
-import bokeh
 from datetime import datetime
 
-# Holoview config. 
-hv.extension('bokeh')
-
-# Personal modules. 
-from autovisualise_data import ticker_plot, fred_plot
+# Personal modules (holoviews is only imported when a tab builds a plot, see plot_backend). 
+from autovisualise_data import ticker_plot, ticker_views, fred_store, fred_template, chart_cache, stats_engine, screener, prefetch, tracing
 from config.config_dashboard import (
     ST_MAX_WIDTH,
     ST_PADDING_TOP,
@@ -20,14 +15,17 @@ from config.config_dashboard import (
     ST_COLOR,
     ST_BACKGROUND_COLOR,
     ST_TABS,
+    ST_PERIOD_MAX,
+    ST_SCREENER_METRICS,
+    FRED_DOWNSAMPLE,
     FORMAT_WIDGET_OPTIONS_TITLE_CASE, 
     FORMAT_WIDGET_OPTIONS_LOWERCASE, 
     XLIM, 
 )
 from config.config_logger import setup_logger
 from config.config import (
-    LOG_PROCESSING_FILEPATH, ETF_EQUITY, 
-    YR_RANGE, FREQ_KEYS, HOLIDAYS_KEYS, 
+    LOG_PROCESSING_FILEPATH, ETF_DIRS, 
+    YR_RANGE, YR_RANGE_CUSTOM, FREQ_KEYS, HOLIDAYS_KEYS, 
     SPECIAL_DAYS_KEYS, FRED_DATA_GROUPING, 
 )
 
@@ -77,246 +75,337 @@ st.title('''ETF Seasonal Trend''')
 # For selecting the tabs. 
 selector_main_tabs = st.selectbox(label='Dashboard Tabs', options=ST_TABS, index=0) 
 
-col_1, col_2 = st.beta_columns(2)
+# Drop the prefetches of the previous view. 
+prefetch.cancel_prefetch()
 
-if selector_main_tabs in ST_TABS[:5]:
-    with col_1: 
-        # For selecting the ETF directory to get a list of ticker options for that directory. 
-        etf_categories = ['ETF_sector'] + ['/'.join(['ETF_equity', etf]) for etf in ETF_EQUITY] 
-        selector_etf_dir = st.selectbox(label='ETF Categories', options=etf_categories, index=0) 
-    with col_2: 
-        # For selecting the ticker symbol. 
-        selector_ticker_option = st.selectbox(label='Ticker Options', options=ticker_plot.get_ticker_options(selector_etf_dir), index=0) 
+# Measure the rerun (and its stages) for the tab when the tracing is enabled, and serve the metrics. 
+# The span is stopped even if the rerun raises, calls st.stop or is interrupted by another rerun. 
+tracing.serve_metrics()
+rerun_span = tracing.start_span('rerun', tab=selector_main_tabs)
 
-elif selector_main_tabs == ST_TABS[5]:
-    # For selecting the economic data category. 
-    selector_eco_category = st.selectbox(
-        label='Economic Data Category', options=list(FRED_DATA_GROUPING.keys()), index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE)
+try: 
+    col_1, col_2 = st.beta_columns(2)
 
+    etf_categories = ETF_DIRS 
 
-# %%
-# ----------------------------------------------------------------------
-# Develop Sidebar Widget 
-# ----------------------------------------------------------------------
+    if selector_main_tabs in ST_TABS[:5]:
+        with col_1: 
+            # For selecting the ETF directory to get a list of ticker options for that directory. 
+            selector_etf_dir = st.selectbox(label='ETF Categories', options=etf_categories, index=0) 
+        with col_2: 
+            # For selecting the ticker symbol. 
+            selector_ticker_option = st.selectbox(label='Ticker Options', options=ticker_plot.get_ticker_options(selector_etf_dir), index=0) 
 
-st.sidebar.header('''For Data Exploration''')
-
-if selector_main_tabs in ST_TABS[:5]:
-    # For selecting year range category.
-    selector_yr_range = st.sidebar.selectbox(
-        label='Year Range', options=YR_RANGE, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
-    )
-
-if selector_main_tabs == ST_TABS[0] or selector_main_tabs == ST_TABS[1]:
-    # For selecting date interval.
-    selector_interval = st.sidebar.selectbox(
-        label='Date Interval', options=FREQ_KEYS, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
-    ) 
-
-    # For selecting the period such as month / week number. 
-    slider_period = None 
-    if selector_interval == 'daily_by_trdr_day': 
-        slider_period = st.sidebar.slider(label='Period', min_value=1, max_value=12, value=1, step=1) 
-    elif selector_interval == 'daily_by_weekday': 
-        slider_period = st.sidebar.slider(label='Period', min_value=1, max_value=53, value=1, step=1) 
-
-# For selecting the holiday. 
-if selector_main_tabs == ST_TABS[2]:
-    selector_unique_period = st.sidebar.selectbox(
-        label='Holiday Period', options=HOLIDAYS_KEYS, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
-    ) 
-
-# For selecting the TWW period. 
-if selector_main_tabs == ST_TABS[3]:
-    selector_unique_period = st.sidebar.selectbox(
-        label='TWW Period', options=SPECIAL_DAYS_KEYS[5:9], index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
-    ) 
-    
-# For selecting the special period. 
-if selector_main_tabs == ST_TABS[4]:
-    selector_unique_period = st.sidebar.selectbox(
-        label='Special Period', options=SPECIAL_DAYS_KEYS[:5], index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
-    ) 
-    slider_unique_period_month = None
-    if selector_unique_period == 'first_trdr_dom_by_month' or selector_unique_period == 'super_day_by_month':
-        slider_unique_period_month = st.sidebar.slider(label='Period', min_value=1, max_value=12, value=1, step=1) 
-
-if selector_main_tabs == ST_TABS[5]:
-    # For selecting the economic category and showing recession. 
-    multiselector_eco_data_1 = st.sidebar.multiselect(
-        label='Select Economic Data For 1st Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
-        default=FRED_DATA_GROUPING[selector_eco_category][0], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
-    )
-    multiselector_eco_data_2 = st.sidebar.multiselect(
-        label='Select Economic Data For 2nd Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
-        default=FRED_DATA_GROUPING[selector_eco_category][1], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
-    )
-    try: 
-        multiselector_eco_data_3 = st.sidebar.multiselect(
-            label='Select Economic Data For 3rd Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
-            default=FRED_DATA_GROUPING[selector_eco_category][2], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
-        )
-    except: 
-        multiselector_eco_data_3 = None
-    
-    # For selecting the date range.
-    slider_date_range = st.sidebar.slider('Period', datetime(1960,1,1), datetime(datetime.today().year, 12, 1), XLIM)
+    elif selector_main_tabs == ST_TABS[5]:
+        # For selecting the economic data category. 
+        selector_eco_category = st.selectbox(
+            label='Economic Data Category', options=list(FRED_DATA_GROUPING.keys()), index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE)
 
-    # For showing economic recession. 
-    checkbox_show_recession = st.sidebar.checkbox(f'''Show Recession / Bear Period''', value=True)
+    elif selector_main_tabs == ST_TABS[6]:
+        with col_1: 
+            # For selecting the ETF directory to screen every ticker within it. 
+            selector_etf_dir = st.selectbox(label='ETF Categories', options=etf_categories, index=0) 
 
 
-# %%
-# ----------------------------------------------------------------------
-# Develop Dashboard 
-# ----------------------------------------------------------------------
+    # %%
+    # ----------------------------------------------------------------------
+    # Develop Sidebar Widget 
+    # ----------------------------------------------------------------------
+
+    st.sidebar.header('''For Data Exploration''')
+
+    if selector_main_tabs in ST_TABS[:5]:
+        # For selecting year range category (the Price Difference & Holiday tabs can also select any start / end year).
+        yr_range_options = YR_RANGE + [YR_RANGE_CUSTOM] if selector_main_tabs in [ST_TABS[0], ST_TABS[2]] else YR_RANGE
+        selector_yr_range = st.sidebar.selectbox(
+            label='Year Range', options=yr_range_options, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        )
 
-if selector_main_tabs == ST_TABS[0]:
-    # Read the price data. 
-    pivot_stats = ticker_plot.read_pickle(selector_etf_dir, selector_ticker_option, 'pivot_stats.pickle')
-
-    # Create multiple plots. 
-    pivot_data, multi_plots = ticker_plot.plot_price_diff(pivot_stats, selector_interval, selector_yr_range, slider_period)
-    bar_avg_diff, bar_up_prob, bar_counts = multi_plots 
-
-    # Display the table data for price difference. 
-    with st.beta_expander(label='Price Difference Table'): 
-        st.table(ticker_plot.display_styled_table(pivot_stats, selector_interval, selector_yr_range)) 
-
-    # Display the plot for price difference. 
-    with st.beta_expander(label='Price Difference Plots', expanded=True): 
-        st.header('__Average Price Difference__')
-        st.bokeh_chart(hv.render(bar_avg_diff, backend='bokeh'), use_container_width=True)
-        st.header('__Up Probability__')
-        st.bokeh_chart(hv.render(bar_up_prob, backend='bokeh'), use_container_width=True)
-        st.header('__Up / Down Counts__')
-        st.bokeh_chart(hv.render(bar_counts, backend='bokeh'), use_container_width=True) 
-
-elif selector_main_tabs == ST_TABS[1]:
-    # Read the trade volume data. 
-    pivot_stats = ticker_plot.read_pickle(selector_etf_dir, selector_ticker_option, 'pivot_vol_stats.pickle')
-
-    checkbox_overall_vol = None
-    if selector_interval == 'daily_by_trdr_day' or selector_interval == 'daily_by_weekday': 
-        # To indicate whether or not to compute the overall volume without breakdown. 
-        checkbox_overall_vol = st.checkbox(label='Compute Overall Vol Diff', value=False) 
-
-    # Create mutliple plots. 
-    pivot_data_vol, multi_plots = ticker_plot.plot_vol_avg(
-        pivot_stats, selector_interval, slider_period, checkbox_overall_vol
-    ) 
-    pivot_data_vol_col, pivot_data_vol_row = pivot_data_vol
-    bar_yearly_vol, bar_avg_vol, bar_vol_counts = multi_plots
-
-    # Display the plot for volume average. 
-    with st.beta_expander(label='Volume Difference Plots', expanded=True): 
-        st.header('__Yearly Average Volume__')
-        st.bokeh_chart(hv.render(bar_yearly_vol, backend='bokeh'), use_container_width=True)
-        st.header('__Monthly Average Volume__')
-        st.bokeh_chart(hv.render(bar_avg_vol, backend='bokeh'), use_container_width=True)
-        st.header('__Volume Above Monthly Average Counts__')
-        st.bokeh_chart(hv.render(bar_vol_counts, backend='bokeh'), use_container_width=True)
-
-elif selector_main_tabs == ST_TABS[2]:
-    # Read the price data. 
-    pivot_stats = ticker_plot.read_pickle(selector_etf_dir, selector_ticker_option, 'pivot_unique_days.pickle', get_idx=0)
-
-    # Create multiple plots. 
-    pivot_data, multi_plots = ticker_plot.plot_price_diff_holiday_period(pivot_stats, selector_unique_period, selector_yr_range) 
-    bar_avg_diff, bar_up_prob, bar_counts = multi_plots 
-
-    # Display the table data for price difference. 
-    with st.beta_expander(label='Price Difference Table'): 
-        st.table(ticker_plot.display_styled_table(
-            pivot_stats, 'compiled_holiday', selector_yr_range, 'holiday_category', [selector_unique_period]
-        )) 
-
-    # Display the plot for price difference. 
-    with st.beta_expander(label='Price Difference Plots', expanded=True): 
-        st.header('__Average Price Difference__')
-        st.bokeh_chart(hv.render(bar_avg_diff, backend='bokeh'), use_container_width=True)
-        st.header('__Up Probability__')
-        st.bokeh_chart(hv.render(bar_up_prob, backend='bokeh'), use_container_width=True)
-        st.header('__Up / Down Counts__')
-        st.bokeh_chart(hv.render(bar_counts, backend='bokeh'), use_container_width=True) 
-
-elif selector_main_tabs == ST_TABS[3]:
-    # To indicate whether or not to compute the show the TWW by weekly data. 
-    checkbox_show_weekly = None
-    checkbox_show_weekly = st.checkbox(label='Show Weekly TWW', value=False)
-    
-    # Change the data baed on the 'checkbox_show_weekly' value. 
-    get_idx = 2 if checkbox_show_weekly else 1
-
-    # Read the price data. 
-    pivot_stats = ticker_plot.read_pickle(selector_etf_dir, selector_ticker_option, 'pivot_unique_days.pickle', get_idx=get_idx)
-
-    # Create multiple plots. 
-    pivot_data, multi_plots = ticker_plot.plot_price_diff_tww_period(pivot_stats, selector_unique_period, selector_yr_range) 
-    bar_avg_diff, bar_up_prob, bar_counts = multi_plots 
-
-    # Display the table data for price difference. 
-    with st.beta_expander(label='Price Difference Table'): 
-        st.table(ticker_plot.display_styled_table(
-            pivot_stats, 'compiled_tww', selector_yr_range, 'tww_period', [selector_unique_period, f'{selector_unique_period}_week_aft']
-        ))
-
-    # Display the plot for price difference. 
-    with st.beta_expander(label='Price Difference Plots', expanded=True): 
-        st.header('__Average Price Difference__')
-        st.text('Week before & after TWW')
-        st.bokeh_chart(hv.render(bar_avg_diff, backend='bokeh'), use_container_width=True)
-        st.header('__Up Probability__')
-        st.text('Week before & after TWW')
-        st.bokeh_chart(hv.render(bar_up_prob, backend='bokeh'), use_container_width=True)
-        st.header('__Up / Down Counts__')
-        st.text('Week before TWW')
-        st.bokeh_chart(hv.render(bar_counts[0], backend='bokeh'), use_container_width=True) 
-        st.text('Week after TWW')
-        st.bokeh_chart(hv.render(bar_counts[1], backend='bokeh'), use_container_width=True) 
-
-elif selector_main_tabs == ST_TABS[4]:
-    # Read the price data. 
-    pivot_stats = ticker_plot.read_pickle(selector_etf_dir, selector_ticker_option, 'pivot_unique_days.pickle', get_idx=1)
-
-    # Create multiple plots. 
-    pivot_data, multi_plots = ticker_plot.plot_price_diff_special_period(
-        pivot_stats, selector_unique_period, selector_yr_range, slider_unique_period_month
-    ) 
-    bar_avg_diff, bar_up_prob, bar_counts = multi_plots 
-
-    # Display the table data for price difference. 
-    with st.beta_expander(label='Price Difference Table'): 
-        period_col = None
+    if selector_main_tabs == ST_TABS[0] or selector_main_tabs == ST_TABS[1]:
+        # For selecting date interval.
+        selector_interval = st.sidebar.selectbox(
+            label='Date Interval', options=FREQ_KEYS, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+
+        # For selecting the period such as month / week number. 
+        slider_period = None 
+        if selector_interval in ST_PERIOD_MAX: 
+            slider_period = st.sidebar.slider(label='Period', min_value=1, max_value=ST_PERIOD_MAX[selector_interval], value=1, step=1) 
+
+    # For selecting the holiday. 
+    if selector_main_tabs == ST_TABS[2]:
+        selector_unique_period = st.sidebar.selectbox(
+            label='Holiday Period', options=HOLIDAYS_KEYS, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+
+    # For selecting the start / end year. 
+    if selector_main_tabs in [ST_TABS[0], ST_TABS[2]] and selector_yr_range == YR_RANGE_CUSTOM:
+        index_key = selector_interval if selector_main_tabs == ST_TABS[0] else 'compiled_holiday'
+        first_yr, last_yr = stats_engine.read_year_range_index(selector_etf_dir, selector_ticker_option)[index_key].yr_bounds
+        selector_yr_range = st.sidebar.slider(
+            label='Years', min_value=first_yr, max_value=last_yr, value=(first_yr, last_yr), step=1
+        )
+
+    # For selecting the TWW period. 
+    if selector_main_tabs == ST_TABS[3]:
+        selector_unique_period = st.sidebar.selectbox(
+            label='TWW Period', options=SPECIAL_DAYS_KEYS[5:9], index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+
+    # For selecting the special period. 
+    if selector_main_tabs == ST_TABS[4]:
+        selector_unique_period = st.sidebar.selectbox(
+            label='Special Period', options=SPECIAL_DAYS_KEYS[:5], index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+        slider_unique_period_month = None
         if selector_unique_period == 'first_trdr_dom_by_month' or selector_unique_period == 'super_day_by_month':
-            period_col = 'month' if selector_unique_period == 'first_trdr_dom_by_month' else 'super_day_spec_month' 
-
-        st.table(ticker_plot.display_styled_table(
-            pivot_stats, selector_unique_period, selector_yr_range, period_col, [slider_unique_period_month]
-        ))
-
-    # Display the plot for price difference. 
-    with st.beta_expander(label='Price Difference Plots', expanded=True): 
-        st.header('__Average Price Difference__')
-        st.bokeh_chart(hv.render(bar_avg_diff, backend='bokeh'), use_container_width=True)
-        st.header('__Up Probability__')
-        st.bokeh_chart(hv.render(bar_up_prob, backend='bokeh'), use_container_width=True)
-        st.header('__Up / Down Counts__')
-        st.bokeh_chart(hv.render(bar_counts, backend='bokeh'), use_container_width=True) 
-
-elif selector_main_tabs == ST_TABS[5]:
-    # Read the fred data. 
-    fred_data = fred_plot.read_pickle('fred_data.pickle')
-
-    # Create plots. 
-    line_eco_trend_1 = fred_plot.plot_eco_trend(fred_data, multiselector_eco_data_1, slider_date_range, checkbox_show_recession) 
-    line_eco_trend_2 = fred_plot.plot_eco_trend(fred_data, multiselector_eco_data_2, slider_date_range, checkbox_show_recession) 
-    line_eco_trend_3 = fred_plot.plot_eco_trend(fred_data, multiselector_eco_data_3, slider_date_range, checkbox_show_recession) 
-    
-    # Display plots for fred data. 
-    with st.beta_expander(label=f'{selector_eco_category} Trend'.title(), expanded=True): 
-        st.bokeh_chart(hv.render(line_eco_trend_1, backend='bokeh'), use_container_width=True)
-        st.bokeh_chart(hv.render(line_eco_trend_2, backend='bokeh'), use_container_width=True)
+            slider_unique_period_month = st.sidebar.slider(label='Period', min_value=1, max_value=12, value=1, step=1) 
+
+    if selector_main_tabs == ST_TABS[5]:
+        # For selecting the economic category and showing recession. 
+        multiselector_eco_data_1 = st.sidebar.multiselect(
+            label='Select Economic Data For 1st Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
+            default=FRED_DATA_GROUPING[selector_eco_category][0], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
+        )
+        multiselector_eco_data_2 = st.sidebar.multiselect(
+            label='Select Economic Data For 2nd Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
+            default=FRED_DATA_GROUPING[selector_eco_category][1], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
+        )
         try: 
-            st.bokeh_chart(hv.render(line_eco_trend_3, backend='bokeh'), use_container_width=True)
-        except: pass
+            multiselector_eco_data_3 = st.sidebar.multiselect(
+                label='Select Economic Data For 3rd Chart (Max 2)', options=FRED_DATA_GROUPING[selector_eco_category], 
+                default=FRED_DATA_GROUPING[selector_eco_category][2], format_func=FORMAT_WIDGET_OPTIONS_LOWERCASE, 
+            )
+        except: 
+            multiselector_eco_data_3 = None
+
+        # For selecting the date range.
+        slider_date_range = st.sidebar.slider('Period', datetime(1960,1,1), datetime(datetime.today().year, 12, 1), XLIM)
+
+        # For showing economic recession. 
+        checkbox_show_recession = st.sidebar.checkbox(f'''Show Recession / Bear Period''', value=True)
+
+    if selector_main_tabs == ST_TABS[6]:
+        # For selecting the date interval, year range & period (the current month / week by default). 
+        selector_interval = st.sidebar.selectbox(
+            label='Date Interval', options=FREQ_KEYS[:2], index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+        selector_yr_range = st.sidebar.selectbox(
+            label='Year Range', options=YR_RANGE, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        )
+        slider_period = st.sidebar.slider(
+            label='Period', min_value=1, max_value=12 if selector_interval == 'monthly' else 53, 
+            value=screener.get_current_period(selector_interval), step=1
+        ) 
+
+        # For selecting the metric to rank by & the minimum up probability. 
+        selector_metric = st.sidebar.selectbox(
+            label='Rank By', options=ST_SCREENER_METRICS, index=0, format_func=FORMAT_WIDGET_OPTIONS_TITLE_CASE
+        ) 
+        slider_min_up_prob = st.sidebar.slider(label='Min Up Probability', min_value=0.0, max_value=1.0, value=0.0, step=0.05) 
+
+
+    # %%
+    # ----------------------------------------------------------------------
+    # Develop Dashboard 
+    # ----------------------------------------------------------------------
+
+    if selector_main_tabs == ST_TABS[0]:
+        # Create multiple plots, unless they have been rendered / pre-rendered for the same view. 
+        view = ticker_views.make_view(
+            selector_main_tabs, selector_etf_dir, selector_ticker_option, 
+            interval=selector_interval, yr_range=selector_yr_range, period=slider_period, 
+        )
+        tracing.set_tags(**view)
+        bar_avg_diff, bar_up_prob, bar_counts = chart_cache.get_rendered_charts(
+            chart_cache.view_key(**view), lambda: ticker_views.build_view_plots(view)
+        )
+
+        # Display the table data for price difference. 
+        with st.beta_expander(label='Price Difference Table'): 
+            ticker_views.display_view_table(view) 
+
+        # Display the plot for price difference. 
+        with st.beta_expander(label='Price Difference Plots', expanded=True): 
+            st.header('__Average Price Difference__')
+            chart_cache.bokeh_chart(bar_avg_diff, use_container_width=True)
+            st.header('__Up Probability__')
+            chart_cache.bokeh_chart(bar_up_prob, use_container_width=True)
+            st.header('__Up / Down Counts__')
+            chart_cache.bokeh_chart(bar_counts, use_container_width=True) 
+
+    elif selector_main_tabs == ST_TABS[1]:
+        checkbox_overall_vol = None
+        if selector_interval == 'daily_by_trdr_day' or selector_interval == 'daily_by_weekday': 
+            # To indicate whether or not to compute the overall volume without breakdown. 
+            checkbox_overall_vol = st.checkbox(label='Compute Overall Vol Diff', value=False) 
+
+        # Create mutliple plots, unless they have been rendered / pre-rendered for the same view. 
+        view = ticker_views.make_view(
+            selector_main_tabs, selector_etf_dir, selector_ticker_option, 
+            interval=selector_interval, period=slider_period, overall_vol=checkbox_overall_vol, 
+        )
+        tracing.set_tags(**view)
+        bar_yearly_vol, bar_avg_vol, bar_vol_counts = chart_cache.get_rendered_charts(
+            chart_cache.view_key(**view), lambda: ticker_views.build_view_plots(view)
+        )
+
+        # Display the plot for volume average. 
+        with st.beta_expander(label='Volume Difference Plots', expanded=True): 
+            st.header('__Yearly Average Volume__')
+            chart_cache.bokeh_chart(bar_yearly_vol, use_container_width=True)
+            st.header('__Monthly Average Volume__')
+            chart_cache.bokeh_chart(bar_avg_vol, use_container_width=True)
+            st.header('__Volume Above Monthly Average Counts__')
+            chart_cache.bokeh_chart(bar_vol_counts, use_container_width=True)
+
+    elif selector_main_tabs == ST_TABS[2]:
+        # Create multiple plots, unless they have been rendered / pre-rendered for the same view. 
+        view = ticker_views.make_view(
+            selector_main_tabs, selector_etf_dir, selector_ticker_option, 
+            yr_range=selector_yr_range, unique_period=selector_unique_period, 
+        )
+        tracing.set_tags(**view)
+        bar_avg_diff, bar_up_prob, bar_counts = chart_cache.get_rendered_charts(
+            chart_cache.view_key(**view), lambda: ticker_views.build_view_plots(view)
+        )
+
+        # Display the table data for price difference. 
+        with st.beta_expander(label='Price Difference Table'): 
+            ticker_views.display_view_table(view) 
+
+        # Display the plot for price difference. 
+        with st.beta_expander(label='Price Difference Plots', expanded=True): 
+            st.header('__Average Price Difference__')
+            chart_cache.bokeh_chart(bar_avg_diff, use_container_width=True)
+            st.header('__Up Probability__')
+            chart_cache.bokeh_chart(bar_up_prob, use_container_width=True)
+            st.header('__Up / Down Counts__')
+            chart_cache.bokeh_chart(bar_counts, use_container_width=True) 
+
+    elif selector_main_tabs == ST_TABS[3]:
+        # To indicate whether or not to compute the show the TWW by weekly data. 
+        checkbox_show_weekly = st.checkbox(label='Show Weekly TWW', value=False)
+
+        # Create multiple plots, unless they have been rendered / pre-rendered for the same view. 
+        view = ticker_views.make_view(
+            selector_main_tabs, selector_etf_dir, selector_ticker_option, 
+            yr_range=selector_yr_range, unique_period=selector_unique_period, show_weekly=checkbox_show_weekly, 
+        )
+        tracing.set_tags(**view)
+        bar_avg_diff, bar_up_prob, bar_counts_tww, bar_counts_tww_week_aft = chart_cache.get_rendered_charts(
+            chart_cache.view_key(**view), lambda: ticker_views.build_view_plots(view)
+        )
+
+        # Display the table data for price difference. 
+        with st.beta_expander(label='Price Difference Table'): 
+            ticker_views.display_view_table(view)
+
+        # Display the plot for price difference. 
+        with st.beta_expander(label='Price Difference Plots', expanded=True): 
+            st.header('__Average Price Difference__')
+            st.text('Week before & after TWW')
+            chart_cache.bokeh_chart(bar_avg_diff, use_container_width=True)
+            st.header('__Up Probability__')
+            st.text('Week before & after TWW')
+            chart_cache.bokeh_chart(bar_up_prob, use_container_width=True)
+            st.header('__Up / Down Counts__')
+            st.text('Week before TWW')
+            chart_cache.bokeh_chart(bar_counts_tww, use_container_width=True) 
+            st.text('Week after TWW')
+            chart_cache.bokeh_chart(bar_counts_tww_week_aft, use_container_width=True) 
+
+    elif selector_main_tabs == ST_TABS[4]:
+        # Create multiple plots, unless they have been rendered / pre-rendered for the same view. 
+        view = ticker_views.make_view(
+            selector_main_tabs, selector_etf_dir, selector_ticker_option, 
+            yr_range=selector_yr_range, unique_period=selector_unique_period, period=slider_unique_period_month, 
+        )
+        tracing.set_tags(**view)
+        bar_avg_diff, bar_up_prob, bar_counts = chart_cache.get_rendered_charts(
+            chart_cache.view_key(**view), lambda: ticker_views.build_view_plots(view)
+        )
+
+        # Display the table data for price difference. 
+        with st.beta_expander(label='Price Difference Table'): 
+            ticker_views.display_view_table(view)
+
+        # Display the plot for price difference. 
+        with st.beta_expander(label='Price Difference Plots', expanded=True): 
+            st.header('__Average Price Difference__')
+            chart_cache.bokeh_chart(bar_avg_diff, use_container_width=True)
+            st.header('__Up Probability__')
+            chart_cache.bokeh_chart(bar_up_prob, use_container_width=True)
+            st.header('__Up / Down Counts__')
+            chart_cache.bokeh_chart(bar_counts, use_container_width=True) 
+
+    elif selector_main_tabs == ST_TABS[5]:
+        tracing.set_tags(
+            eco_category=selector_eco_category, date_range=tuple(slider_date_range), show_recession=checkbox_show_recession, 
+        )
+
+        # Render the charts from the prebuilt template, unless they have been rendered for the same widget 
+        # state. Only the selected series are read, within the selected date range. 
+        line_eco_trends = []
+        for multiselector_eco_data in [multiselector_eco_data_1, multiselector_eco_data_2, multiselector_eco_data_3]: 
+            chart_key = chart_cache.view_key(
+                tab=selector_main_tabs, eco_data=tuple(multiselector_eco_data or []), 
+                date_range=tuple(slider_date_range), show_recession=checkbox_show_recession, 
+                downsample=FRED_DOWNSAMPLE, mtime=fred_store.get_fred_mtime(), 
+            )
+            line_eco_trends += chart_cache.CHART_CACHE.get_or_load(
+                chart_key, lambda: [fred_template.render_eco_trend(
+                    fred_store.read_fred_series(multiselector_eco_data, slider_date_range), 
+                    multiselector_eco_data, slider_date_range, checkbox_show_recession, FRED_DOWNSAMPLE, 
+                )]
+            )
+        line_eco_trend_1, line_eco_trend_2, line_eco_trend_3 = line_eco_trends
+
+        # Display plots for fred data. 
+        with st.beta_expander(label=f'{selector_eco_category} Trend'.title(), expanded=True): 
+            chart_cache.bokeh_chart(line_eco_trend_1, use_container_width=True)
+            chart_cache.bokeh_chart(line_eco_trend_2, use_container_width=True)
+            chart_cache.bokeh_chart(line_eco_trend_3, use_container_width=True)
+
+    elif selector_main_tabs == ST_TABS[6]:
+        tracing.set_tags(
+            etf_dir=selector_etf_dir, interval=selector_interval, yr_range=selector_yr_range, period=slider_period, 
+            metric=selector_metric, min_up_prob=slider_min_up_prob, 
+        )
+
+        # Stack the pivot tables of every ticker & rank them for the period. 
+        screener_frame = screener.read_screener_frame(selector_etf_dir, selector_interval, selector_yr_range)
+        screened = screener.screen_tickers(
+            screener_frame, selector_interval, period=slider_period, metric=selector_metric, min_up_prob=slider_min_up_prob
+        )
+
+        # Create plots, unless they have been rendered for the same widget state. 
+        chart_key = chart_cache.view_key(
+            tab=selector_main_tabs, etf_dir=selector_etf_dir, interval=selector_interval, yr_range=selector_yr_range, 
+            period=slider_period, metric=selector_metric, min_up_prob=slider_min_up_prob, 
+            mtimes=screener.get_screener_mtimes(selector_etf_dir), 
+        )
+        bar_metric, bar_counts = chart_cache.get_rendered_charts(
+            chart_key, lambda: screener.plot_screener(screened, selector_metric)
+        )
+
+        # Display the ranked tickers. 
+        with st.beta_expander(label='Screened Tickers', expanded=True): 
+            if screened.empty: 
+                st.write('No ticker matches the filters.')
+            else: 
+                st.table(screener.formatting_screener(screened))
+
+        # Display the plots for the ranked tickers. 
+        with st.beta_expander(label='Screened Ticker Plots', expanded=True): 
+            st.header(f'__{FORMAT_WIDGET_OPTIONS_TITLE_CASE(selector_metric)}__')
+            chart_cache.bokeh_chart(bar_metric, use_container_width=True)
+            st.header('__Up / Down Counts__')
+            chart_cache.bokeh_chart(bar_counts, use_container_width=True) 
+
+    # Prefetch the views one step away (period, year range & ticker) while the charts are being read. 
+    if selector_main_tabs in ST_TABS[:5]:
+        prefetch.prefetch_adjacent_views(view)
+
+finally: 
+    rerun_span.stop()
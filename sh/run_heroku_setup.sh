@@ -16,3 +16,6 @@ headless=true\n\
 enableCORS=true\n\
 port=$PORT\n\
 " > ~/.streamlit/config.toml
+
+# Convert the pivot pickle files into the columnar store. 
+python -m autovisualise_data.pivot_store;